@@ -1,6 +1,29 @@
 # Importamos todas las funciones de nuestros módulos
 from servicios import *
 from archivos import *
+# glob permite cargar varios archivos con un patrón (ej: bodegas/*.csv)
+import glob
+# argparse lee las opciones de la línea de comandos (ej: --diario)
+import argparse
+# Diario de cambios para no reescribir todo el CSV en cada guardado
+from diario import DiarioInventario, descartar_diario
+# Modo por lotes: ejecutar comandos desde un archivo sin menú
+from lotes import ejecutar_lote, mostrar_reporte_lote
+# Instantánea binaria para arrancar rápido con inventarios grandes
+from instantanea import cargar_inventario_rapido, guardar_csv_con_instantanea
+# sys.stdin para leer el lote desde la entrada estándar
+import sys
+# Perfilado opcional de las operaciones (--perfil)
+import perfil
+# Para elegir la columna por la que se ordena el listado
+from presentacion import interpretar_orden
+# Inventario por columnas para inventarios grandes (--columnar)
+from inventario_columnar import InventarioColumnar
+
+# Diario activo (solo si se inicia con --diario), o None
+diario_activo = None
+# True si se inició con --columnar: el inventario se guarda por columnas
+modo_columnar = False
 
 def mostrar_menu():
     """
@@ -35,6 +58,21 @@ def preguntar_sobrescribir():
         # Si no es válida, mostramos mensaje y repetimos
         print("Por favor, ingresa 'S' para Sobrescribir o 'N' para No sobrescribir")
 
+def guardar_inventario(inventario, ruta):
+    """
+    Guarda el inventario en la ruta indicada
+    Si el diario está activo y la ruta es la suya, basta con compactarlo
+    (los cambios ya están guardados en el diario)
+    """
+    if diario_activo is not None and ruta == diario_activo.ruta_csv:
+        diario_activo.compactar(esperar=True)
+        print(f"Inventario guardado exitosamente en: {ruta}")
+    else:
+        # Guardamos el CSV y su instantánea binaria (para el próximo arranque)
+        if guardar_csv_con_instantanea(inventario, ruta):
+            # Un diario viejo de ese CSV ya no sirve: reaplicarlo pisaría lo guardado
+            descartar_diario(ruta)
+
 def ejecutar_opcion(opcion, inventario):
     """
     Ejecuta la opción seleccionada del menú
@@ -74,7 +112,16 @@ def ejecutar_opcion(opcion, inventario):
         
     # OPCIÓN 2: Mostrar inventario
     elif opcion == 2:
-        mostrar_inventario(inventario)  # Llamamos la función directa
+        columna, descendente = None, False
+        # Si hay varios productos ofrecemos ordenar el listado
+        if len(inventario) > 1:
+            respuesta = input("Ordenar por (nombre, precio, cantidad; '-' adelante = descendente; enter = sin orden): ")
+            orden = interpretar_orden(respuesta)
+            if orden is None:  # Columna inválida
+                return inventario
+            columna, descendente = orden
+        # En la terminal se muestra por páginas
+        mostrar_inventario(inventario, orden=columna, descendente=descendente)
         
     # OPCIÓN 3: Buscar producto
     elif opcion == 3:
@@ -91,6 +138,12 @@ def ejecutar_opcion(opcion, inventario):
             print(f"Cantidad: {producto['cantidad']}")
         else:
             print(f"Producto '{nombre}' no encontrado.")
+            # Mostramos los nombres que empiezan igual o se parecen
+            sugerencias = buscar_similares(inventario, nombre) if nombre else []
+            if sugerencias:
+                print("¿Quisiste decir?")
+                for i, (similar, tipo) in enumerate(sugerencias, 1):
+                    print(f"{i}. {similar['nombre']} - Precio: ${similar['precio']:.2f} - Cantidad: {similar['cantidad']} ({tipo})")
             
     # OPCIÓN 4: Actualizar producto
     elif opcion == 4:
@@ -149,18 +202,30 @@ def ejecutar_opcion(opcion, inventario):
         ruta = input("Ruta del archivo CSV (enter para 'inventario.csv'): ").strip()
         if not ruta:  # Si la ruta está vacía
             ruta = "inventario.csv"  # Usamos valor por defecto
-        guardar_csv(inventario, ruta)
+        guardar_inventario(inventario, ruta)
         
     # OPCIÓN 8: Cargar CSV
     elif opcion == 8:
         print("\n--- CARGAR INVENTARIO ---")
         # Pedimos la ruta, con valor por defecto si no se ingresa nada
-        ruta = input("Ruta del archivo CSV (enter para 'inventario.csv'): ").strip()
+        # Se acepta un patrón con * para cargar y fusionar muchos archivos a la vez
+        ruta = input("Ruta del archivo CSV o patrón (ej: bodegas/*.csv) (enter para 'inventario.csv'): ").strip()
         if not ruta:  # Si la ruta está vacía
             ruta = "inventario.csv"  # Usamos valor por defecto
         
-        # Intentamos cargar el archivo
-        inventario_cargado = cargar_csv(ruta)
+        if any(comodin in ruta for comodin in "*?["):
+            # Patrón: fusionamos todos los archivos en paralelo (ordenados por nombre)
+            rutas = sorted(glob.glob(ruta))
+            if not rutas:
+                print(f"Error: Ningún archivo coincide con '{ruta}'.")
+                return inventario
+            inventario_cargado = fusionar_multiples_csv(rutas)
+        elif modo_columnar:
+            # Directo a columnas, sin armar un diccionario por fila
+            inventario_cargado = cargar_csv_columnar(ruta)
+        else:
+            # Intentamos cargar el archivo por bloques (los errores se resumen al final)
+            inventario_cargado = cargar_csv_en_bloques(ruta)
         
         # Si la carga fue exitosa (no None)
         if inventario_cargado is not None:
@@ -185,27 +250,85 @@ def ejecutar_opcion(opcion, inventario):
                 # Inventario vacío, simplemente cargamos
                 inventario = inventario_cargado
                 print("Inventario cargado exitosamente.")
+        
+        # La fusión arma un Inventario: en modo columnar lo pasamos a columnas
+        if modo_columnar and not isinstance(inventario, InventarioColumnar):
+            inventario = InventarioColumnar(inventario)
     
     # Retornamos el inventario (puede haber cambiado)
     return inventario
 
-def main():
+def leer_argumentos(argumentos=None):
+    """
+    Lee las opciones de la línea de comandos
+    """
+    parser = argparse.ArgumentParser(description="Sistema de gestión de inventario")
+    parser.add_argument("--diario", action="store_true",
+                        help="guardar cada cambio en un diario en lugar de reescribir el CSV")
+    parser.add_argument("--lote", metavar="ARCHIVO",
+                        help="ejecutar los comandos del archivo (o - para la entrada estándar) sin menú")
+    parser.add_argument("--perfil", nargs="?", const="perfil", metavar="PREFIJO",
+                        help="medir las operaciones y guardar el reporte en PREFIJO.json y PREFIJO.prom al salir")
+    parser.add_argument("--columnar", action="store_true",
+                        help="guardar el inventario por columnas (menos memoria con inventarios grandes)")
+    opciones = parser.parse_args(argumentos)
+    # El diario sigue los cambios de cada producto (diccionario): necesita un Inventario
+    if opciones.diario and opciones.columnar:
+        parser.error("--columnar no se puede usar junto con --diario")
+    return opciones
+
+def main(argumentos=None):
     """
     Función principal del sistema - Punto de entrada del programa
     """
-    # Inicializamos el inventario como lista vacía
-    inventario = []
+    global diario_activo, modo_columnar
+    opciones = leer_argumentos(argumentos)
+    
+    # Perfilado: se activa antes de cargar para medir también la carga inicial
+    if opciones.perfil:
+        perfil.activar(globals(), opciones.perfil)
+    
+    # Inicializamos el inventario vacío (con índice por nombre para búsquedas rápidas)
+    modo_columnar = opciones.columnar
+    inventario = InventarioColumnar() if modo_columnar else Inventario()
     print("¡Bienvenido al Sistema de Gestión de Inventario!")
     
-    # Intentamos cargar inventario automáticamente al inicio si existe
-    try:
-        inventario_cargado = cargar_csv("inventario.csv")
-        if inventario_cargado:
-            inventario = inventario_cargado
-            print("Inventario cargado automáticamente desde 'inventario.csv'")
-    except:
-        # Si hay error en la carga automática, comenzamos con inventario vacío
-        print("No se encontró archivo de inventario previo. Comenzando con inventario vacío.")
+    # Modo diario: cargamos la foto CSV más los cambios del diario
+    if opciones.diario:
+        diario_activo = DiarioInventario("inventario.csv")
+        inventario = diario_activo.cargar()
+        if inventario is None:
+            # No seguimos: la próxima compactación reemplazaría los archivos dañados
+            print("No se pudo iniciar el modo diario. Revisa los archivos del inventario.")
+            return
+        print("Modo diario activo: los cambios se guardan automáticamente")
+    
+    else:
+        # Intentamos cargar inventario automáticamente al inicio si existe
+        try:
+            # Usamos la instantánea binaria si está al día; si no, el CSV
+            # (se lee por bloques y las filas inválidas se muestran como resumen)
+            inventario_cargado = cargar_inventario_rapido("inventario.csv", columnar=modo_columnar)
+            if inventario_cargado:
+                inventario = inventario_cargado
+                print("Inventario cargado automáticamente desde 'inventario.csv'")
+        except:
+            # Si hay error en la carga automática, comenzamos con inventario vacío
+            print("No se encontró archivo de inventario previo. Comenzando con inventario vacío.")
+    
+    # MODO POR LOTES: ejecutamos los comandos, mostramos el reporte y salimos
+    if opciones.lote:
+        if opciones.lote == "-":
+            inventario, metricas = ejecutar_lote(sys.stdin, inventario, diario_activo)
+        else:
+            with open(opciones.lote, 'r', encoding='utf-8') as archivo_lote:
+                inventario, metricas = ejecutar_lote(archivo_lote, inventario, diario_activo)
+        mostrar_reporte_lote(metricas)
+        if diario_activo is not None:
+            diario_activo.cerrar()
+        if perfil.esta_activo():
+            perfil.mostrar_reporte()
+        return
     
     # BUCLE PRINCIPAL DEL PROGRAMA
     while True:
@@ -227,13 +350,20 @@ def main():
                 print("\n¿Deseas guardar el inventario antes de salir?")
                 guardar = input("Guardar inventario antes de salir? (S/N): ").strip().upper()
                 if guardar == 'S':
-                    guardar_csv(inventario, "inventario.csv")
+                    guardar_inventario(inventario, "inventario.csv")
+                elif diario_activo is not None:
+                    print("Los cambios quedan registrados en el diario.")
                 # Mensaje de despedida
                 print("¡Gracias por usar el Sistema de Inventario! ¡Hasta pronto!")
                 break  # Rompemos el bucle y salimos del programa
             
             # Ejecutamos la opción seleccionada
+            inventario_anterior = inventario
             inventario = ejecutar_opcion(opcion, inventario)
+            # Si la opción reemplazó el inventario (carga/fusión), el diario
+            # pasa a seguir al nuevo y escribe una foto completa
+            if diario_activo is not None and inventario is not inventario_anterior:
+                diario_activo.conectar(inventario)
             # Pausa para que el usuario pueda leer los resultados
             input("\nPresiona Enter para continuar...")
             
@@ -246,6 +376,13 @@ def main():
             print(f"\nError inesperado: {e}")
             print("El programa continuará...")
             input("Presiona Enter para continuar...")
+    
+    # Cerramos el diario (espera a que termine cualquier compactación)
+    if diario_activo is not None:
+        diario_activo.cerrar()
+    # Resumen del perfilado (el reporte completo se guarda al terminar)
+    if perfil.esta_activo():
+        perfil.mostrar_reporte()
 
 # Punto de entrada estándar en Python
 # Esto asegura que main() solo se ejecute si ejecutamos este archivo directamente
@@ -1,5 +1,21 @@
 # Importamos el módulo csv para trabajar con archivos CSV
 import csv
+# Importamos islice para leer el archivo por bloques sin cargarlo completo
+from itertools import islice
+# Importamos el contenedor de inventario con índice por nombre
+from inventario_indexado import Inventario, clave_producto
+# Importamos la representación columnar (opcional, para inventarios grandes)
+from inventario_columnar import InventarioColumnar
+# array guarda las columnas numéricas del inventario columnar
+from array import array
+# Para la fusión masiva de muchos CSV en paralelo
+import time
+# os.cpu_count() decide cuántos procesos usar
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Encabezado que deben tener todos los CSV de inventario
+ENCABEZADO_CSV = ["nombre", "precio", "cantidad"]
 
 def guardar_csv(inventario, ruta, incluir_header=True):
     """
@@ -23,14 +39,19 @@ def guardar_csv(inventario, ruta, incluir_header=True):
                 # Escribimos la primera fila con los nombres de las columnas
                 escritor.writerow(["nombre", "precio", "cantidad"])
             
-            # Recorremos cada producto del inventario
-            for producto in inventario:
-                # Escribimos una fila por cada producto con sus datos
-                escritor.writerow([
-                    producto["nombre"],    # Columna 1: nombre
-                    producto["precio"],    # Columna 2: precio
-                    producto["cantidad"]   # Columna 3: cantidad
-                ])
+            # Inventario columnar: escribimos las columnas directamente,
+            # sin armar un diccionario por producto
+            if isinstance(inventario, InventarioColumnar):
+                escritor.writerows(zip(inventario.nombres, inventario.precios, inventario.cantidades))
+            else:
+                # Recorremos cada producto del inventario
+                for producto in inventario:
+                    # Escribimos una fila por cada producto con sus datos
+                    escritor.writerow([
+                        producto["nombre"],    # Columna 1: nombre
+                        producto["precio"],    # Columna 2: precio
+                        producto["cantidad"]   # Columna 3: cantidad
+                    ])
         
         # Si todo salió bien, mostramos mensaje de éxito
         print(f"Inventario guardado exitosamente en: {ruta}")
@@ -49,8 +70,8 @@ def cargar_csv(ruta):
     """
     Carga un inventario desde un archivo CSV con validaciones exhaustivas
     """
-    # Inicializamos lista para productos válidos
-    inventario_cargado = []
+    # Inicializamos el inventario (indexado por nombre) para productos válidos
+    inventario_cargado = Inventario()
     # Contador para filas con errores
     filas_invalidas = 0
     
@@ -64,7 +85,7 @@ def cargar_csv(ruta):
             encabezado = next(lector, None)  # None es valor por defecto si no hay filas
             
             # Validamos que el encabezado sea correcto
-            if encabezado != ["nombre", "precio", "cantidad"]:
+            if encabezado != ENCABEZADO_CSV:
                 print("Error: El archivo CSV no tiene el formato correcto.")
                 print(f"Encabezado esperado: nombre,precio,cantidad")
                 # Mostramos qué encabezado encontramos (si existe)
@@ -74,46 +95,15 @@ def cargar_csv(ruta):
             # Recorremos cada fila del archivo (empezando desde la fila 2)
             # enumerate(lector, start=2) numera las filas desde 2 (fila 1 es encabezado)
             for numero_fila, fila in enumerate(lector, start=2):
-                # Validamos que la fila tenga exactamente 3 columnas
-                if len(fila) != 3:
-                    print(f"Fila {numero_fila} inválida: debe tener 3 columnas, tiene {len(fila)}")
+                # Validamos la fila (columnas, números y valores no negativos)
+                producto, tipo_error, mensaje = validar_fila_csv(fila)
+                if producto is None:
+                    print(f"Fila {numero_fila} inválida: {mensaje}")
                     filas_invalidas += 1  # Incrementamos contador de errores
                     continue  # Saltamos a la siguiente fila
                 
-                # Desempaquetamos la fila en tres variables
-                nombre, precio_str, cantidad_str = fila
-                
-                try:
-                    # Convertimos precio de string a float
-                    precio = float(precio_str)
-                    # Validamos que el precio no sea negativo
-                    if precio < 0:
-                        print(f"Fila {numero_fila} inválida: precio no puede ser negativo")
-                        filas_invalidas += 1
-                        continue  # Saltamos a la siguiente fila
-                    
-                    # Convertimos cantidad de string a int
-                    cantidad = int(cantidad_str)
-                    # Validamos que la cantidad no sea negativa
-                    if cantidad < 0:
-                        print(f"Fila {numero_fila} inválida: cantidad no puede ser negativa")
-                        filas_invalidas += 1
-                        continue  # Saltamos a la siguiente fila
-                    
-                    # Creamos el diccionario del producto
-                    producto = {
-                        "nombre": nombre.strip(),  # .strip() elimina espacios al inicio/final
-                        "precio": precio,
-                        "cantidad": cantidad
-                    }
-                    # Agregamos el producto válido a la lista
-                    inventario_cargado.append(producto)
-                    
-                except ValueError as e:
-                    # Error al convertir string a número (float o int)
-                    print(f"Fila {numero_fila} inválida: datos numéricos incorrectos - {e}")
-                    filas_invalidas += 1
-                    continue  # Saltamos a la siguiente fila
+                # Agregamos el producto válido al inventario
+                inventario_cargado.append(producto)
         
         # Mostramos resumen de la carga
         print(f"Archivo cargado: {len(inventario_cargado)} productos válidos, {filas_invalidas} filas inválidas omitidas")
@@ -132,36 +122,403 @@ def cargar_csv(ruta):
         print(f"Error inesperado al cargar el archivo: {e}")
         return None
 
-def fusionar_inventarios(inventario_actual, inventario_nuevo):
+def validar_fila_csv(fila):
+    """
+    Valida una fila del CSV y la convierte en producto
+    Retorna una tupla (producto, tipo_error, mensaje):
+    - Si la fila es válida: (producto, None, None)
+    - Si no lo es: (None, tipo de error, mensaje para el usuario)
+    """
+    valores, tipo_error, mensaje = convertir_fila_csv(fila)
+    if valores is None:
+        return None, tipo_error, mensaje
+    
+    # Creamos el diccionario del producto
+    nombre, precio, cantidad = valores
+    producto = {
+        "nombre": nombre,
+        "precio": precio,
+        "cantidad": cantidad
+    }
+    return producto, None, None
+
+def convertir_fila_csv(fila):
+    """
+    Valida una fila del CSV y la convierte en la tupla (nombre, precio, cantidad)
+    Retorna (valores, tipo_error, mensaje) con el mismo criterio que validar_fila_csv
+    """
+    # Validamos que la fila tenga exactamente 3 columnas
+    if len(fila) != 3:
+        return None, "columnas", f"debe tener 3 columnas, tiene {len(fila)}"
+    
+    # Desempaquetamos la fila en tres variables
+    nombre, precio_str, cantidad_str = fila
+    
+    try:
+        # Convertimos precio de string a float
+        precio = float(precio_str)
+        # Validamos que el precio no sea negativo
+        if precio < 0:
+            return None, "precio_negativo", "precio no puede ser negativo"
+        
+        # Convertimos cantidad de string a int
+        cantidad = int(cantidad_str)
+        # Validamos que la cantidad no sea negativa
+        if cantidad < 0:
+            return None, "cantidad_negativa", "cantidad no puede ser negativa"
+    except ValueError as e:
+        # Error al convertir string a número (float o int)
+        return None, "numerico", f"datos numéricos incorrectos - {e}"
+    
+    # .strip() elimina espacios al inicio/final del nombre
+    return (nombre.strip(), precio, cantidad), None, None
+
+def crear_resumen_errores(max_filas=20):
+    """
+    Crea el resumen donde se acumulan los errores de una carga por bloques
+    En lugar de imprimir cada fila inválida, se cuentan por tipo y solo se
+    guardan los números de las primeras 'max_filas' filas con error
+    """
+    return {
+        "validas": 0,            # Productos válidos cargados
+        "invalidas": 0,          # Total de filas inválidas
+        "por_tipo": {},          # Tipo de error -> cantidad de filas
+        "primeras_filas": [],    # Números de las primeras filas inválidas
+        "max_filas": max_filas,  # Límite de filas guardadas
+        "error": None            # Error grave que detuvo la carga (o None)
+    }
+
+def cargar_csv_por_bloques(ruta, tamano_bloque=10000, resumen=None):
+    """
+    Generador que lee el CSV y entrega los productos válidos en bloques
+    Cada bloque es una lista de hasta 'tamano_bloque' productos
+    Los errores no se imprimen: se acumulan en 'resumen' (ver crear_resumen_errores)
+    """
+    # Si no nos pasaron un resumen, usamos uno propio
+    if resumen is None:
+        resumen = crear_resumen_errores()
+    
+    try:
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            lector = csv.reader(archivo)
+            
+            # Validamos el encabezado igual que cargar_csv
+            encabezado = next(lector, None)
+            if encabezado != ENCABEZADO_CSV:
+                encontrado = ','.join(encabezado) if encabezado else 'Ninguno'
+                resumen["error"] = ("El archivo CSV no tiene el formato correcto. "
+                                    f"Encabezado esperado: nombre,precio,cantidad - "
+                                    f"Encabezado encontrado: {encontrado}")
+                return  # Terminamos el generador sin entregar bloques
+            
+            # Numeramos las filas desde 2 (la fila 1 es el encabezado)
+            filas = enumerate(lector, start=2)
+            while True:
+                # islice toma solo las siguientes 'tamano_bloque' filas del archivo
+                lote = list(islice(filas, tamano_bloque))
+                if not lote:
+                    break  # No quedan filas
+                
+                bloque = []
+                for numero_fila, fila in lote:
+                    producto, tipo_error, _ = validar_fila_csv(fila)
+                    if producto is None:
+                        # Acumulamos el error en el resumen en lugar de imprimirlo
+                        anotar_error(resumen, tipo_error, numero_fila)
+                        continue
+                    bloque.append(producto)
+                
+                resumen["validas"] += len(bloque)
+                if bloque:
+                    yield bloque  # Entregamos el bloque al consumidor
+    
+    except FileNotFoundError:
+        resumen["error"] = f"El archivo '{ruta}' no existe."
+    except UnicodeDecodeError:
+        resumen["error"] = "El archivo tiene problemas de codificación (no es UTF-8 válido)."
+    except Exception as e:
+        # Cualquier otro error (directorio, permisos, CSV mal formado...) igual que cargar_csv
+        resumen["error"] = f"Ocurrió un error inesperado al cargar el archivo: {e}"
+
+def anotar_error(resumen, tipo_error, numero_fila):
+    """
+    Suma una fila inválida al resumen (guarda su número solo si hay lugar)
+    """
+    resumen["invalidas"] += 1
+    resumen["por_tipo"][tipo_error] = resumen["por_tipo"].get(tipo_error, 0) + 1
+    if len(resumen["primeras_filas"]) < resumen["max_filas"]:
+        resumen["primeras_filas"].append(numero_fila)
+
+def mostrar_resumen_carga(resumen):
+    """
+    Muestra el resumen de una carga por bloques en pocas líneas
+    """
+    # Si hubo un error grave, solo mostramos ese error
+    if resumen["error"]:
+        print(f"Error: {resumen['error']}")
+        return
+    
+    print(f"Archivo cargado: {resumen['validas']} productos válidos, {resumen['invalidas']} filas inválidas omitidas")
+    if resumen["invalidas"]:
+        # Mostramos cuántas filas falló cada tipo de validación
+        detalle = ", ".join(f"{tipo}: {cantidad}" for tipo, cantidad in sorted(resumen["por_tipo"].items()))
+        print(f"Errores por tipo: {detalle}")
+        # Mostramos solo las primeras filas inválidas
+        filas = ", ".join(str(numero) for numero in resumen["primeras_filas"])
+        if resumen["invalidas"] > len(resumen["primeras_filas"]):
+            filas += ", ..."
+        print(f"Primeras filas inválidas: {filas}")
+
+def cargar_csv_en_bloques(ruta, tamano_bloque=10000, max_filas_error=20):
+    """
+    Carga un CSV completo leyéndolo por bloques y mostrando un resumen de errores
+    Retorna el inventario cargado, o None si hubo un error grave (igual que cargar_csv)
+    """
+    resumen = crear_resumen_errores(max_filas_error)
+    inventario_cargado = Inventario()
+    
+    # Consumimos el generador bloque por bloque
+    for bloque in cargar_csv_por_bloques(ruta, tamano_bloque, resumen):
+        inventario_cargado.extend(bloque)
+    
+    # Mostramos el resumen (una sola vez, no una línea por fila)
+    mostrar_resumen_carga(resumen)
+    if resumen["error"]:
+        return None
+    return inventario_cargado
+
+def cargar_csv_columnar(ruta, max_filas_error=20):
+    """
+    Carga un CSV directamente en un InventarioColumnar (sin diccionarios por fila)
+    Los errores se resumen igual que en cargar_csv_en_bloques
+    Retorna el inventario columnar, o None si hubo un error grave
+    """
+    resumen = crear_resumen_errores(max_filas_error)
+    # Columnas que vamos llenando fila por fila
+    nombres = []
+    precios = array('d')
+    cantidades = array('q')
+    
+    try:
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            lector = csv.reader(archivo)
+            encabezado = next(lector, None)
+            if encabezado != ENCABEZADO_CSV:
+                encontrado = ','.join(encabezado) if encabezado else 'Ninguno'
+                resumen["error"] = ("El archivo CSV no tiene el formato correcto. "
+                                    f"Encabezado esperado: nombre,precio,cantidad - "
+                                    f"Encabezado encontrado: {encontrado}")
+            else:
+                for numero_fila, fila in enumerate(lector, start=2):
+                    valores, tipo_error, _ = convertir_fila_csv(fila)
+                    if valores is None:
+                        anotar_error(resumen, tipo_error, numero_fila)
+                        continue
+                    nombres.append(valores[0])
+                    precios.append(valores[1])
+                    cantidades.append(valores[2])
+    except FileNotFoundError:
+        resumen["error"] = f"El archivo '{ruta}' no existe."
+    except UnicodeDecodeError:
+        resumen["error"] = "El archivo tiene problemas de codificación (no es UTF-8 válido)."
+    except OverflowError:
+        # array('q') solo admite enteros de 64 bits
+        resumen["error"] = "El archivo tiene cantidades demasiado grandes."
+    except Exception as e:
+        resumen["error"] = f"Ocurrió un error inesperado al cargar el archivo: {e}"
+    
+    resumen["validas"] = len(nombres)
+    mostrar_resumen_carga(resumen)
+    if resumen["error"]:
+        return None
+    return InventarioColumnar.desde_columnas(nombres, precios, cantidades)
+
+def fusionar_inventarios(inventario_actual, inventario_nuevo, mostrar_detalle=True):
     """
     Fusiona dos inventarios: actualiza productos existentes y agrega nuevos
+    Con mostrar_detalle=False no se imprime una línea por producto
     """
-    # Creamos una copia del inventario actual para no modificar el original
-    inventario_fusionado = inventario_actual.copy()
+    # Creamos una copia indexada del inventario actual para no modificar el original
+    # dict(producto) copia cada producto: al actualizarlos no tocamos los originales
+    inventario_fusionado = Inventario(dict(producto) for producto in inventario_actual)
     
     # Creamos un diccionario para búsqueda rápida por nombre
     # Convertimos nombres a minúsculas para búsqueda case-insensitive
+    # Solo tiene los productos actuales (no el índice del inventario fusionado):
+    # los repetidos del inventario nuevo se agregan todos, y si el actual
+    # tiene nombres repetidos se actualiza el último, como siempre
     productos_actuales = {prod["nombre"].lower(): prod for prod in inventario_fusionado}
     
     # Recorremos cada producto del inventario nuevo
     for producto_nuevo in inventario_nuevo:
         nombre = producto_nuevo["nombre"]
-        nombre_lower = nombre.lower()  # Convertimos a minúsculas para comparar
         
         # Verificamos si el producto ya existe en el inventario actual
-        if nombre_lower in productos_actuales:
+        producto_actual = productos_actuales.get(nombre.lower())
+        if producto_actual is not None:
             # Producto existe - actualizamos precio y cantidad
-            producto_actual = productos_actuales[nombre_lower]
-            # Actualizamos al nuevo precio (reemplazamos el anterior)
-            producto_actual["precio"] = producto_nuevo["precio"]
-            # Sumamos la nueva cantidad a la existente
-            producto_actual["cantidad"] += producto_nuevo["cantidad"]
+            # Reemplazamos el precio anterior y sumamos la nueva cantidad a la existente
+            # (a través del inventario para mantener las estadísticas al día)
+            inventario_fusionado.actualizar(
+                producto_actual,
+                nuevo_precio=producto_nuevo["precio"],
+                nueva_cantidad=producto_actual["cantidad"] + producto_nuevo["cantidad"]
+            )
             # Informamos al usuario de la actualización
-            print(f"Actualizado: {nombre} - Nuevo precio: ${producto_nuevo['precio']:.2f}, Cantidad añadida: {producto_nuevo['cantidad']}")
+            if mostrar_detalle:
+                print(f"Actualizado: {nombre} - Nuevo precio: ${producto_nuevo['precio']:.2f}, Cantidad añadida: {producto_nuevo['cantidad']}")
         else:
             # Producto nuevo - lo agregamos al inventario
-            inventario_fusionado.append(producto_nuevo)
-            print(f"Agregado: {nombre}")
+            inventario_fusionado.append(dict(producto_nuevo))
+            if mostrar_detalle:
+                print(f"Agregado: {nombre}")
     
     # Retornamos el inventario fusionado
-    return inventario_fusionado
\ No newline at end of file
+    return inventario_fusionado
+
+# =============================================
+# FUSIÓN MASIVA DE MUCHOS CSV EN PARALELO
+# =============================================
+# Cada archivo se lee en un proceso distinto y se reduce a un "parcial":
+# un diccionario clave -> [nombre, precio, cantidad] con la misma lógica
+# que fusionar_inventarios (último precio gana, cantidades se suman,
+# nombres sin distinguir mayúsculas). Los parciales se combinan en forma de
+# árbol y siempre en el orden de los archivos (el último precio gana):
+# - hojas: cada proceso recibe un grupo de archivos seguidos y combina sus
+#   parciales ahí mismo (sin mandarlos de un proceso a otro)
+# - rondas: los parciales de los grupos se juntan de a pares vecinos
+#   (1+2, 3+4, ...) en paralelo hasta que queda uno: log2(procesos) rondas
+# Mandar un parcial a otro proceso cuesta serializarlo, por eso los grupos
+# son pocos (uno por proceso) y no uno por archivo.
+
+def leer_parcial_csv(ruta):
+    """
+    Lee un CSV y lo reduce a un parcial (se ejecuta en un proceso aparte)
+    Retorna un diccionario con el parcial, filas válidas/inválidas y error (o None)
+    """
+    parcial = {}
+    resultado = {"ruta": ruta, "parcial": parcial, "validas": 0, "invalidas": 0, "error": None}
+    try:
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            lector = csv.reader(archivo)
+            if next(lector, None) != ENCABEZADO_CSV:
+                resultado["error"] = "el archivo CSV no tiene el formato correcto"
+                return resultado
+            for fila in lector:
+                valores, tipo_error, _ = convertir_fila_csv(fila)
+                if valores is None:
+                    resultado["invalidas"] += 1
+                    continue
+                resultado["validas"] += 1
+                nombre, precio, cantidad = valores
+                clave = clave_producto(nombre)
+                existente = parcial.get(clave)
+                if existente is None:
+                    parcial[clave] = [nombre, precio, cantidad]
+                else:
+                    existente[1] = precio      # El último precio gana
+                    existente[2] += cantidad   # Las cantidades se suman
+    except FileNotFoundError:
+        resultado["error"] = "el archivo no existe"
+    except UnicodeDecodeError:
+        resultado["error"] = "el archivo no es UTF-8 válido"
+    except (OSError, csv.Error) as e:
+        # Directorio, permisos, CSV mal formado...: se omite solo este archivo
+        resultado["error"] = str(e)
+    return resultado
+
+def combinar_parciales(anterior, posterior):
+    """
+    Combina dos parciales respetando el orden: 'anterior' y luego 'posterior'
+    Modifica y retorna 'anterior'
+    """
+    for clave, (nombre, precio, cantidad) in posterior.items():
+        existente = anterior.get(clave)
+        if existente is None:
+            anterior[clave] = [nombre, precio, cantidad]
+        else:
+            existente[1] = precio
+            existente[2] += cantidad
+    return anterior
+
+def leer_grupo_csv(rutas):
+    """
+    Lee varios CSV seguidos y combina sus parciales en orden (se ejecuta en un proceso aparte)
+    Retorna (resultados de cada archivo sin su parcial, parcial del grupo o None)
+    """
+    resultados = [leer_parcial_csv(ruta) for ruta in rutas]
+    parcial = None
+    for resultado in resultados:
+        if resultado["error"] is None:
+            parcial = resultado["parcial"] if parcial is None else combinar_parciales(parcial, resultado["parcial"])
+        resultado["parcial"] = None  # Ya está en el parcial del grupo
+    return resultados, parcial
+
+def combinar_pareja(pareja):
+    """
+    Combina un par (anterior, posterior) de parciales (se ejecuta en un proceso aparte)
+    """
+    return combinar_parciales(*pareja)
+
+def reducir_parciales(parciales, mapear=map):
+    """
+    Combina una lista de parciales en forma de árbol y retorna el parcial final
+    'mapear' reparte los pares de cada ronda (ej: pool.map para usar varios procesos)
+    """
+    while len(parciales) > 1:
+        parejas = list(zip(parciales[0::2], parciales[1::2]))
+        combinados = list(mapear(combinar_pareja, parejas))
+        # Con una cantidad impar, el último pasa a la ronda siguiente sin combinar
+        if len(parciales) % 2:
+            combinados.append(parciales[-1])
+        parciales = combinados
+    return parciales[0] if parciales else None
+
+def fusionar_multiples_csv(rutas, inventario_base=None, procesos=None):
+    """
+    Carga y fusiona muchos CSV usando varios procesos
+    Los archivos se aplican en el orden de 'rutas' (el último precio gana)
+    Si se pasa inventario_base, el resultado se fusiona sobre él
+    Retorna el inventario resultante, o None si ningún archivo se pudo leer
+    """
+    inicio = time.perf_counter()
+    
+    procesos = min(procesos or os.cpu_count() or 1, len(rutas))
+    # Con un solo archivo (o un solo proceso) no vale la pena crear procesos
+    if procesos <= 1:
+        resultados, parcial = leer_grupo_csv(rutas)
+    else:
+        # Grupos de archivos seguidos, uno por proceso (las hojas del árbol)
+        tamano = -(-len(rutas) // procesos)
+        grupos = [rutas[i:i + tamano] for i in range(0, len(rutas), tamano)]
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            leidos = list(pool.map(leer_grupo_csv, grupos))
+            # Los parciales de los grupos se combinan de a pares, también en paralelo
+            parcial = reducir_parciales([p for _, p in leidos if p is not None], pool.map)
+        resultados = [resultado for grupo, _ in leidos for resultado in grupo]
+    
+    # Informamos los archivos que no se pudieron leer
+    for resultado in resultados:
+        if resultado["error"] is not None:
+            print(f"Archivo omitido '{resultado['ruta']}': {resultado['error']}")
+    if parcial is None:
+        print("Error: No se pudo cargar ningún archivo.")
+        return None
+    
+    # Armamos el inventario final y, si corresponde, lo fusionamos sobre el base
+    productos = ({"nombre": nombre, "precio": precio, "cantidad": cantidad}
+                 for nombre, precio, cantidad in parcial.values())
+    if inventario_base is not None:
+        inventario_final = fusionar_inventarios(inventario_base, productos, mostrar_detalle=False)
+    else:
+        inventario_final = Inventario(productos)
+    
+    # Reportamos el rendimiento de la operación
+    duracion = time.perf_counter() - inicio
+    filas = sum(r["validas"] + r["invalidas"] for r in resultados)
+    invalidas = sum(r["invalidas"] for r in resultados)
+    leidos = sum(1 for r in resultados if r["error"] is None)
+    print(f"Fusión masiva: {leidos}/{len(rutas)} archivos, {filas} filas "
+          f"({invalidas} inválidas) -> {len(inventario_final)} productos")
+    print(f"Tiempo: {duracion:.2f} s - Rendimiento: {filas / max(duracion, 1e-9):,.0f} filas/s")
+    return inventario_final
\ No newline at end of file
@@ -0,0 +1,266 @@
+# random genera datos sintéticos reproducibles (con semilla)
+import random
+# perf_counter mide tiempos con alta precisión
+import time
+# tracemalloc mide la memoria máxima que usa cada función
+import tracemalloc
+# json guarda los resultados como línea base
+import json
+import argparse
+import csv
+import os
+import sys
+import platform
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from servicios import buscar_producto, calcular_estadisticas
+from archivos import ENCABEZADO_CSV, cargar_csv, guardar_csv, fusionar_inventarios
+
+# =============================================
+# BENCHMARK DEL NÚCLEO DEL INVENTARIO
+# =============================================
+# Mide tiempo y memoria de cargar_csv, guardar_csv, buscar_producto,
+# calcular_estadisticas y fusionar_inventarios con inventarios sintéticos
+# de distintos tamaños (10^3 a 10^7 productos). Los datos se generan con
+# una semilla fija, así dos corridas miden exactamente lo mismo.
+#
+# Uso:
+#   python benchmark.py --salida base.json              (guarda la línea base)
+#   python benchmark.py --comparar base.json            (compara contra la base)
+#   python benchmark.py --tamanos 1e3 1e5 1e7           (elige los tamaños)
+#
+# El tiempo es el mejor de varias repeticiones (el menos afectado por otros
+# programas). La memoria se mide en una corrida aparte con tracemalloc,
+# porque tracemalloc hace todo más lento y arruinaría los tiempos.
+
+TAMANOS_POR_DEFECTO = [10**3, 10**4, 10**5, 10**6]
+SEMILLA = 12345
+REPETICIONES = 3
+# Proporción de filas mal formadas en los CSV generados
+PROPORCION_INVALIDAS = 0.01
+# Búsquedas por medición (80% existen, 20% no)
+BUSQUEDAS = 10000
+# Umbral por defecto para marcar una regresión (0.2 = 20% peor)
+UMBRAL = 0.2
+# Tiempos menores a esto se consideran ruido al comparar
+MIN_SEGUNDOS_COMPARAR = 0.005
+# Memoria menor a esto se considera ruido al comparar
+MIN_BYTES_COMPARAR = 64 * 1024
+
+# ---------- Datos sintéticos ----------
+
+def _nombre(i):
+    return f"Producto{i:08d}"
+
+def generar_csv(ruta, indices, semilla, proporcion_invalidas=PROPORCION_INVALIDAS):
+    """
+    Escribe un CSV de inventario con un producto por cada índice
+    y algunas filas mal formadas de todos los tipos que valida el cargador
+    """
+    aleatorio = random.Random(semilla)
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(ENCABEZADO_CSV)
+        for i in indices:
+            nombre = _nombre(i)
+            if aleatorio.random() < proporcion_invalidas:
+                # Fila inválida (además de la válida): columnas, precio
+                # negativo, texto o cantidad negativa
+                escritor.writerow(aleatorio.choice([
+                    [nombre],
+                    [nombre, "-5.0", "3"],
+                    [nombre, "abc", "3"],
+                    [nombre, "3.5", "-2"],
+                ]))
+            escritor.writerow([nombre, round(aleatorio.uniform(0.5, 1000), 2), aleatorio.randint(0, 500)])
+
+def preparar_datos(tamano, directorio, semilla=SEMILLA):
+    """
+    Genera (si no existen) el inventario de 'tamano' productos y el archivo
+    a fusionar con él: tamano/10 productos, mitad existentes y mitad nuevos
+    Retorna (ruta del inventario, ruta del archivo nuevo)
+    """
+    ruta = os.path.join(directorio, f"inventario_{tamano}_{semilla}.csv")
+    ruta_nuevo = os.path.join(directorio, f"nuevo_{tamano}_{semilla}.csv")
+    if not os.path.exists(ruta):
+        generar_csv(ruta, range(tamano), semilla + tamano)
+    if not os.path.exists(ruta_nuevo):
+        aleatorio = random.Random(semilla - tamano)
+        cantidad = max(1, tamano // 10)
+        existentes = aleatorio.sample(range(tamano), cantidad // 2)
+        nuevos = range(tamano, tamano + cantidad - cantidad // 2)
+        generar_csv(ruta_nuevo, existentes + list(nuevos), semilla + 2 * tamano)
+    return ruta, ruta_nuevo
+
+# ---------- Mediciones ----------
+
+def _medir(funcion, repeticiones):
+    """
+    Ejecuta funcion() varias veces y retorna (mejor tiempo, memoria pico en bytes)
+    funcion() debe preparar lo que necesita fuera de la medición
+    retornando el callable que se mide
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        operacion = funcion()
+        inicio = time.perf_counter()
+        operacion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+
+    # Corrida aparte para la memoria
+    operacion = funcion()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    operacion()
+    pico = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return mejor, pico
+
+def medir_tamano(tamano, directorio, repeticiones=REPETICIONES, semilla=SEMILLA):
+    """
+    Mide todas las funciones para un tamaño de inventario
+    Retorna un diccionario función -> {"segundos", "memoria_pico"}
+    """
+    ruta, ruta_nuevo = preparar_datos(tamano, directorio, semilla)
+    ruta_salida = os.path.join(directorio, f"salida_{tamano}.csv")
+    resultados = {}
+
+    # Los mensajes de las funciones (ej: una línea por fila inválida) se descartan
+    with open(os.devnull, 'w', encoding='utf-8') as nulo, redirect_stdout(nulo):
+        inventario = cargar_csv(ruta)
+        nuevo = cargar_csv(ruta_nuevo)
+
+        # Nombres a buscar: 80% existen (con mayúsculas cambiadas), 20% no
+        aleatorio = random.Random(semilla)
+        nombres = [_nombre(aleatorio.randrange(tamano)).upper() if aleatorio.random() < 0.8
+                   else _nombre(tamano * 2 + i) for i in range(BUSQUEDAS)]
+
+        def buscar_todos():
+            for nombre in nombres:
+                buscar_producto(inventario, nombre)
+
+        def estadisticas_en_copia():
+            # Sobre una copia nueva: incluye armar las estructuras la primera vez
+            copia = inventario.copy()
+            return lambda: calcular_estadisticas(copia)
+
+        casos = {
+            "cargar_csv": lambda: lambda: cargar_csv(ruta),
+            "guardar_csv": lambda: lambda: guardar_csv(inventario, ruta_salida),
+            "buscar_producto": lambda: buscar_todos,
+            "calcular_estadisticas": estadisticas_en_copia,
+            "fusionar_inventarios": lambda: lambda: fusionar_inventarios(inventario, nuevo, mostrar_detalle=False),
+        }
+        for nombre, caso in casos.items():
+            segundos, pico = _medir(caso, repeticiones)
+            resultados[nombre] = {"segundos": segundos, "memoria_pico": pico}
+        resultados["buscar_producto"]["busquedas"] = BUSQUEDAS
+
+    if os.path.exists(ruta_salida):
+        os.remove(ruta_salida)
+    return resultados
+
+def ejecutar(tamanos, directorio, repeticiones=REPETICIONES, semilla=SEMILLA):
+    """
+    Corre el benchmark para todos los tamaños
+    Retorna los resultados con los datos del equipo donde se midió
+    """
+    resultados = {}
+    for tamano in tamanos:
+        print(f"Midiendo {tamano:,} productos...", flush=True)
+        resultados[str(tamano)] = medir_tamano(tamano, directorio, repeticiones, semilla)
+        for funcion, datos in resultados[str(tamano)].items():
+            print(f"  {funcion:<24} {datos['segundos']:>10.4f} s {datos['memoria_pico'] / 1024 / 1024:>10.1f} MB")
+    return {
+        "metadatos": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "semilla": semilla,
+            "repeticiones": repeticiones,
+        },
+        "resultados": resultados,
+    }
+
+def comparar(base, actual, umbral=UMBRAL):
+    """
+    Compara dos corridas y muestra las diferencias
+    Retorna la lista de regresiones (tamaño, función, medida, base, actual)
+    """
+    regresiones = []
+    print(f"\n{'Tamaño':>10} {'Función':<24} {'Tiempo':>9} {'Memoria':>9}")
+    for tamano, funciones in actual["resultados"].items():
+        for funcion, datos in funciones.items():
+            anterior = base["resultados"].get(tamano, {}).get(funcion)
+            if anterior is None:
+                continue
+            columnas = []
+            for medida, minimo in (("segundos", MIN_SEGUNDOS_COMPARAR), ("memoria_pico", MIN_BYTES_COMPARAR)):
+                cambio = datos[medida] / anterior[medida] - 1 if anterior[medida] else 0.0
+                marca = ""
+                # Valores muy chicos varían mucho entre corridas: no los marcamos
+                if cambio > umbral and max(datos[medida], anterior[medida]) >= minimo:
+                    marca = "!"
+                    regresiones.append((tamano, funcion, medida, anterior[medida], datos[medida]))
+                columnas.append(f"{cambio:+8.1%}{marca or ' '}")
+            print(f"{int(tamano):>10,} {funcion:<24} {columnas[0]:>9} {columnas[1]:>9}")
+
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones por encima del {umbral:.0%}:")
+        for tamano, funcion, medida, anterior, nuevo in regresiones:
+            print(f"  {funcion} con {int(tamano):,} productos: {medida} {anterior:.4g} -> {nuevo:.4g}")
+    else:
+        print(f"\nSin regresiones por encima del {umbral:.0%}.")
+    return regresiones
+
+def leer_argumentos(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark del inventario")
+    parser.add_argument("--tamanos", nargs="+", type=lambda valor: int(float(valor)),
+                        help="cantidades de productos a medir (ej: 1e3 1e5); por defecto 10^3 a 10^6")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--semilla", type=int, help=f"semilla de los datos sintéticos (por defecto {SEMILLA})")
+    parser.add_argument("--directorio", help="carpeta para los CSV generados (se reutilizan entre corridas)")
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", metavar="BASE", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help="empeoramiento tolerado (0.2 = 20%%)")
+    opciones = parser.parse_args(argumentos)
+    # Al comparar se usa la semilla de la base: otra semilla mediría otros datos
+    if opciones.comparar and opciones.semilla is not None:
+        parser.error("--semilla no se puede usar con --comparar (se usa la semilla de la base)")
+    return opciones
+
+def main(argumentos=None):
+    opciones = leer_argumentos(argumentos)
+
+    base = None
+    tamanos = opciones.tamanos
+    semilla = SEMILLA if opciones.semilla is None else opciones.semilla
+    if opciones.comparar:
+        with open(opciones.comparar, 'r', encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        # Sin tamaños explícitos medimos los mismos que la base, con su semilla
+        tamanos = tamanos or [int(tamano) for tamano in base["resultados"]]
+        semilla = base["metadatos"]["semilla"]
+    tamanos = tamanos or TAMANOS_POR_DEFECTO
+
+    if opciones.directorio:
+        os.makedirs(opciones.directorio, exist_ok=True)
+        actual = ejecutar(tamanos, opciones.directorio, opciones.repeticiones, semilla)
+    else:
+        with tempfile.TemporaryDirectory() as directorio:
+            actual = ejecutar(tamanos, directorio, opciones.repeticiones, semilla)
+
+    if opciones.salida:
+        with open(opciones.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(actual, archivo, indent=2)
+        print(f"Resultados guardados en '{opciones.salida}'")
+
+    if base is not None and comparar(base, actual, opciones.umbral):
+        return 1  # Código de salida distinto de 0 si hubo regresiones
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
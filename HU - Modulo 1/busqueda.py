@@ -0,0 +1,192 @@
+# bisect busca posiciones en listas ordenadas en O(log n)
+import bisect
+# heapq.nlargest elige los mejores resultados sin ordenar todo
+import heapq
+# array guarda las listas de ids de forma compacta (4 bytes por id)
+from array import array
+
+from inventario_indexado import clave_producto
+
+# =============================================
+# BÚSQUEDA POR PREFIJO Y APROXIMADA
+# =============================================
+# Índice sobre los nombres de los productos con dos partes:
+# - Prefijo: lista ordenada de claves; con bisect encontramos en O(log n)
+#   todos los nombres que empiezan con lo escrito ("lec" -> "leche", ...)
+# - Aproximada: índice de trigramas (grupos de 3 letras). Un nombre con
+#   un error de tipeo comparte la mayoría de sus trigramas con el correcto
+#   ("lehce" y "leche" comparten "  l", " le", ...), así que lo encontramos
+#   aunque no coincida exactamente.
+# El índice se mantiene al día escuchando los cambios del Inventario
+# (o del InventarioColumnar, que avisa los mismos eventos).
+
+# Similitud mínima (0 a 1) para sugerir un nombre parecido
+SIMILITUD_MINIMA = 0.3
+# Máximo de candidatos que se comparan en una búsqueda aproximada
+MAX_CANDIDATOS = 2000
+
+def trigramas(clave):
+    """
+    Retorna el conjunto de trigramas de una clave
+    Se agregan espacios al inicio y al final para que también cuenten
+    el comienzo y el final de la palabra
+    """
+    texto = f"  {clave} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+class IndiceBusqueda:
+    """
+    Índice de búsqueda sobre los nombres de un inventario
+    """
+
+    def __init__(self, inventario):
+        self._inventario = inventario
+        self._construir()
+        # Si el inventario avisa sus cambios (Inventario o InventarioColumnar),
+        # nos suscribimos para seguirlos; una lista normal no los avisa
+        self._sigue_cambios = hasattr(inventario, "suscribir")
+        if self._sigue_cambios:
+            inventario.suscribir(self._al_cambiar)
+
+    @classmethod
+    def de(cls, inventario):
+        """
+        Retorna el índice de un inventario, creándolo la primera vez
+        (así el costo de construirlo solo se paga si alguien busca)
+        """
+        indice = getattr(inventario, "indice_busqueda", None)
+        if indice is None:
+            indice = cls(inventario)
+            if indice._sigue_cambios:
+                inventario.indice_busqueda = indice
+        return indice
+
+    # ---------- Construcción y mantenimiento ----------
+
+    def _construir(self):
+        # Claves sin repetir, ordenadas para la búsqueda por prefijo
+        self._ordenadas = sorted({clave_producto(p["nombre"]) for p in self._inventario})
+        # Cada clave recibe un id numérico; las listas de trigramas guardan ids
+        self._claves = list(self._ordenadas)                             # id -> clave (None si se eliminó)
+        self._id_de = {clave: i for i, clave in enumerate(self._claves)}  # clave -> id
+        self._eliminados = 0
+
+        # Armamos primero listas normales (append es más rápido) y al final
+        # las pasamos a array para que ocupen menos memoria
+        listas = {}
+        for id_clave, clave in enumerate(self._claves):
+            for trigrama in trigramas(clave):
+                lista = listas.get(trigrama)
+                if lista is None:
+                    listas[trigrama] = [id_clave]
+                else:
+                    lista.append(id_clave)
+        self._trigramas = {trigrama: array('I', lista) for trigrama, lista in listas.items()}  # trigrama -> ids
+
+    def _agregar_clave(self, clave):
+        id_clave = len(self._claves)
+        self._claves.append(clave)
+        self._id_de[clave] = id_clave
+        for trigrama in trigramas(clave):
+            lista = self._trigramas.get(trigrama)
+            if lista is None:
+                lista = self._trigramas[trigrama] = array('I')
+            lista.append(id_clave)
+
+    def _al_cambiar(self, evento, producto):
+        """
+        Observador del inventario: mantiene el índice sincronizado
+        """
+        if evento == "vaciado":
+            self._construir()
+            return
+        if evento not in ("alta", "baja"):
+            return  # Los cambios de precio/cantidad no afectan los nombres
+
+        clave = clave_producto(producto["nombre"])
+        if evento == "alta" and clave not in self._id_de:
+            bisect.insort(self._ordenadas, clave)
+            self._agregar_clave(clave)
+        elif evento == "baja" and self._inventario.buscar(clave) is None:
+            # Ya no queda ningún producto con ese nombre
+            posicion = bisect.bisect_left(self._ordenadas, clave)
+            del self._ordenadas[posicion]
+            # En las listas de trigramas el id queda marcado como eliminado
+            # (se ignora al buscar); si hay demasiados, reconstruimos todo
+            self._claves[self._id_de.pop(clave)] = None
+            self._eliminados += 1
+            if self._eliminados > 1000 and self._eliminados > len(self._id_de):
+                self._construir()
+
+    # ---------- Consultas ----------
+
+    def por_prefijo(self, texto, limite=10):
+        """
+        Retorna hasta 'limite' claves que empiezan con 'texto' (en orden alfabético)
+        """
+        prefijo = clave_producto(texto)
+        inicio = bisect.bisect_left(self._ordenadas, prefijo)
+        # '\U0010ffff' es el carácter más grande: marca el final del rango
+        fin = bisect.bisect_left(self._ordenadas, prefijo + "\U0010ffff", inicio)
+        return self._ordenadas[inicio:min(fin, inicio + limite)]
+
+    def aproximados(self, texto, limite=10):
+        """
+        Retorna hasta 'limite' pares (clave, similitud) parecidos a 'texto',
+        del más parecido al menos parecido
+        """
+        clave = clave_producto(texto)
+        buscados = trigramas(clave)
+
+        # Recorremos primero los trigramas menos frecuentes: son los que más
+        # distinguen y sus listas son cortas. Paramos al juntar suficientes candidatos
+        listas = sorted((self._trigramas[t] for t in buscados if t in self._trigramas), key=len)
+        candidatos = set()
+        for lista in listas:
+            candidatos.update(lista)
+            if len(candidatos) >= MAX_CANDIDATOS:
+                break
+
+        # Similitud de Jaccard: trigramas en común / trigramas en total
+        puntajes = []
+        for id_clave in candidatos:
+            candidata = self._claves[id_clave]
+            if candidata is None:
+                continue  # Clave eliminada
+            propios = trigramas(candidata)
+            comunes = len(buscados & propios)
+            similitud = comunes / (len(buscados) + len(propios) - comunes)
+            if similitud >= SIMILITUD_MINIMA:
+                puntajes.append((similitud, candidata))
+        return [(candidata, similitud) for similitud, candidata in heapq.nlargest(limite, puntajes)]
+
+    def buscar(self, texto, limite=10):
+        """
+        Búsqueda combinada: exacta, luego por prefijo y luego aproximada
+        Retorna hasta 'limite' pares (producto, tipo) donde tipo es
+        "exacto", "prefijo" o "aproximado"
+        """
+        resultados = []
+        vistos = set()
+
+        def agregar(clave, tipo):
+            if clave in vistos or len(resultados) >= limite:
+                return
+            if hasattr(self._inventario, "buscar"):
+                producto = self._inventario.buscar(clave)
+            else:
+                # Lista normal: recorremos hasta encontrarlo (solo para pocos resultados)
+                producto = next((p for p in self._inventario if clave_producto(p["nombre"]) == clave), None)
+            if producto is not None:
+                vistos.add(clave)
+                resultados.append((producto, tipo))
+
+        clave = clave_producto(texto)
+        if clave in self._id_de:
+            agregar(clave, "exacto")
+        for encontrada in self.por_prefijo(texto, limite):
+            agregar(encontrada, "prefijo")
+        if len(resultados) < limite:
+            for encontrada, _ in self.aproximados(texto, limite):
+                agregar(encontrada, "aproximado")
+        return resultados
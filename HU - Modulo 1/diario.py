@@ -0,0 +1,334 @@
+# Importamos csv para escribir y leer las entradas del diario
+import csv
+# os para renombrar/reemplazar archivos y medir su tamaño
+import os
+# threading para compactar el diario en segundo plano
+import threading
+
+from archivos import ENCABEZADO_CSV
+from inventario_indexado import Inventario
+# La foto se carga desde la instantánea binaria cuando está al día
+from instantanea import cargar_inventario_rapido, guardar_instantanea_columnas, ruta_instantanea
+
+# =============================================
+# DIARIO DE CAMBIOS (WRITE-AHEAD LOG)
+# =============================================
+# En lugar de reescribir todo el CSV en cada guardado, cada alta, cambio
+# o baja se agrega como una línea al final de un archivo "diario":
+#   A,nombre,precio,cantidad   -> el producto existe con estos valores
+#   D,nombre                   -> el producto fue eliminado
+# Si el nombre está repetido se agrega cuál de los productos con ese
+# nombre es (0 = el primero) y, en las bajas, cuántos había:
+#   A,nombre,precio,cantidad,n
+#   D,nombre,n,total
+# Al iniciar se carga el CSV (la "foto" completa) y se aplican encima las
+# líneas del diario. Cuando el diario crece demasiado se "compacta":
+# se escribe una foto nueva del CSV en segundo plano y el diario empieza
+# vacío otra vez.
+#
+# Las entradas guardan valores absolutos (no "sumar 3"), así que aplicar
+# el mismo diario dos veces deja el inventario igual. Eso permite
+# recuperarse si el programa se corta en medio de una compactación.
+#
+# Si el CSV se guarda sin el diario (sin --diario), el diario que hubiera
+# quedado ya no corresponde a esa foto: se descarta con descartar_diario().
+
+# Límites por defecto para compactar
+MAX_BYTES_DIARIO = 8 * 1024 * 1024   # 8 MB de diario
+PROPORCION_DIARIO = 0.5              # Entradas del diario / productos del inventario
+MIN_ENTRADAS_COMPACTAR = 1000        # No compactamos inventarios chicos por la proporción
+
+class DiarioInventario:
+    """
+    Diario de cambios asociado a un archivo CSV de inventario
+    """
+
+    def __init__(self, ruta_csv, max_bytes=MAX_BYTES_DIARIO, proporcion=PROPORCION_DIARIO):
+        self.ruta_csv = ruta_csv
+        # Diario activo y diario que se está compactando
+        self.ruta_diario = ruta_csv + ".diario"
+        self.ruta_anterior = ruta_csv + ".diario.anterior"
+        self.max_bytes = max_bytes
+        self.proporcion = proporcion
+        self._inventario = None
+        self._archivo = None
+        self._escritor = None
+        self._entradas = 0         # Entradas escritas desde la última compactación
+        self._hilo = None          # Hilo de la compactación en curso (o None)
+        self._baja_repetida = None # (producto, n, total) avisado antes de su baja
+
+    # ---------- Inicio ----------
+
+    def cargar(self):
+        """
+        Carga el inventario: foto CSV + diario(s) pendientes
+        Retorna el inventario listo para usar (vacío si no había nada),
+        o None si la foto o un diario no se pudieron leer
+        (no se sigue, porque la próxima compactación los reemplazaría)
+        """
+        inventario = Inventario()
+        if os.path.exists(self.ruta_csv) or os.path.exists(ruta_instantanea(self.ruta_csv)):
+            try:
+                inventario = cargar_inventario_rapido(self.ruta_csv)
+            except Exception as e:
+                print(f"Error al cargar '{self.ruta_csv}': {e}")
+                inventario = None
+            if inventario is None:
+                print(f"Error: No se pudo cargar la foto '{self.ruta_csv}'; el diario no se aplica.")
+                return None
+
+        # Primero el diario que quedó a medio compactar (si lo hay) y luego el activo
+        # Si la foto es posterior al diario anterior, el corte fue justo antes de
+        # borrarlo: la foto ya lo incluye (con nombres repetidos reaplicarlo no es inocuo)
+        rutas = [self.ruta_anterior, self.ruta_diario]
+        if os.path.exists(self.ruta_anterior) and os.path.exists(self.ruta_csv):
+            if os.stat(self.ruta_csv).st_mtime_ns > os.stat(self.ruta_anterior).st_mtime_ns:
+                rutas.remove(self.ruta_anterior)
+                os.remove(self.ruta_anterior)
+        aplicadas = 0
+        for ruta in rutas:
+            try:
+                aplicadas += self._reproducir(ruta, inventario)
+            except OSError as e:
+                print(f"Error al leer el diario '{ruta}': {e}")
+                return None
+        if aplicadas:
+            print(f"Diario aplicado: {aplicadas} cambios recuperados")
+
+        self.conectar(inventario, compactar=aplicadas > 0)
+        return inventario
+
+    def conectar(self, inventario, compactar=True):
+        """
+        Empieza a registrar los cambios de 'inventario'
+        Si el inventario fue reemplazado (ej: se cargó otro CSV), con compactar=True
+        se escribe una foto nueva, porque el diario anterior ya no sirve
+        """
+        if self._inventario is not None:
+            self._inventario.desuscribir(self._registrar)
+        self._inventario = inventario
+        inventario.suscribir(self._registrar)
+        if compactar:
+            self.compactar()
+        elif self._archivo is None:
+            self._abrir()
+
+    # ---------- Registro de cambios ----------
+
+    def _registrar(self, evento, producto):
+        """
+        Observador del inventario: agrega una línea al diario por cada cambio
+        """
+        if evento == "antes_de_baja":
+            # El nombre está repetido: anotamos cuál de ellos se va a quitar
+            iguales = self._inventario.buscar_todos(producto["nombre"])
+            self._baja_repetida = (producto, self._ocurrencia(iguales, producto), len(iguales))
+            return
+        if evento in ("alta", "cambio"):
+            fila = ["A", producto["nombre"], producto["precio"], producto["cantidad"]]
+            if self._inventario.buscar(producto["nombre"]) is not producto:
+                # No es el primero con ese nombre: indicamos cuál es
+                iguales = self._inventario.buscar_todos(producto["nombre"])
+                fila.append(self._ocurrencia(iguales, producto))
+            self._escritor.writerow(fila)
+        elif evento == "baja":
+            if self._baja_repetida is not None and self._baja_repetida[0] is producto:
+                _, n, total = self._baja_repetida
+                self._escritor.writerow(["D", producto["nombre"], n, total])
+            else:
+                self._escritor.writerow(["D", producto["nombre"]])
+            self._baja_repetida = None
+        else:
+            # "vaciado": lo más simple es escribir una foto nueva
+            self.compactar()
+            return
+        # flush pasa la línea al sistema operativo (sobrevive si el programa se cae)
+        self._archivo.flush()
+        self._entradas += 1
+
+        # ¿Hay que compactar?
+        if (self._archivo.tell() > self.max_bytes
+                or (self._entradas >= MIN_ENTRADAS_COMPACTAR
+                    and self._entradas > self.proporcion * len(self._inventario))):
+            self.compactar()
+
+    # ---------- Compactación ----------
+
+    def compactar(self, esperar=False):
+        """
+        Escribe una foto nueva del CSV y deja el diario vacío
+        La escritura del CSV ocurre en segundo plano (salvo con esperar=True)
+        Retorna True si se inició la compactación
+        """
+        if self._hilo is not None and self._hilo.is_alive():
+            # Ya hay una compactación en curso
+            if esperar:
+                self._hilo.join()
+            else:
+                return False
+
+        # Tomamos la foto de los datos ahora (tuplas livianas, sin tocar disco)
+        filas = [(p["nombre"], p["precio"], p["cantidad"]) for p in self._inventario]
+
+        # El diario actual pasa a ser el "anterior" y abrimos uno nuevo vacío
+        self._cerrar_archivo()
+        if os.path.exists(self.ruta_diario):
+            if os.path.exists(self.ruta_anterior):
+                # Quedó de una compactación interrumpida: la foto que vamos a
+                # escribir ya incluye esos cambios, así que lo unimos al actual
+                with open(self.ruta_anterior, 'a', newline='', encoding='utf-8') as destino, \
+                        open(self.ruta_diario, 'r', newline='', encoding='utf-8') as origen:
+                    destino.write(origen.read())
+                os.remove(self.ruta_diario)
+            else:
+                os.replace(self.ruta_diario, self.ruta_anterior)
+        self._abrir()
+        self._entradas = 0
+
+        self._hilo = threading.Thread(target=self._escribir_foto, args=(filas,), daemon=True)
+        self._hilo.start()
+        if esperar:
+            self._hilo.join()
+        return True
+
+    def _escribir_foto(self, filas):
+        """
+        Escribe la foto en un archivo temporal y lo reemplaza de una vez
+        (se ejecuta en el hilo de compactación)
+        """
+        temporal = self.ruta_csv + ".tmp"
+        try:
+            with open(temporal, 'w', newline='', encoding='utf-8') as archivo:
+                escritor = csv.writer(archivo)
+                escritor.writerow(ENCABEZADO_CSV)
+                escritor.writerows(filas)
+                archivo.flush()
+                os.fsync(archivo.fileno())  # Nos aseguramos de que esté en disco
+            # os.replace es atómico: el CSV queda viejo o nuevo, nunca a medias
+            os.replace(temporal, self.ruta_csv)
+            # Instantánea binaria con los mismos datos, para arrancar más rápido
+            nombres, precios, cantidades = zip(*filas) if filas else ((), (), ())
+            guardar_instantanea_columnas(nombres, precios, cantidades, self.ruta_csv)
+            # La foto ya incluye el diario anterior: lo podemos borrar
+            if os.path.exists(self.ruta_anterior):
+                os.remove(self.ruta_anterior)
+        except OSError as e:
+            # El diario anterior se conserva: nada se pierde, se reintenta después
+            print(f"Error al compactar el diario: {e}")
+
+    # ---------- Cierre ----------
+
+    def cerrar(self):
+        """
+        Espera la compactación en curso (si hay) y cierra el diario
+        """
+        if self._hilo is not None:
+            self._hilo.join()
+        self._cerrar_archivo()
+        if self._inventario is not None:
+            self._inventario.desuscribir(self._registrar)
+            self._inventario = None
+
+    # ---------- Funciones internas ----------
+
+    def _abrir(self):
+        # newline='' igual que con los CSV normales
+        self._archivo = open(self.ruta_diario, 'a', newline='', encoding='utf-8')
+        self._escritor = csv.writer(self._archivo)
+
+    def _cerrar_archivo(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+            self._escritor = None
+
+    @staticmethod
+    def _ocurrencia(iguales, producto):
+        """
+        Posición de 'producto' (el mismo diccionario) entre los de su nombre
+        """
+        for n, otro in enumerate(iguales):
+            if otro is producto:
+                return n
+        return 0
+
+    def _reproducir(self, ruta, inventario):
+        """
+        Aplica las entradas de un diario sobre el inventario
+        Las líneas inválidas o incompletas (ej: corte de luz mientras se
+        escribía) se ignoran y se informa cuántas fueron
+        Retorna la cantidad de entradas aplicadas
+        """
+        if not os.path.exists(ruta):
+            return 0
+        aplicadas = 0
+        invalidas = 0
+        # surrogateescape: un byte dañado no corta la lectura, solo invalida su línea
+        with open(ruta, 'r', newline='', encoding='utf-8', errors='surrogateescape') as archivo:
+            lector = csv.reader(archivo)
+            while True:
+                try:
+                    fila = next(lector)
+                except StopIteration:
+                    break
+                except csv.Error:
+                    # Ej: un campo enorme por basura en el archivo
+                    invalidas += 1
+                    continue
+                try:
+                    if not self._aplicar_entrada(fila, inventario):
+                        invalidas += 1
+                        continue
+                except (IndexError, ValueError):
+                    invalidas += 1
+                    continue
+                aplicadas += 1
+        if invalidas:
+            print(f"Diario '{ruta}': se ignoraron {invalidas} líneas inválidas")
+        return aplicadas
+
+    def _aplicar_entrada(self, fila, inventario):
+        """
+        Aplica una línea del diario; retorna False si no tiene un formato válido
+        Lanza ValueError si algún valor no se puede convertir
+        """
+        if fila[0] == "A" and len(fila) in (4, 5):
+            nombre = fila[1]
+            # encode() falla si el nombre tiene bytes dañados (es un ValueError)
+            nombre.encode('utf-8')
+            precio, cantidad = float(fila[2]), int(fila[3])
+            n = int(fila[4]) if len(fila) == 5 else 0
+            if n:
+                iguales = inventario.buscar_todos(nombre)
+                producto = iguales[n] if n < len(iguales) else None
+            else:
+                producto = inventario.buscar(nombre)
+            if producto is None:
+                inventario.append({"nombre": nombre, "precio": precio, "cantidad": cantidad})
+            else:
+                inventario.actualizar(producto, precio, cantidad)
+        elif fila[0] == "D" and len(fila) == 2:
+            inventario.eliminar(fila[1])
+        elif fila[0] == "D" and len(fila) == 4:
+            n, total = int(fila[2]), int(fila[3])
+            iguales = inventario.buscar_todos(fila[1])
+            # Si ya no hay 'total' productos, la baja ya estaba en la foto
+            if len(iguales) == total and n < total:
+                inventario.remove(iguales[n])
+        else:
+            return False
+        return True
+
+
+def descartar_diario(ruta_csv):
+    """
+    Borra el diario de un CSV que se acaba de guardar sin usar el diario
+    (sus cambios ya están en el CSV y reaplicarlos pisaría datos más nuevos)
+    """
+    for ruta in (ruta_csv + ".diario", ruta_csv + ".diario.anterior"):
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error al descartar el diario '{ruta}': {e}")
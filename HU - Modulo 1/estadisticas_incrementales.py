@@ -0,0 +1,153 @@
+# Importamos heapq para mantener montículos (heaps) de máximos
+import heapq
+
+# =============================================
+# ESTADÍSTICAS INCREMENTALES DEL INVENTARIO
+# =============================================
+# En lugar de recorrer todo el inventario cada vez que se piden las
+# estadísticas, las vamos actualizando con cada alta, baja o cambio:
+# - Unidades: suma acumulada (en una baja o un cambio se resta lo que
+#   aportaba el producto y se suma lo nuevo: O(1) siempre)
+# - Valor total: suma acumulada mientras solo haya altas. Una baja o un
+#   cambio la marcan como pendiente y la próxima consulta la vuelve a sumar
+#   en orden. Restar floats arrastra redondeo, y ni siquiera una suma exacta
+#   da los mismos decimales que el recorrido original de izquierda a derecha
+# - Producto más caro / mayor stock: montículos de máximos con
+#   "borrado perezoso" (las entradas viejas se descartan al consultarlas)
+
+class EstadisticasInventario:
+    """
+    Acumulador de estadísticas que el Inventario mantiene al día
+    Recibe el diccionario secuencia -> producto del inventario dueño
+    """
+
+    def __init__(self, registros):
+        # Referencia a los productos del inventario (no es una copia)
+        self._registros = registros
+        # Sumas acumuladas
+        self._unidades = 0
+        self._valor = 0.0
+        # True si _valor quedó desactualizado por una baja o un cambio
+        self._valor_pendiente = False
+        # Versión actual de cada producto: cambia cada vez que se modifica
+        self._versiones = {}
+        # Montículos con entradas (-valor, secuencia, versión)
+        # El signo negativo convierte el heap de mínimos de Python en uno de máximos
+        self._heap_precio = []
+        self._heap_stock = []
+        # Los montículos se construyen recién en la primera consulta,
+        # así cargar un CSV grande no paga el costo de ordenarlos
+        self._heaps_listos = False
+
+    def registrar_alta(self, secuencia, producto):
+        """
+        Un producto nuevo entró al inventario
+        """
+        self._unidades += producto["cantidad"]
+        if not self._valor_pendiente:
+            # Las altas van al final: es el mismo paso que da el recorrido
+            self._valor += producto["precio"] * producto["cantidad"]
+        self._versiones[secuencia] = 0
+        if self._heaps_listos:
+            self._empujar(secuencia, producto, 0)
+
+    def registrar_baja(self, secuencia, producto):
+        """
+        Un producto salió del inventario
+        """
+        self._unidades -= producto["cantidad"]
+        self._valor_pendiente = True
+        # Sin versión, sus entradas en los montículos quedan inválidas
+        del self._versiones[secuencia]
+
+    def registrar_cambio(self, secuencia, cantidad_anterior, precio_anterior):
+        """
+        El precio y/o la cantidad de un producto cambiaron
+        """
+        producto = self._registros[secuencia]
+        self._unidades += producto["cantidad"] - cantidad_anterior
+        if producto["precio"] != precio_anterior or producto["cantidad"] != cantidad_anterior:
+            self._valor_pendiente = True
+        # Nueva versión: las entradas anteriores quedan inválidas
+        version = self._versiones[secuencia] + 1
+        self._versiones[secuencia] = version
+        if self._heaps_listos:
+            self._empujar(secuencia, producto, version)
+
+    def reiniciar(self):
+        """
+        Deja el acumulador como recién creado (inventario vacío)
+        """
+        self.__init__(self._registros)
+
+    def calcular(self):
+        """
+        Retorna el diccionario de estadísticas (mismo formato que calcular_estadisticas)
+        o None si el inventario está vacío
+        """
+        if not self._registros:
+            return None
+
+        if not self._heaps_listos:
+            self._construir_heaps()
+
+        if self._valor_pendiente:
+            self._sumar_valor()
+
+        mas_caro = self._registros[self._tope(self._heap_precio)]
+        mayor_stock = self._registros[self._tope(self._heap_stock)]
+
+        # Si los montículos acumulan demasiadas entradas viejas, los reconstruimos
+        if len(self._heap_precio) > 2 * len(self._registros) + 64:
+            self._construir_heaps()
+
+        return {
+            "unidades_totales": self._unidades,
+            "valor_total": self._valor,
+            "producto_mas_caro": {
+                "nombre": mas_caro["nombre"],
+                "precio": mas_caro["precio"]
+            },
+            "producto_mayor_stock": {
+                "nombre": mayor_stock["nombre"],
+                "cantidad": mayor_stock["cantidad"]
+            }
+        }
+
+    # ---------- Funciones internas ----------
+
+    def _empujar(self, secuencia, producto, version):
+        heapq.heappush(self._heap_precio, (-producto["precio"], secuencia, version))
+        heapq.heappush(self._heap_stock, (-producto["cantidad"], secuencia, version))
+
+    def _sumar_valor(self):
+        """
+        Vuelve a sumar el valor total en orden, igual que calcular_estadisticas
+        """
+        valor = 0.0
+        for producto in self._registros.values():
+            valor += producto["precio"] * producto["cantidad"]
+        self._valor = valor
+        self._valor_pendiente = False
+
+    def _construir_heaps(self):
+        """
+        Construye ambos montículos desde cero en O(n) con heapify
+        """
+        self._heap_precio = [(-p["precio"], s, self._versiones[s]) for s, p in self._registros.items()]
+        self._heap_stock = [(-p["cantidad"], s, self._versiones[s]) for s, p in self._registros.items()]
+        heapq.heapify(self._heap_precio)
+        heapq.heapify(self._heap_stock)
+        self._heaps_listos = True
+
+    def _tope(self, heap):
+        """
+        Retorna la secuencia del máximo válido, descartando entradas viejas
+        A igual valor gana la secuencia menor (el primero en el inventario),
+        igual que el recorrido original
+        """
+        while True:
+            _, secuencia, version = heap[0]
+            if self._versiones.get(secuencia) == version:
+                return secuencia
+            heapq.heappop(heap)  # Entrada vieja: la descartamos
@@ -0,0 +1,212 @@
+# csv para leer/escribir los archivos de inventario y las corridas temporales
+import csv
+# heapq.merge mezcla varios archivos ordenados leyendo una fila a la vez
+import heapq
+# groupby agrupa filas consecutivas con la misma clave
+from itertools import groupby
+import os
+import tempfile
+import time
+import argparse
+
+from archivos import ENCABEZADO_CSV, convertir_fila_csv, crear_resumen_errores, anotar_error, mostrar_resumen_carga
+from inventario_indexado import clave_producto
+
+# =============================================
+# FUSIÓN EXTERNA (INVENTARIOS MÁS GRANDES QUE LA MEMORIA)
+# =============================================
+# fusionar_inventarios necesita los dos inventarios cargados en memoria.
+# Aquí hacemos la misma fusión trabajando sobre disco:
+# 1) Cada CSV se lee por partes ("corridas") de tamaño fijo; cada corrida
+#    se ordena por nombre (sin distinguir mayúsculas) y se guarda en un
+#    archivo temporal.
+# 2) Las corridas se mezclan con heapq.merge, que solo mantiene en memoria
+#    una fila por archivo, y los dos inventarios ordenados se recorren a la
+#    par (merge-join), escribiendo el CSV resultante directamente.
+# La memoria usada depende del tamaño de corrida, no del tamaño de los archivos.
+#
+# Reglas de la fusión (parecidas a las de fusionar_inventarios):
+# - Si el producto ya existe en el actual: queda el último precio del nuevo
+#   y se suman todas las cantidades del nuevo.
+# - Si no existe: se agrega (los repetidos del nuevo se juntan en uno).
+# A diferencia de fusionar_inventarios, el CSV resultante queda ordenado
+# por nombre y no en el orden original, los repetidos del nuevo no se
+# agregan todos, y con repetidos en el actual se actualiza el primero.
+
+# Filas que se ordenan en memoria por corrida
+FILAS_POR_CORRIDA = 200000
+# Máximo de corridas abiertas a la vez al mezclar
+MAX_CORRIDAS_ABIERTAS = 64
+
+def _escribir_corrida(filas, directorio):
+    """
+    Ordena las filas y las guarda en un archivo temporal
+    Retorna la ruta del archivo
+    """
+    # Orden por (clave, orden original): así los repetidos conservan su orden
+    filas.sort()
+    descriptor, ruta = tempfile.mkstemp(suffix=".corrida", dir=directorio)
+    with os.fdopen(descriptor, 'w', newline='', encoding='utf-8') as archivo:
+        csv.writer(archivo).writerows(filas)
+    return ruta
+
+def _leer_corrida(ruta):
+    """
+    Generador que devuelve las filas de una corrida como tuplas tipadas
+    (clave, orden, nombre, precio, cantidad)
+    """
+    with open(ruta, 'r', newline='', encoding='utf-8') as archivo:
+        for clave, orden, nombre, precio, cantidad in csv.reader(archivo):
+            # repr() de un float se vuelve a leer exacto con float()
+            yield clave, int(orden), nombre, float(precio), int(cantidad)
+
+def _mezclar(rutas, directorio):
+    """
+    Retorna un generador con todas las filas de las corridas en orden
+    Si hay demasiadas corridas, primero las mezcla por grupos en disco
+    """
+    while len(rutas) > MAX_CORRIDAS_ABIERTAS:
+        grupo, rutas = rutas[:MAX_CORRIDAS_ABIERTAS], rutas[MAX_CORRIDAS_ABIERTAS:]
+        descriptor, ruta = tempfile.mkstemp(suffix=".corrida", dir=directorio)
+        with os.fdopen(descriptor, 'w', newline='', encoding='utf-8') as archivo:
+            csv.writer(archivo).writerows(heapq.merge(*(_leer_corrida(r) for r in grupo)))
+        for r in grupo:
+            os.remove(r)
+        rutas.append(ruta)
+    return heapq.merge(*(_leer_corrida(r) for r in rutas))
+
+def generar_corridas(ruta, directorio, resumen, filas_por_corrida=FILAS_POR_CORRIDA):
+    """
+    Lee un CSV de inventario y lo parte en corridas ordenadas
+    Retorna la lista de rutas de las corridas (los errores quedan en 'resumen')
+    """
+    corridas = []
+    filas = []
+    try:
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            lector = csv.reader(archivo)
+            encabezado = next(lector, None)
+            if encabezado != ENCABEZADO_CSV:
+                resumen["error"] = f"El archivo '{ruta}' no tiene el formato correcto."
+                return corridas
+            for numero_fila, fila in enumerate(lector, start=2):
+                valores, tipo_error, _ = convertir_fila_csv(fila)
+                if valores is None:
+                    anotar_error(resumen, tipo_error, numero_fila)
+                    continue
+                nombre, precio, cantidad = valores
+                # El número de fila sirve de "orden original" para desempatar
+                filas.append((clave_producto(nombre), numero_fila, nombre, precio, cantidad))
+                resumen["validas"] += 1
+                if len(filas) >= filas_por_corrida:
+                    corridas.append(_escribir_corrida(filas, directorio))
+                    filas = []
+        if filas:
+            corridas.append(_escribir_corrida(filas, directorio))
+    except FileNotFoundError:
+        resumen["error"] = f"El archivo '{ruta}' no existe."
+    except UnicodeDecodeError:
+        resumen["error"] = f"El archivo '{ruta}' no es UTF-8 válido."
+    except Exception as e:
+        # Cualquier otro error (directorio, permisos, CSV mal formado...) igual que cargar_csv
+        resumen["error"] = f"Ocurrió un error inesperado al cargar el archivo: {e}"
+    return corridas
+
+def _siguiente(grupos):
+    # next() que retorna None al terminar, para simplificar el merge-join
+    return next(grupos, None)
+
+def fusionar_csv_externo(ruta_actual, ruta_nueva, ruta_salida,
+                         filas_por_corrida=FILAS_POR_CORRIDA, directorio_temporal=None):
+    """
+    Fusiona dos CSV de inventario sin cargarlos en memoria y escribe el resultado
+    en ruta_salida (puede ser la misma ruta que ruta_actual)
+    Retorna un diccionario con el resumen, o None si hubo un error grave
+    """
+    inicio = time.perf_counter()
+    resumen_actual = crear_resumen_errores()
+    resumen_nuevo = crear_resumen_errores()
+    contadores = {"actualizados": 0, "agregados": 0, "escritos": 0}
+
+    with tempfile.TemporaryDirectory(dir=directorio_temporal) as directorio:
+        # 1) Partimos ambos archivos en corridas ordenadas
+        corridas_actual = generar_corridas(ruta_actual, directorio, resumen_actual, filas_por_corrida)
+        corridas_nuevo = generar_corridas(ruta_nueva, directorio, resumen_nuevo, filas_por_corrida)
+        for resumen in (resumen_actual, resumen_nuevo):
+            if resumen["error"]:
+                mostrar_resumen_carga(resumen)
+                return None
+
+        # 2) Recorremos los dos inventarios ordenados, agrupados por clave
+        grupos_actual = groupby(_mezclar(corridas_actual, directorio), key=lambda fila: fila[0])
+        grupos_nuevo = groupby(_mezclar(corridas_nuevo, directorio), key=lambda fila: fila[0])
+
+        temporal = ruta_salida + ".tmp"
+        with open(temporal, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(ENCABEZADO_CSV)
+
+            actual = _siguiente(grupos_actual)
+            nuevo = _siguiente(grupos_nuevo)
+            while actual is not None or nuevo is not None:
+                if nuevo is None or (actual is not None and actual[0] < nuevo[0]):
+                    # Solo está en el actual: se copia tal cual
+                    for _, _, nombre, precio, cantidad in actual[1]:
+                        escritor.writerow((nombre, precio, cantidad))
+                        contadores["escritos"] += 1
+                    actual = _siguiente(grupos_actual)
+                    continue
+
+                # Juntamos todas las filas del nuevo con esta clave:
+                # primer nombre, último precio y suma de cantidades
+                filas_nuevas = nuevo[1]
+                _, _, nombre_nuevo, precio_nuevo, cantidad_nueva = next(filas_nuevas)
+                for _, _, _, precio, cantidad in filas_nuevas:
+                    precio_nuevo = precio
+                    cantidad_nueva += cantidad
+
+                if actual is not None and actual[0] == nuevo[0]:
+                    # Existe en ambos: se actualiza el primero del actual
+                    filas_actuales = actual[1]
+                    _, _, nombre, _, cantidad = next(filas_actuales)
+                    escritor.writerow((nombre, precio_nuevo, cantidad + cantidad_nueva))
+                    contadores["actualizados"] += 1
+                    contadores["escritos"] += 1
+                    # Los repetidos del actual (si los hay) quedan igual
+                    for _, _, nombre, precio, cantidad in filas_actuales:
+                        escritor.writerow((nombre, precio, cantidad))
+                        contadores["escritos"] += 1
+                    actual = _siguiente(grupos_actual)
+                else:
+                    # Producto nuevo
+                    escritor.writerow((nombre_nuevo, precio_nuevo, cantidad_nueva))
+                    contadores["agregados"] += 1
+                    contadores["escritos"] += 1
+                nuevo = _siguiente(grupos_nuevo)
+
+        # Reemplazo atómico del archivo de salida
+        os.replace(temporal, ruta_salida)
+
+    duracion = time.perf_counter() - inicio
+    filas_leidas = (resumen_actual["validas"] + resumen_actual["invalidas"]
+                    + resumen_nuevo["validas"] + resumen_nuevo["invalidas"])
+    print(f"Fusión externa: {contadores['actualizados']} actualizados, {contadores['agregados']} agregados, "
+          f"{contadores['escritos']} productos escritos en '{ruta_salida}'")
+    print(f"Filas inválidas omitidas: {resumen_actual['invalidas']} (actual), {resumen_nuevo['invalidas']} (nuevo)")
+    print(f"Tiempo: {duracion:.2f} s ({filas_leidas / max(duracion, 1e-9):,.0f} filas/s)")
+    contadores["duracion"] = duracion
+    return contadores
+
+# Uso desde la terminal:
+#   python fusion_externa.py actual.csv nuevo.csv salida.csv
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fusiona dos inventarios CSV usando el disco")
+    parser.add_argument("actual", help="CSV del inventario actual")
+    parser.add_argument("nuevo", help="CSV con los productos a fusionar")
+    parser.add_argument("salida", help="CSV donde se escribe el resultado")
+    parser.add_argument("--filas-por-corrida", type=int, default=FILAS_POR_CORRIDA,
+                        help="filas que se ordenan en memoria a la vez")
+    parser.add_argument("--temporal", help="directorio para los archivos temporales")
+    argumentos = parser.parse_args()
+    fusionar_csv_externo(argumentos.actual, argumentos.nuevo, argumentos.salida,
+                         argumentos.filas_por_corrida, argumentos.temporal)
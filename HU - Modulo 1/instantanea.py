@@ -0,0 +1,188 @@
+# struct arma y lee la cabecera binaria con tamaños fijos
+import struct
+# mmap permite leer el archivo sin copiarlo completo a memoria
+import mmap
+import os
+# array guarda las columnas numéricas
+from array import array
+# accumulate calcula las posiciones de cada nombre en la tabla de strings
+from itertools import accumulate
+import sys
+
+from archivos import cargar_csv_en_bloques, cargar_csv_columnar, guardar_csv
+from inventario_indexado import Inventario
+from inventario_columnar import InventarioColumnar
+
+# =============================================
+# INSTANTÁNEA BINARIA DEL INVENTARIO
+# =============================================
+# Copia del inventario en formato binario que se guarda junto al CSV
+# (inventario.csv -> inventario.bin). Leerla es mucho más rápido que
+# parsear y validar el CSV fila por fila.
+#
+# Formato (todos los números en little-endian):
+#   Cabecera (48 bytes):
+#     magia          8 bytes  b"INVSNAP\0"
+#     versión        uint32
+#     reservado      uint32
+#     productos (n)  uint64
+#     bytes nombres  uint64
+#     tamaño del CSV uint64   \ del CSV recién guardado: la instantánea solo
+#     mtime del CSV  int64    / se usa si el CSV sigue teniendo esos valores
+#   Posiciones de los nombres   (n + 1) uint64
+#   Precios                     n float64
+#   Cantidades                  n int64
+#   Tabla de nombres            UTF-8, uno detrás de otro
+# Las columnas numéricas quedan alineadas a 8 bytes, así se pueden leer
+# directamente desde el archivo mapeado en memoria (mmap).
+
+MAGIA = b"INVSNAP\x00"
+VERSION = 2
+CABECERA = struct.Struct("<8sIIQQQq")
+
+def ruta_instantanea(ruta_csv):
+    """
+    Ruta de la instantánea que corresponde a un CSV (inventario.csv -> inventario.bin)
+    """
+    return os.path.splitext(ruta_csv)[0] + ".bin"
+
+def guardar_instantanea_columnas(nombres, precios, cantidades, ruta_csv):
+    """
+    Escribe la instantánea de 'ruta_csv' a partir de tres columnas
+    Hay que llamarla después de guardar el CSV: su tamaño y fecha quedan en la cabecera
+    Retorna True si se guardó correctamente
+    """
+    # Tabla de strings: todos los nombres codificados y concatenados
+    codificados = [nombre.encode("utf-8") for nombre in nombres]
+    posiciones = array('Q', [0])
+    posiciones.extend(accumulate(len(nombre) for nombre in codificados))
+    tabla = b"".join(codificados)
+    precios = precios if isinstance(precios, array) else array('d', precios)
+    cantidades = cantidades if isinstance(cantidades, array) else array('q', cantidades)
+
+    # El formato es little-endian: en máquinas big-endian invertimos los bytes
+    if sys.byteorder != "little":
+        posiciones, precios, cantidades = array('Q', posiciones), array('d', precios), array('q', cantidades)
+        for columna in (posiciones, precios, cantidades):
+            columna.byteswap()
+
+    ruta = ruta_instantanea(ruta_csv)
+    temporal = ruta + ".tmp"
+    try:
+        origen = os.stat(ruta_csv)
+        with open(temporal, "wb") as archivo:
+            archivo.write(CABECERA.pack(MAGIA, VERSION, 0, len(codificados), len(tabla),
+                                        origen.st_size, origen.st_mtime_ns))
+            posiciones.tofile(archivo)
+            precios.tofile(archivo)
+            cantidades.tofile(archivo)
+            archivo.write(tabla)
+        # Reemplazo atómico: nunca queda una instantánea a medio escribir
+        os.replace(temporal, ruta)
+        return True
+    except OSError as e:
+        print(f"Error al guardar la instantánea: {e}")
+        return False
+
+def guardar_instantanea(inventario, ruta_csv):
+    """
+    Escribe la instantánea de un Inventario o InventarioColumnar ya guardado en 'ruta_csv'
+    """
+    if isinstance(inventario, InventarioColumnar):
+        return guardar_instantanea_columnas(inventario.nombres, inventario.precios,
+                                            inventario.cantidades, ruta_csv)
+    return guardar_instantanea_columnas([p["nombre"] for p in inventario],
+                                        [p["precio"] for p in inventario],
+                                        [p["cantidad"] for p in inventario], ruta_csv)
+
+def cargar_instantanea(ruta, columnar=False, ruta_csv=None):
+    """
+    Lee una instantánea binaria
+    Con ruta_csv, solo se usa si ese CSV tiene el tamaño y la fecha anotados
+    al guardar la instantánea (si no, está vieja)
+    Retorna un Inventario (o InventarioColumnar si columnar=True),
+    o None si el archivo no existe, no es válido o está viejo
+    """
+    try:
+        with open(ruta, "rb") as archivo:
+            tamano = os.fstat(archivo.fileno()).st_size
+            if tamano < CABECERA.size:
+                print(f"Error: La instantánea '{ruta}' está incompleta.")
+                return None
+            # Archivo mapeado en memoria: el sistema operativo lee solo lo que usamos
+            with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                magia, version, _, n, bytes_nombres, tamano_csv, mtime_csv = CABECERA.unpack_from(mapa, 0)
+                if magia == MAGIA and version != VERSION:
+                    # Instantánea de otra versión del programa: se usa el CSV
+                    return None
+                if ruta_csv is not None:
+                    origen = os.stat(ruta_csv)
+                    if (origen.st_size, origen.st_mtime_ns) != (tamano_csv, mtime_csv):
+                        return None  # El CSV cambió después de la instantánea
+                inicio_posiciones = CABECERA.size
+                inicio_precios = inicio_posiciones + 8 * (n + 1)
+                inicio_cantidades = inicio_precios + 8 * n
+                inicio_nombres = inicio_cantidades + 8 * n
+                if magia != MAGIA or version != VERSION or tamano != inicio_nombres + bytes_nombres:
+                    print(f"Error: La instantánea '{ruta}' no tiene un formato válido.")
+                    return None
+
+                # Copiamos cada columna con una sola operación (sin parsear texto)
+                posiciones = array('Q', mapa[inicio_posiciones:inicio_precios])
+                precios = array('d', mapa[inicio_precios:inicio_cantidades])
+                cantidades = array('q', mapa[inicio_cantidades:inicio_nombres])
+                tabla = mapa[inicio_nombres:]
+
+        if sys.byteorder != "little":
+            for columna in (posiciones, precios, cantidades):
+                columna.byteswap()
+
+        # Si todos los nombres son ASCII, cada byte es un carácter: decodificamos
+        # la tabla una sola vez y cortamos el string directamente
+        texto = tabla.decode("utf-8")
+        fuente = texto if len(texto) == len(tabla) else None
+        if fuente is not None:
+            nombres = [fuente[posiciones[i]:posiciones[i + 1]] for i in range(n)]
+        else:
+            nombres = [tabla[posiciones[i]:posiciones[i + 1]].decode("utf-8") for i in range(n)]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        # ValueError incluye UnicodeDecodeError (tabla de nombres dañada)
+        print(f"Error al leer la instantánea: {e}")
+        return None
+
+    if columnar:
+        return InventarioColumnar.desde_columnas(nombres, precios, cantidades)
+    return Inventario({"nombre": nombre, "precio": precio, "cantidad": cantidad}
+                      for nombre, precio, cantidad in zip(nombres, precios, cantidades))
+
+def cargar_inventario_rapido(ruta_csv, columnar=False):
+    """
+    Carga el inventario usando la instantánea binaria si está al día
+    (el CSV tiene el tamaño y la fecha anotados en ella); si no, carga el CSV
+    Retorna el inventario, o None si no se pudo cargar
+    """
+    ruta_bin = ruta_instantanea(ruta_csv)
+    if os.path.exists(ruta_bin):
+        # Sin CSV la instantánea es lo único que hay: se usa sin comparar
+        origen = ruta_csv if os.path.exists(ruta_csv) else None
+        inventario = cargar_instantanea(ruta_bin, columnar, origen)
+        if inventario is not None:
+            print(f"Archivo cargado: {len(inventario)} productos desde la instantánea '{ruta_bin}'")
+            return inventario
+
+    # La instantánea no existe, está vieja o dañada: usamos el CSV
+    if columnar:
+        return cargar_csv_columnar(ruta_csv)
+    return cargar_csv_en_bloques(ruta_csv)
+
+def guardar_csv_con_instantanea(inventario, ruta):
+    """
+    Guarda el CSV y, si salió bien, también su instantánea binaria al lado
+    Retorna True si el CSV se guardó
+    """
+    if not guardar_csv(inventario, ruta):
+        return False
+    guardar_instantanea(inventario, ruta)
+    return True
@@ -0,0 +1,288 @@
+# Importamos array para guardar números en buffers compactos (8 bytes por valor)
+from array import array
+# reduce y operator nos permiten sumar en el mismo orden que un bucle for
+from functools import reduce
+import operator
+
+# NumPy es opcional: si está instalado, las operaciones se vectorizan
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from inventario_indexado import clave_producto
+
+# =============================================
+# INVENTARIO COLUMNAR
+# =============================================
+# Representación alternativa del inventario para volúmenes grandes:
+# en vez de un diccionario por producto, guardamos tres columnas
+# - nombres: lista de strings
+# - precios: array de floats ('d')
+# - cantidades: array de enteros de 64 bits ('q')
+# Un millón de productos ocupa unos pocos MB en las columnas numéricas
+# y las estadísticas se calculan con operaciones vectorizadas.
+
+class InventarioColumnar:
+    """
+    Inventario guardado por columnas con índice nombre -> posición
+    Al eliminar, el último producto ocupa el lugar del eliminado (O(1)),
+    por lo que el orden de los productos puede cambiar
+    """
+
+    def __init__(self, productos=None):
+        self.nombres = []
+        self.precios = array('d')
+        self.cantidades = array('q')
+        # Índice: clave del nombre -> posición en las columnas
+        self._indice = {}
+        # Clave -> cuántos productos más tienen ese mismo nombre (igual que Inventario)
+        self._repetidos = {}
+        # Funciones que quieren enterarse de cada cambio (ej: el índice de búsqueda)
+        self._observadores = []
+        if productos is not None:
+            self.extend(productos)
+
+    @classmethod
+    def desde_columnas(cls, nombres, precios, cantidades):
+        """
+        Crea el inventario directamente a partir de columnas ya armadas
+        """
+        inventario = cls()
+        inventario.nombres = nombres
+        inventario.precios = precios
+        inventario.cantidades = cantidades
+        for posicion, nombre in enumerate(nombres):
+            inventario._indexar(clave_producto(nombre), posicion)
+        return inventario
+
+    # ---------- Interfaz de lista ----------
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def __bool__(self):
+        return bool(self.nombres)
+
+    def __iter__(self):
+        # Los diccionarios se arman al vuelo solo para quien los necesite
+        for nombre, precio, cantidad in zip(self.nombres, self.precios, self.cantidades):
+            yield {"nombre": nombre, "precio": precio, "cantidad": cantidad}
+
+    def append(self, producto):
+        """
+        Agrega un producto (diccionario) al final de las columnas
+        """
+        self.agregar(producto["nombre"], producto["precio"], producto["cantidad"])
+
+    def extend(self, productos):
+        for producto in productos:
+            self.append(producto)
+
+    def copy(self):
+        return InventarioColumnar.desde_columnas(list(self.nombres), array('d', self.precios),
+                                                 array('q', self.cantidades))
+
+    # ---------- Operaciones por nombre ----------
+
+    def agregar(self, nombre, precio, cantidad):
+        """
+        Agrega un producto sin crear ningún diccionario
+        """
+        self._indexar(clave_producto(nombre), len(self.nombres))
+        self.nombres.append(nombre)
+        self.precios.append(precio)
+        self.cantidades.append(cantidad)
+        # El diccionario solo se arma si alguien escucha los cambios
+        if self._observadores:
+            self._avisar("alta", {"nombre": nombre, "precio": precio, "cantidad": cantidad})
+
+    def buscar(self, nombre):
+        """
+        Retorna una copia del producto como diccionario, o None si no existe
+        (modificar ese diccionario no cambia el inventario: usar actualizar())
+        """
+        posicion = self._indice.get(clave_producto(nombre))
+        if posicion is None:
+            return None
+        return {"nombre": self.nombres[posicion], "precio": self.precios[posicion],
+                "cantidad": self.cantidades[posicion]}
+
+    def actualizar(self, producto, nuevo_precio=None, nueva_cantidad=None):
+        """
+        Cambia precio y/o cantidad del producto con el nombre de 'producto'
+        """
+        posicion = self._indice[clave_producto(producto["nombre"])]
+        if nuevo_precio is not None:
+            self.precios[posicion] = producto["precio"] = nuevo_precio
+        if nueva_cantidad is not None:
+            self.cantidades[posicion] = producto["cantidad"] = nueva_cantidad
+        self._avisar("cambio", producto)
+
+    def eliminar(self, nombre):
+        """
+        Elimina el producto con ese nombre y lo retorna como diccionario (o None)
+        """
+        clave = clave_producto(nombre)
+        posicion = self._indice.get(clave)
+        if posicion is None:
+            return None
+        producto = self.buscar(nombre)
+        del self._indice[clave]
+
+        # Movemos el último producto al hueco y acortamos las columnas
+        ultima = len(self.nombres) - 1
+        if posicion != ultima:
+            nombre_ultimo = self.nombres[ultima]
+            self.nombres[posicion] = nombre_ultimo
+            self.precios[posicion] = self.precios[ultima]
+            self.cantidades[posicion] = self.cantidades[ultima]
+            if self._indice.get(clave_producto(nombre_ultimo)) == ultima:
+                self._indice[clave_producto(nombre_ultimo)] = posicion
+        self.nombres.pop()
+        self.precios.pop()
+        self.cantidades.pop()
+
+        # Si había otro producto con el mismo nombre, el índice pasa a
+        # apuntar a él (solo se recorre si este nombre está repetido: caso raro, O(n))
+        if self._repetidos.get(clave):
+            self._repetidos[clave] -= 1
+            if not self._repetidos[clave]:
+                del self._repetidos[clave]
+            for otra_posicion, otro_nombre in enumerate(self.nombres):
+                if clave_producto(otro_nombre) == clave:
+                    self._indice[clave] = otra_posicion
+                    break
+        self._avisar("baja", producto)
+        return producto
+
+    # ---------- Observadores ----------
+
+    def suscribir(self, funcion):
+        """
+        Registra una función que se llamará como funcion(evento, producto)
+        después de cada cambio. Eventos: "alta", "baja", "cambio" (igual que
+        Inventario; 'producto' es una copia en forma de diccionario)
+        """
+        self._observadores.append(funcion)
+
+    def desuscribir(self, funcion):
+        """
+        Deja de avisar a una función registrada con suscribir()
+        """
+        if funcion in self._observadores:
+            self._observadores.remove(funcion)
+
+    # ---------- Operaciones vectorizadas ----------
+
+    def valoracion(self):
+        """
+        Retorna el valor (precio * cantidad) de cada producto
+        Con NumPy es un ndarray; sin NumPy, un array('d')
+        """
+        if np is not None:
+            return self._precios_np() * self._cantidades_np()
+        return array('d', map(operator.mul, self.precios, self.cantidades))
+
+    def filtrar(self, precio_min=None, precio_max=None, cantidad_min=None, cantidad_max=None):
+        """
+        Retorna un nuevo InventarioColumnar solo con los productos que cumplen
+        todos los límites indicados (los límites son inclusivos)
+        """
+        if np is not None:
+            precios = self._precios_np()
+            cantidades = self._cantidades_np()
+            # Máscara booleana: una comparación por columna, sin bucles de Python
+            mascara = np.ones(len(self.nombres), dtype=bool)
+            if precio_min is not None:
+                mascara &= precios >= precio_min
+            if precio_max is not None:
+                mascara &= precios <= precio_max
+            if cantidad_min is not None:
+                mascara &= cantidades >= cantidad_min
+            if cantidad_max is not None:
+                mascara &= cantidades <= cantidad_max
+            posiciones = np.flatnonzero(mascara)
+            return InventarioColumnar.desde_columnas(
+                [self.nombres[i] for i in posiciones],
+                # Pasando bytes, array copia el buffer de una sola vez
+                array('d', precios[posiciones].tobytes()),
+                array('q', cantidades[posiciones].tobytes())
+            )
+
+        posiciones = [
+            i for i, (precio, cantidad) in enumerate(zip(self.precios, self.cantidades))
+            if (precio_min is None or precio >= precio_min)
+            and (precio_max is None or precio <= precio_max)
+            and (cantidad_min is None or cantidad >= cantidad_min)
+            and (cantidad_max is None or cantidad <= cantidad_max)
+        ]
+        return InventarioColumnar.desde_columnas(
+            [self.nombres[i] for i in posiciones],
+            array('d', (self.precios[i] for i in posiciones)),
+            array('q', (self.cantidades[i] for i in posiciones))
+        )
+
+    def calcular_estadisticas(self):
+        """
+        Retorna las estadísticas con el mismo formato que servicios.calcular_estadisticas
+        o None si el inventario está vacío
+        """
+        if not self.nombres:
+            return None
+
+        if np is not None:
+            precios = self._precios_np()
+            cantidades = self._cantidades_np()
+            unidades = int(cantidades.sum())
+            # cumsum suma de izquierda a derecha, igual que el bucle original,
+            # así el valor total coincide exactamente (np.sum usa otro orden)
+            valor = float(np.cumsum(precios * cantidades)[-1])
+            # argmax retorna la primera posición del máximo (igual que el bucle)
+            mas_caro = int(np.argmax(precios))
+            mayor_stock = int(np.argmax(cantidades))
+        else:
+            unidades = sum(self.cantidades)
+            valor = reduce(operator.add, map(operator.mul, self.precios, self.cantidades), 0.0)
+            # max() con key también se queda con la primera posición del máximo
+            mas_caro = max(range(len(self.precios)), key=self.precios.__getitem__)
+            mayor_stock = max(range(len(self.cantidades)), key=self.cantidades.__getitem__)
+
+        return {
+            "unidades_totales": unidades,
+            "valor_total": valor,
+            "producto_mas_caro": {
+                "nombre": self.nombres[mas_caro],
+                "precio": self.precios[mas_caro]
+            },
+            "producto_mayor_stock": {
+                "nombre": self.nombres[mayor_stock],
+                "cantidad": self.cantidades[mayor_stock]
+            }
+        }
+
+    # ---------- Funciones internas ----------
+
+    def _indexar(self, clave, posicion):
+        """
+        Indexa un producto nuevo; si el nombre ya existe, el índice sigue
+        apuntando al primero y solo se cuenta el repetido
+        """
+        if clave in self._indice:
+            self._repetidos[clave] = self._repetidos.get(clave, 0) + 1
+        else:
+            self._indice[clave] = posicion
+
+    def _avisar(self, evento, producto):
+        """
+        Avisa del cambio a todas las funciones suscritas
+        """
+        for funcion in self._observadores:
+            funcion(evento, producto)
+
+    def _precios_np(self):
+        # frombuffer crea una vista sobre el array sin copiar los datos
+        return np.frombuffer(self.precios, dtype=np.float64)
+
+    def _cantidades_np(self):
+        return np.frombuffer(self.cantidades, dtype=np.int64)
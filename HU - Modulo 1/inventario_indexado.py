@@ -0,0 +1,237 @@
+# =============================================
+# INVENTARIO INDEXADO POR NOMBRE
+# =============================================
+# Contenedor que se comporta como la lista de productos de siempre
+# (se puede recorrer, medir con len(), hacer append/remove...) pero que
+# además mantiene un índice nombre_en_minúsculas -> producto.
+# Así buscar, actualizar y eliminar cuestan O(1) en lugar de recorrer
+# toda la lista.
+# También lleva las estadísticas al día (ver estadisticas_incrementales.py).
+
+# Importamos el acumulador de estadísticas que se actualiza con cada cambio
+from estadisticas_incrementales import EstadisticasInventario
+
+def clave_producto(nombre):
+    """
+    Normaliza un nombre para usarlo como clave del índice
+    casefold() es como lower() pero también maneja casos especiales (ß -> ss)
+    """
+    return nombre.casefold()
+
+class Inventario:
+    """
+    Inventario que conserva el orden de inserción y un índice por nombre
+    Internamente cada producto recibe un número de secuencia único:
+    - _registros: secuencia -> producto (un dict conserva el orden de inserción)
+    - _indice: clave del nombre -> secuencia del primer producto con ese nombre
+    """
+
+    def __init__(self, productos=None):
+        # Diccionario ordenado con todos los productos
+        self._registros = {}
+        # Índice para búsquedas rápidas por nombre
+        self._indice = {}
+        # Cuántos productos repetidos (mismo nombre) hay por clave
+        # Solo ocurre si se cargan CSV con nombres duplicados
+        self._repetidos = {}
+        # Secuencia del producto por id() del diccionario, para remove() en O(1)
+        self._secuencia_de = {}
+        # Contador para asignar secuencias nuevas
+        self._siguiente = 0
+        # Estadísticas mantenidas de forma incremental
+        self.estadisticas = EstadisticasInventario(self._registros)
+        # Funciones que quieren enterarse de cada cambio (ej: el diario)
+        self._observadores = []
+        # Si recibimos productos iniciales, los agregamos en orden
+        if productos is not None:
+            self.extend(productos)
+
+    # ---------- Interfaz de lista ----------
+
+    def __iter__(self):
+        # Recorremos los productos en el orden en que se agregaron
+        return iter(self._registros.values())
+
+    def __len__(self):
+        return len(self._registros)
+
+    def __bool__(self):
+        return bool(self._registros)
+
+    def __contains__(self, producto):
+        return id(producto) in self._secuencia_de
+
+    def __getitem__(self, posicion):
+        # Acceso por posición (inventario[0], inventario[-1], inventario[1:3])
+        # Es O(n) porque no guardamos posiciones, pero casi no se usa
+        return list(self._registros.values())[posicion]
+
+    def __eq__(self, otro):
+        # Permite comparar contra listas normales de productos
+        return list(self) == list(otro)
+
+    def __repr__(self):
+        return f"Inventario({list(self)!r})"
+
+    def append(self, producto):
+        """
+        Agrega un producto al final y lo registra en el índice
+        """
+        secuencia = self._siguiente
+        self._siguiente += 1
+        self._registros[secuencia] = producto
+        self._secuencia_de[id(producto)] = secuencia
+
+        clave = clave_producto(producto["nombre"])
+        if clave in self._indice:
+            # Ya existe un producto con ese nombre: el índice sigue apuntando
+            # al primero (igual que la búsqueda lineal original)
+            self._repetidos[clave] = self._repetidos.get(clave, 0) + 1
+        else:
+            self._indice[clave] = secuencia
+        self.estadisticas.registrar_alta(secuencia, producto)
+        self._avisar("alta", producto)
+
+    def extend(self, productos):
+        """
+        Agrega varios productos al final
+        """
+        for producto in productos:
+            self.append(producto)
+
+    def remove(self, producto):
+        """
+        Elimina un producto concreto (el mismo diccionario) del inventario
+        """
+        secuencia = self._secuencia_de.get(id(producto))
+        if secuencia is None:
+            # Mismo mensaje que list.remove() cuando no encuentra el elemento
+            raise ValueError("Inventario.remove(x): x not in inventario")
+        self._quitar(secuencia)
+
+    def copy(self):
+        """
+        Retorna una copia superficial (los productos son los mismos diccionarios)
+        """
+        return Inventario(self)
+
+    def clear(self):
+        """
+        Vacía el inventario por completo
+        """
+        self._registros.clear()
+        self._indice.clear()
+        self._repetidos.clear()
+        self._secuencia_de.clear()
+        self.estadisticas.reiniciar()
+        self._avisar("vaciado", None)
+
+    # ---------- Operaciones por nombre ----------
+
+    def buscar(self, nombre):
+        """
+        Retorna el producto con ese nombre (sin distinguir mayúsculas) o None
+        """
+        secuencia = self._indice.get(clave_producto(nombre))
+        if secuencia is None:
+            return None
+        return self._registros[secuencia]
+
+    def buscar_todos(self, nombre):
+        """
+        Retorna la lista de productos con ese nombre, en orden
+        Solo recorre el inventario si el nombre está repetido (caso raro)
+        """
+        clave = clave_producto(nombre)
+        if not self._repetidos.get(clave):
+            producto = self.buscar(nombre)
+            return [] if producto is None else [producto]
+        return [p for p in self._registros.values() if clave_producto(p["nombre"]) == clave]
+
+    def eliminar(self, nombre):
+        """
+        Elimina el producto con ese nombre
+        Retorna el producto eliminado, o None si no existía
+        """
+        secuencia = self._indice.get(clave_producto(nombre))
+        if secuencia is None:
+            return None
+        return self._quitar(secuencia)
+
+    def actualizar(self, producto, nuevo_precio=None, nueva_cantidad=None):
+        """
+        Cambia el precio y/o la cantidad de un producto del inventario
+        Hay que usar este método (y no modificar el diccionario directamente)
+        para que las estadísticas se mantengan correctas
+        """
+        secuencia = self._secuencia_de[id(producto)]
+        cantidad_anterior = producto["cantidad"]
+        precio_anterior = producto["precio"]
+        if nuevo_precio is not None:
+            producto["precio"] = nuevo_precio
+        if nueva_cantidad is not None:
+            producto["cantidad"] = nueva_cantidad
+        self.estadisticas.registrar_cambio(secuencia, cantidad_anterior, precio_anterior)
+        self._avisar("cambio", producto)
+
+    # ---------- Observadores ----------
+
+    def suscribir(self, funcion):
+        """
+        Registra una función que se llamará como funcion(evento, producto)
+        después de cada cambio. Eventos: "alta", "baja", "cambio", "vaciado"
+        Si el nombre del producto está repetido, antes de la "baja" llega
+        "antes_de_baja" (el producto todavía está en el inventario)
+        """
+        self._observadores.append(funcion)
+
+    def desuscribir(self, funcion):
+        """
+        Deja de avisar a una función registrada con suscribir()
+        """
+        if funcion in self._observadores:
+            self._observadores.remove(funcion)
+
+    # ---------- Funciones internas ----------
+
+    def _quitar(self, secuencia):
+        """
+        Quita el producto con esa secuencia y mantiene el índice sincronizado
+        """
+        producto = self._registros[secuencia]
+        clave = clave_producto(producto["nombre"])
+        if self._repetidos.get(clave):
+            # Con nombres repetidos hay que saber cuál de ellos se quita
+            self._avisar("antes_de_baja", producto)
+
+        del self._registros[secuencia]
+        del self._secuencia_de[id(producto)]
+        self.estadisticas.registrar_baja(secuencia, producto)
+
+        if self._indice.get(clave) == secuencia:
+            del self._indice[clave]
+            # Si había otro producto con el mismo nombre, el índice pasa a
+            # apuntar al siguiente en orden (caso raro, por eso es O(n))
+            if self._repetidos.get(clave):
+                self._repetidos[clave] -= 1
+                if not self._repetidos[clave]:
+                    del self._repetidos[clave]
+                for otra_secuencia, otro in self._registros.items():
+                    if clave_producto(otro["nombre"]) == clave:
+                        self._indice[clave] = otra_secuencia
+                        break
+        elif self._repetidos.get(clave):
+            # Era uno de los duplicados que no estaba en el índice
+            self._repetidos[clave] -= 1
+            if not self._repetidos[clave]:
+                del self._repetidos[clave]
+
+        self._avisar("baja", producto)
+        return producto
+
+    def _avisar(self, evento, producto):
+        """
+        Avisa del cambio a todas las funciones suscritas
+        """
+        for funcion in self._observadores:
+            funcion(evento, producto)
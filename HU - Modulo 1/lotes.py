@@ -0,0 +1,221 @@
+# shlex separa cada línea en palabras respetando comillas ("Café molido")
+import shlex
+# os.devnull es el "archivo vacío" donde descartamos los mensajes
+import os
+# redirect_stdout desvía los print() mientras corre cada operación
+from contextlib import redirect_stdout
+# perf_counter mide tiempos con alta precisión
+import time
+
+from servicios import *
+from archivos import *
+from instantanea import guardar_csv_con_instantanea
+from diario import descartar_diario
+from presentacion import interpretar_orden
+
+# =============================================
+# MODO POR LOTES (SIN MENÚ)
+# =============================================
+# Ejecuta una secuencia de comandos, uno por línea, usando las mismas
+# funciones de servicios/archivos que el menú interactivo. Sirve para
+# automatizar tareas y para medir cuánto tarda cada operación.
+#
+# Comandos disponibles (las líneas vacías y las que empiezan con # se ignoran):
+#   add NOMBRE PRECIO CANTIDAD
+#   update NOMBRE PRECIO CANTIDAD   (usar - para no cambiar un valor)
+#   delete NOMBRE
+#   search NOMBRE
+#   stats
+#   list [LIMITE] [DESDE] [ORDEN]   (ej: list 20 0 -precio; ORDEN: nombre, precio, cantidad)
+#   save [RUTA]                     (por defecto inventario.csv)
+#   load [RUTA]                     (reemplaza el inventario)
+#   merge [RUTA]                    (fusiona con el inventario actual)
+# Los nombres con espacios van entre comillas: add "Café molido" 12.5 3
+
+# Comandos que entiende ejecutar_comando (los demás son un error de la línea)
+COMANDOS = ("add", "update", "delete", "search", "stats", "list", "save", "load", "merge")
+
+# Cuántos errores se muestran en detalle al final
+MAX_ERRORES_MOSTRADOS = 10
+
+def _numero(valor, tipo):
+    """
+    Convierte un valor del lote con la validación de siempre
+    '-' significa "no cambiar" y retorna None
+    Lanza ValueError si el valor no es válido
+    """
+    if valor == "-":
+        return None
+    numero = validar_numero_positivo(valor, tipo)
+    if numero is None:
+        raise ValueError(f"'{valor}' no es un {tipo} válido")
+    return numero
+
+def ejecutar_comando(comando, argumentos, inventario, diario=None):
+    """
+    Ejecuta un comando del lote
+    Retorna (inventario, filas procesadas)
+    Lanza ValueError si el comando o sus argumentos no son válidos
+    """
+    if comando == "add":
+        if len(argumentos) != 3:
+            raise ValueError("uso: add NOMBRE PRECIO CANTIDAD")
+        nombre = argumentos[0].strip()
+        if not nombre or buscar_producto(inventario, nombre):
+            raise ValueError(f"el producto '{nombre}' está vacío o ya existe")
+        precio = _numero(argumentos[1], "precio")
+        cantidad = _numero(argumentos[2], "entero")
+        if precio is None or cantidad is None:
+            raise ValueError("add necesita precio y cantidad")
+        agregar_producto(inventario, nombre.capitalize(), precio, cantidad)
+        return inventario, 1
+
+    if comando == "update":
+        if len(argumentos) != 3:
+            raise ValueError("uso: update NOMBRE PRECIO CANTIDAD")
+        precio = _numero(argumentos[1], "precio")
+        cantidad = _numero(argumentos[2], "entero")
+        if not actualizar_producto(inventario, argumentos[0], precio, cantidad):
+            raise ValueError(f"producto '{argumentos[0]}' no encontrado")
+        return inventario, 1
+
+    if comando == "delete":
+        if len(argumentos) != 1:
+            raise ValueError("uso: delete NOMBRE")
+        if not eliminar_producto(inventario, argumentos[0]):
+            raise ValueError(f"producto '{argumentos[0]}' no encontrado")
+        return inventario, 1
+
+    if comando == "search":
+        if len(argumentos) != 1:
+            raise ValueError("uso: search NOMBRE")
+        buscar_producto(inventario, argumentos[0])
+        return inventario, 1
+
+    if comando == "stats":
+        calcular_estadisticas(inventario)
+        return inventario, len(inventario)
+
+    if comando == "list":
+        if len(argumentos) > 3:
+            raise ValueError("uso: list [LIMITE] [DESDE] [ORDEN]")
+        limite = _numero(argumentos[0], "entero") if len(argumentos) > 0 else None
+        desde = (_numero(argumentos[1], "entero") if len(argumentos) > 1 else None) or 0
+        orden = interpretar_orden(argumentos[2]) if len(argumentos) > 2 else (None, False)
+        if orden is None:
+            raise ValueError(f"no se puede ordenar por '{argumentos[2]}'")
+        mostrar_inventario(inventario, limite, desde, *orden)
+        # Filas procesadas: las que se mostraron
+        mostrados = max(len(inventario) - desde, 0)
+        return inventario, mostrados if limite is None else min(limite, mostrados)
+
+    # Los comandos de archivos reciben una ruta opcional
+    ruta = argumentos[0] if argumentos else "inventario.csv"
+
+    if comando == "save":
+        if diario is not None and ruta == diario.ruta_csv:
+            diario.compactar(esperar=True)
+        elif guardar_csv_con_instantanea(inventario, ruta):
+            # El diario viejo de ese CSV ya no corresponde a lo guardado
+            descartar_diario(ruta)
+        else:
+            raise ValueError(f"no se pudo guardar en '{ruta}'")
+        return inventario, len(inventario)
+
+    if comando in ("load", "merge"):
+        cargado = cargar_csv_en_bloques(ruta)
+        if cargado is None:
+            raise ValueError(f"no se pudo cargar '{ruta}'")
+        if comando == "merge":
+            cargado = fusionar_inventarios(inventario, cargado)
+        # Con --columnar el inventario sigue siendo columnar después de cargar
+        if isinstance(inventario, InventarioColumnar):
+            cargado = InventarioColumnar(cargado)
+        # El diario pasa a seguir al inventario nuevo
+        if diario is not None:
+            diario.conectar(cargado)
+        return cargado, len(cargado)
+
+    raise ValueError(f"comando desconocido '{comando}'")
+
+def ejecutar_lote(lineas, inventario, diario=None):
+    """
+    Ejecuta todas las líneas del lote sin mostrar los mensajes de cada operación
+    Retorna (inventario final, métricas) donde métricas es un diccionario
+    comando -> {"cantidad", "errores", "filas", "tiempo_total", "tiempo_max"}
+    más la lista de errores (número de línea, mensaje)
+    """
+    metricas = {}
+    errores = []
+    inicio_lote = time.perf_counter()
+
+    # Todos los print() de servicios/archivos van a os.devnull
+    with open(os.devnull, 'w', encoding='utf-8') as nulo, redirect_stdout(nulo):
+        for numero_linea, linea in enumerate(lineas, start=1):
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue  # Línea vacía o comentario
+
+            try:
+                partes = shlex.split(linea)
+            except ValueError as e:
+                # Por ejemplo, comillas sin cerrar
+                errores.append((numero_linea, str(e)))
+                continue
+            comando, argumentos = partes[0].lower(), partes[1:]
+            # Un comando desconocido no se mide: solo se anota el error
+            if comando not in COMANDOS:
+                errores.append((numero_linea, f"comando desconocido '{comando}'"))
+                continue
+
+            datos = metricas.setdefault(comando, {"cantidad": 0, "errores": 0, "filas": 0,
+                                                  "tiempo_total": 0.0, "tiempo_max": 0.0})
+            inicio = time.perf_counter()
+            try:
+                inventario, filas = ejecutar_comando(comando, argumentos, inventario, diario)
+                datos["filas"] += filas
+            except ValueError as e:
+                datos["errores"] += 1
+                errores.append((numero_linea, str(e)))
+            except Exception as e:
+                # Un error inesperado no corta el lote: se anota con su tipo
+                datos["errores"] += 1
+                errores.append((numero_linea, f"error inesperado ({type(e).__name__}): {e}"))
+            duracion = time.perf_counter() - inicio
+
+            datos["cantidad"] += 1
+            datos["tiempo_total"] += duracion
+            datos["tiempo_max"] = max(datos["tiempo_max"], duracion)
+
+    metricas_lote = {
+        "comandos": metricas,
+        "errores": errores,
+        "tiempo_total": time.perf_counter() - inicio_lote
+    }
+    return inventario, metricas_lote
+
+def mostrar_reporte_lote(metricas_lote):
+    """
+    Muestra el resumen de operaciones, tiempos y errores del lote
+    """
+    print("\n--- REPORTE DEL LOTE ---")
+    print(f"{'Comando':<10} {'Cant.':>8} {'Errores':>8} {'Filas':>10} {'Total (s)':>10} {'Prom. (ms)':>11} {'Máx. (ms)':>10}")
+    total_operaciones = 0
+    for comando, datos in sorted(metricas_lote["comandos"].items()):
+        total_operaciones += datos["cantidad"]
+        promedio = datos["tiempo_total"] / datos["cantidad"] * 1000
+        print(f"{comando:<10} {datos['cantidad']:>8} {datos['errores']:>8} {datos['filas']:>10} "
+              f"{datos['tiempo_total']:>10.3f} {promedio:>11.3f} {datos['tiempo_max'] * 1000:>10.3f}")
+
+    duracion = metricas_lote["tiempo_total"]
+    print(f"Total: {total_operaciones} operaciones en {duracion:.3f} s "
+          f"({total_operaciones / max(duracion, 1e-9):,.0f} operaciones/s)")
+
+    errores = metricas_lote["errores"]
+    if errores:
+        print(f"Errores ({len(errores)}):")
+        for numero_linea, mensaje in errores[:MAX_ERRORES_MOSTRADOS]:
+            print(f"  Línea {numero_linea}: {mensaje}")
+        if len(errores) > MAX_ERRORES_MOSTRADOS:
+            print("  ...")
+    print("------------------------")
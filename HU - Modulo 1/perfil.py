@@ -0,0 +1,322 @@
+# time.perf_counter mide tiempos con alta precisión
+import time
+# functools.wraps conserva el nombre de la función envuelta
+import functools
+# inspect distingue funciones normales de generadores
+import inspect
+# json para el reporte legible por programas
+import json
+# atexit guarda el reporte al salir del programa
+import atexit
+# signal permite pedir el reporte desde otra terminal (kill -USR1 <pid>)
+import signal
+import threading
+import random
+import os
+import sys
+from datetime import datetime
+
+import servicios
+import archivos
+from inventario_indexado import Inventario
+from inventario_columnar import InventarioColumnar
+
+# =============================================
+# PERFILADO DE OPERACIONES (OPCIONAL)
+# =============================================
+# Mide cada llamada a las funciones públicas de servicios y archivos y a
+# ejecutar_opcion del menú: cantidad de llamadas, errores, filas procesadas
+# e histograma de latencias (p50/p95/p99). Sirve para saber si la lentitud
+# viene de leer el CSV, de buscar o de mostrar los datos.
+#
+# Solo se activa con activar() (en app.py: python app.py --perfil). Mientras
+# está desactivado no se envuelve ninguna función, así que no cuesta nada.
+#
+# Los tiempos son "inclusivos": si mostrar_estadisticas llama a
+# calcular_estadisticas, el tiempo de la segunda también cuenta en la primera.
+# Filas procesadas: el largo del inventario que retorna la función; para las
+# que recorren todo el inventario recibido, su largo; para las que trabajan
+# con un solo producto, 1 si lo encontraron.
+# Las funciones que se llaman una vez por fila del CSV no se envuelven: su
+# costo ya queda dentro de la función de carga que las usa.
+
+# Límites de los grupos del histograma, en segundos (serie 1-2-5 de 1 µs a 100 s)
+LIMITES_HISTOGRAMA = [float(f"{base}e{exponente}") for exponente in range(-6, 2) for base in (1, 2, 5)] + [100.0]
+# Muestras que se guardan por función para calcular percentiles
+MAX_MUESTRAS = 10000
+# Percentiles que se informan
+PERCENTILES = (50, 95, 99)
+
+# Tipos que cuentan como "inventario" al contar filas
+TIPOS_INVENTARIO = (Inventario, InventarioColumnar, list)
+# Funciones que recorren todo el inventario que reciben
+RECORREN_INVENTARIO = {"mostrar_inventario", "calcular_estadisticas", "mostrar_estadisticas", "guardar_csv"}
+# Funciones que se llaman por cada fila (medirlas costaría más que ejecutarlas)
+NO_MEDIDAS = {"validar_fila_csv", "convertir_fila_csv", "anotar_error", "crear_resumen_errores",
+              "leer_parcial_csv", "combinar_parciales", "leer_grupo_csv", "combinar_pareja"}
+
+class MetricasFuncion:
+    """
+    Métricas acumuladas de una función
+    """
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.filas = 0
+        self.tiempo_total = 0.0
+        self.tiempo_max = 0.0
+        self.grupos = [0] * (len(LIMITES_HISTOGRAMA) + 1)  # El último es "más de 100 s"
+        # Muestreo de reservorio: con muchas llamadas guardamos una muestra
+        # al azar de tamaño fijo, así la memoria no crece
+        self.muestras = []
+
+    def registrar(self, duracion, filas, error):
+        self.llamadas += 1
+        self.errores += error
+        self.filas += filas
+        self.tiempo_total += duracion
+        self.tiempo_max = max(self.tiempo_max, duracion)
+
+        # Grupo del histograma (hay pocos límites: una búsqueda lineal alcanza)
+        grupo = 0
+        while grupo < len(LIMITES_HISTOGRAMA) and duracion > LIMITES_HISTOGRAMA[grupo]:
+            grupo += 1
+        self.grupos[grupo] += 1
+
+        if len(self.muestras) < MAX_MUESTRAS:
+            self.muestras.append(duracion)
+        else:
+            posicion = random.randrange(self.llamadas)
+            if posicion < MAX_MUESTRAS:
+                self.muestras[posicion] = duracion
+
+    def percentil(self, p):
+        """
+        Percentil p (0-100) de las latencias, en segundos
+        """
+        if not self.muestras:
+            return 0.0
+        ordenadas = sorted(self.muestras)
+        posicion = min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))
+        return ordenadas[posicion]
+
+    def como_diccionario(self):
+        datos = {
+            "llamadas": self.llamadas,
+            "errores": self.errores,
+            "filas": self.filas,
+            "tiempo_total": self.tiempo_total,
+            "tiempo_max": self.tiempo_max,
+        }
+        for p in PERCENTILES:
+            datos[f"p{p}"] = self.percentil(p)
+        datos["histograma"] = {str(limite): cantidad for limite, cantidad in zip(LIMITES_HISTOGRAMA + ["+Inf"], self.grupos)}
+        return datos
+
+# Estado del perfilado
+_metricas = {}                # nombre de la función -> MetricasFuncion
+_candado = threading.Lock()   # El diario compacta en otro hilo
+_reemplazos = []              # (espacio de nombres, nombre, función original) para desactivar()
+_prefijo = None               # Prefijo de los archivos de reporte, o None si está desactivado
+
+def _contar_filas(resultado, argumentos, recorre):
+    if isinstance(resultado, TIPOS_INVENTARIO):
+        return len(resultado)
+    if recorre and argumentos and isinstance(argumentos[0], TIPOS_INVENTARIO):
+        return len(argumentos[0])
+    # Un producto encontrado o una operación exitosa cuenta como una fila
+    return 1 if resultado is True or isinstance(resultado, dict) else 0
+
+def _registrar(nombre, duracion, filas, error):
+    with _candado:
+        metricas = _metricas.get(nombre)
+        if metricas is None:
+            metricas = _metricas[nombre] = MetricasFuncion()
+        metricas.registrar(duracion, filas, error)
+
+def envolver(funcion, nombre, nombre_por_llamada=None, recorre=False):
+    """
+    Retorna una versión de 'funcion' que registra sus métricas bajo 'nombre'
+    recorre=True indica que procesa todas las filas del inventario que recibe
+    nombre_por_llamada(argumentos) permite separar las métricas por argumento
+    (ej: una entrada por cada opción del menú)
+    """
+    if inspect.isgeneratorfunction(funcion):
+        # Generadores (ej: lectura por bloques): medimos solo el tiempo que
+        # pasa dentro del generador, no el que usa quien lo recorre
+        @functools.wraps(funcion)
+        def envoltura_generador(*argumentos, **opciones):
+            generador = funcion(*argumentos, **opciones)
+            duracion, filas, error = 0.0, 0, False
+            try:
+                while True:
+                    inicio = time.perf_counter()
+                    try:
+                        valor = next(generador)
+                    except StopIteration:
+                        return
+                    finally:
+                        duracion += time.perf_counter() - inicio
+                    filas += len(valor) if isinstance(valor, TIPOS_INVENTARIO) else 1
+                    yield valor
+            except Exception:
+                error = True
+                raise
+            finally:
+                _registrar(nombre, duracion, filas, error)
+        return envoltura_generador
+
+    @functools.wraps(funcion)
+    def envoltura(*argumentos, **opciones):
+        etiqueta = nombre if nombre_por_llamada is None else nombre_por_llamada(argumentos)
+        inicio = time.perf_counter()
+        try:
+            resultado = funcion(*argumentos, **opciones)
+        except BaseException:
+            _registrar(etiqueta, time.perf_counter() - inicio, 0, True)
+            raise
+        _registrar(etiqueta, time.perf_counter() - inicio, _contar_filas(resultado, argumentos, recorre), False)
+        return resultado
+    return envoltura
+
+def _modulos_locales():
+    """
+    Módulos de esta carpeta que ya están cargados (app, lotes, diario, ...)
+    Los necesitamos porque 'from servicios import *' copia las funciones
+    a cada módulo: hay que reemplazarlas también allí
+    """
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    for modulo in list(sys.modules.values()):
+        ruta = getattr(modulo, "__file__", None)
+        if ruta and os.path.dirname(os.path.abspath(ruta)) == carpeta:
+            yield modulo
+
+def activar(espacio_app=None, prefijo="perfil"):
+    """
+    Empieza a medir las funciones públicas de servicios y archivos
+    y, si se pasa el espacio de nombres de app (globals()), ejecutar_opcion
+    El reporte se guarda al salir en '<prefijo>.json' y '<prefijo>.prom'
+    """
+    global _prefijo
+    if _prefijo is not None:
+        return  # Ya está activo
+    _prefijo = prefijo
+
+    # original -> envoltura
+    envolturas = {}
+    for modulo in (servicios, archivos):
+        for nombre, objeto in vars(modulo).items():
+            # Solo funciones públicas definidas en el propio módulo
+            if (inspect.isfunction(objeto) and not nombre.startswith("_") and nombre not in NO_MEDIDAS
+                    and objeto.__module__ == modulo.__name__):
+                envolturas[objeto] = envolver(objeto, f"{modulo.__name__}.{nombre}",
+                                              recorre=nombre in RECORREN_INVENTARIO)
+    if espacio_app is not None and "ejecutar_opcion" in espacio_app:
+        original = espacio_app["ejecutar_opcion"]
+        envolturas[original] = envolver(original, "app.ejecutar_opcion",
+                                        lambda argumentos: f"app.ejecutar_opcion[{argumentos[0]}]")
+
+    # Reemplazamos cada referencia a las funciones originales
+    espacios = [vars(modulo) for modulo in _modulos_locales()]
+    if espacio_app is not None:
+        espacios.append(espacio_app)
+    for espacio in espacios:
+        for nombre, objeto in list(espacio.items()):
+            if inspect.isfunction(objeto) and objeto in envolturas:
+                espacio[nombre] = envolturas[objeto]
+                _reemplazos.append((espacio, nombre, objeto))
+
+    atexit.register(guardar_reporte)
+    # Reporte a pedido: kill -USR1 <pid> (solo en sistemas que lo tienen)
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, lambda numero, marco: guardar_reporte())
+
+def desactivar():
+    """
+    Vuelve a poner las funciones originales (las métricas se conservan)
+    """
+    global _prefijo
+    for espacio, nombre, original in reversed(_reemplazos):
+        espacio[nombre] = original
+    _reemplazos.clear()
+    if _prefijo is not None:
+        atexit.unregister(guardar_reporte)
+        _prefijo = None
+
+def esta_activo():
+    return _prefijo is not None
+
+def obtener_reporte():
+    """
+    Retorna el reporte como diccionario
+    """
+    with _candado:
+        funciones = {nombre: metricas.como_diccionario() for nombre, metricas in sorted(_metricas.items())}
+    return {"generado": datetime.now().isoformat(timespec="seconds"), "funciones": funciones}
+
+def _texto_prometheus(reporte):
+    """
+    Arma el reporte en el formato de texto de Prometheus
+    """
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+
+    def etiqueta(funcion):
+        # Las comillas y barras invertidas se escapan según el formato
+        return funcion.replace("\\", "\\\\").replace('"', '\\"')
+
+    funciones = reporte["funciones"]
+    for campo, nombre, ayuda in (("llamadas", "inventario_llamadas_total", "Llamadas por función"),
+                                 ("errores", "inventario_errores_total", "Llamadas que terminaron con una excepción"),
+                                 ("filas", "inventario_filas_total", "Filas procesadas por función")):
+        metrica(nombre, "counter", ayuda)
+        for funcion, datos in funciones.items():
+            lineas.append(f'{nombre}{{funcion="{etiqueta(funcion)}"}} {datos[campo]}')
+
+    metrica("inventario_latencia_segundos", "histogram", "Latencia de cada llamada")
+    for funcion, datos in funciones.items():
+        acumulado = 0
+        for limite, cantidad in datos["histograma"].items():
+            acumulado += cantidad
+            lineas.append(f'inventario_latencia_segundos_bucket{{funcion="{etiqueta(funcion)}",le="{limite}"}} {acumulado}')
+        lineas.append(f'inventario_latencia_segundos_sum{{funcion="{etiqueta(funcion)}"}} {datos["tiempo_total"]}')
+        lineas.append(f'inventario_latencia_segundos_count{{funcion="{etiqueta(funcion)}"}} {datos["llamadas"]}')
+
+    metrica("inventario_latencia_percentil_segundos", "gauge", "Percentiles de latencia (muestra)")
+    for funcion, datos in funciones.items():
+        for p in PERCENTILES:
+            lineas.append(f'inventario_latencia_percentil_segundos{{funcion="{etiqueta(funcion)}",quantile="{p / 100}"}} {datos[f"p{p}"]}')
+    return "\n".join(lineas) + "\n"
+
+def guardar_reporte(prefijo=None):
+    """
+    Guarda el reporte en '<prefijo>.json' y '<prefijo>.prom'
+    Retorna True si se guardó correctamente
+    """
+    prefijo = prefijo or _prefijo or "perfil"
+    reporte = obtener_reporte()
+    try:
+        with open(prefijo + ".json", 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+        with open(prefijo + ".prom", 'w', encoding='utf-8') as archivo:
+            archivo.write(_texto_prometheus(reporte))
+        return True
+    except OSError as e:
+        print(f"Error al guardar el reporte de perfilado: {e}")
+        return False
+
+def mostrar_reporte():
+    """
+    Muestra un resumen del perfilado en pantalla (de la función más lenta en total a la más rápida)
+    """
+    funciones = obtener_reporte()["funciones"]
+    print("\n--- PERFILADO ---")
+    print(f"{'Función':<40} {'Llamadas':>9} {'Filas':>10} {'Total (s)':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for nombre, datos in sorted(funciones.items(), key=lambda par: -par[1]["tiempo_total"]):
+        print(f"{nombre:<40} {datos['llamadas']:>9} {datos['filas']:>10} {datos['tiempo_total']:>10.3f} "
+              f"{datos['p50'] * 1000:>9.3f} {datos['p95'] * 1000:>9.3f} {datos['p99'] * 1000:>9.3f}")
+    print("-----------------")
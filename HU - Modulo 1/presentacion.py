@@ -0,0 +1,153 @@
+# sys.stdout se consulta en cada escritura (así funciona redirect_stdout)
+import sys
+# heapq.nsmallest/nlargest eligen los primeros k sin ordenar todo el inventario
+import heapq
+# islice toma solo una parte del inventario sin recorrerlo entero
+from itertools import islice
+
+from inventario_indexado import clave_producto
+from inventario_columnar import InventarioColumnar
+
+# =============================================
+# PRESENTACIÓN PAGINADA
+# =============================================
+# Con inventarios grandes, un print() por producto es muy lento y llena la
+# pantalla. Aquí se arma el texto de una página completa en memoria y se
+# escribe con una sola llamada. Además se puede:
+# - mostrar solo una parte (límite y desplazamiento, como LIMIT/OFFSET)
+# - ordenar por una columna (solo se ordenan los productos que se ven)
+# - recorrer el inventario página por página en la terminal
+# Cuando la salida no es una terminal (ej: python app.py > listado.txt)
+# se escribe todo sin pausas, en bloques grandes.
+
+# Productos por página en la terminal
+TAMANO_PAGINA = 20
+# Productos por escritura cuando la salida es un archivo
+FILAS_POR_ESCRITURA = 10000
+
+# Columnas por las que se puede ordenar y cómo se compara cada una
+COLUMNAS_ORDEN = {
+    "nombre": lambda producto: clave_producto(producto[0]),  # Sin distinguir mayúsculas
+    "precio": lambda producto: producto[1],
+    "cantidad": lambda producto: producto[2],
+}
+
+def escribir(texto):
+    """
+    Escribe el texto en la salida con una sola llamada
+    """
+    sys.stdout.write(texto)
+
+def es_terminal():
+    """
+    True si la salida es una terminal (y no un archivo o una tubería)
+    """
+    return getattr(sys.stdout, "isatty", lambda: False)()
+
+def interpretar_orden(texto):
+    """
+    Convierte lo que escribe el usuario en (columna, descendente)
+    "precio" -> ("precio", False), "-precio" -> ("precio", True), "" -> (None, False)
+    Retorna None si la columna no existe
+    """
+    texto = texto.strip().lower()
+    if not texto:
+        return None, False
+    descendente = texto.startswith("-")
+    columna = texto.lstrip("-")
+    if columna not in COLUMNAS_ORDEN:
+        print(f"Error: No se puede ordenar por '{columna}'. Columnas: {', '.join(COLUMNAS_ORDEN)}.")
+        return None
+    return columna, descendente
+
+def _tuplas(inventario):
+    # Recorre el inventario como tuplas (nombre, precio, cantidad)
+    if isinstance(inventario, InventarioColumnar):
+        return zip(inventario.nombres, inventario.precios, inventario.cantidades)
+    return ((p["nombre"], p["precio"], p["cantidad"]) for p in inventario)
+
+def seleccionar(inventario, limite=None, desplazamiento=0, orden=None, descendente=False):
+    """
+    Retorna la lista de productos visibles como tuplas (nombre, precio, cantidad)
+    Sin orden, solo se recorren los primeros desplazamiento + limite productos;
+    con orden, se usa un heap de ese tamaño en lugar de ordenar todo
+    """
+    fin = None if limite is None else desplazamiento + limite
+    if orden is None:
+        return list(islice(_tuplas(inventario), desplazamiento, fin))
+
+    clave = COLUMNAS_ORDEN[orden]
+    if fin is None:
+        # Se ven todos: hay que ordenar todo (sorted mantiene el orden de los empates)
+        filas = sorted(_tuplas(inventario), key=clave, reverse=descendente)
+    elif descendente:
+        filas = heapq.nlargest(fin, _tuplas(inventario), key=clave)
+    else:
+        filas = heapq.nsmallest(fin, _tuplas(inventario), key=clave)
+    return filas[desplazamiento:]
+
+def formatear_filas(filas, inicio=1):
+    """
+    Arma el texto de varias filas, numeradas desde 'inicio'
+    """
+    return "".join(f"{i}. {nombre} - Precio: ${precio:.2f} - Cantidad: {cantidad}\n"
+                   for i, (nombre, precio, cantidad) in enumerate(filas, inicio))
+
+def mostrar_pagina(inventario, limite=TAMANO_PAGINA, desplazamiento=0, orden=None, descendente=False):
+    """
+    Muestra una parte del inventario con una sola escritura
+    Retorna la cantidad de productos mostrados
+    """
+    filas = seleccionar(inventario, limite, desplazamiento, orden, descendente)
+    total = len(inventario)
+    if filas:
+        pie = f"Mostrando {desplazamiento + 1}-{desplazamiento + len(filas)} de {total}"
+    else:
+        pie = f"No hay productos desde la posición {desplazamiento + 1} (total: {total})"
+    escribir("\n--- INVENTARIO ACTUAL ---\n" + formatear_filas(filas, desplazamiento + 1)
+             + pie + "\n-------------------------\n")
+    return len(filas)
+
+def volcar_todo(inventario, orden=None, descendente=False):
+    """
+    Escribe todo el inventario sin pausas, en bloques de FILAS_POR_ESCRITURA
+    (para cuando la salida va a un archivo)
+    """
+    escribir("\n--- INVENTARIO ACTUAL ---\n")
+    if orden is None:
+        filas = _tuplas(inventario)
+    else:
+        filas = iter(seleccionar(inventario, orden=orden, descendente=descendente))
+    inicio = 1
+    while True:
+        bloque = list(islice(filas, FILAS_POR_ESCRITURA))
+        if not bloque:
+            break
+        escribir(formatear_filas(bloque, inicio))
+        inicio += len(bloque)
+    escribir("-------------------------\n")
+    return inicio - 1
+
+def paginar(inventario, orden=None, descendente=False, tamano_pagina=TAMANO_PAGINA):
+    """
+    Muestra el inventario página por página, esperando al usuario entre páginas
+    Enter = siguiente, a = anterior, un número = ir a esa página, q = salir
+    """
+    total = len(inventario)
+    paginas = (total + tamano_pagina - 1) // tamano_pagina
+    pagina = 0
+    while True:
+        mostrar_pagina(inventario, tamano_pagina, pagina * tamano_pagina, orden, descendente)
+        if paginas <= 1:
+            return
+        respuesta = input(f"Página {pagina + 1}/{paginas} (Enter=siguiente, a=anterior, número=ir a página, q=salir): ").strip().lower()
+        if respuesta == "q":
+            return
+        if respuesta == "a":
+            pagina = max(0, pagina - 1)
+        elif respuesta.isdigit():
+            pagina = min(max(int(respuesta), 1), paginas) - 1
+        elif pagina + 1 < paginas:
+            pagina += 1
+        else:
+            return  # Enter en la última página: terminamos
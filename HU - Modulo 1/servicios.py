@@ -1,3 +1,16 @@
+# Importamos el contenedor de inventario con índice por nombre
+from inventario_indexado import Inventario
+# Importamos la representación columnar (también indexada por nombre)
+from inventario_columnar import InventarioColumnar
+
+# Importamos el índice de búsqueda por prefijo y aproximada
+from busqueda import IndiceBusqueda
+# Importamos la presentación paginada (una escritura por página)
+from presentacion import mostrar_pagina, paginar, volcar_todo, escribir, es_terminal, TAMANO_PAGINA
+
+# Tipos de inventario que tienen índice por nombre (buscar/actualizar/eliminar en O(1))
+INVENTARIOS_INDEXADOS = (Inventario, InventarioColumnar)
+
 # =============================================
 # FUNCIONES CRUD (Create, Read, Update, Delete)
 # =============================================
@@ -17,29 +30,37 @@ def agregar_producto(inventario, nombre, precio, cantidad):
     # Confirmamos al usuario que se agregó correctamente
     print(f"Producto '{nombre}' agregado exitosamente.")
 
-def mostrar_inventario(inventario):
+def mostrar_inventario(inventario, limite=None, desplazamiento=0, orden=None, descendente=False):
     """
-    Muestra todos los productos del inventario de forma legible
+    Muestra los productos del inventario de forma legible
+    limite/desplazamiento muestran solo una parte (como LIMIT/OFFSET)
+    orden es la columna para ordenar ("nombre", "precio" o "cantidad")
     """
     # Verificamos si el inventario está vacío
     if not inventario:
         print("El inventario está vacío.")
         return  # Salimos de la función early
     
-    # Mostramos encabezado
-    print("\n--- INVENTARIO ACTUAL ---")
-    # enumerate(inventario, 1) nos da (índice, producto) empezando desde 1
-    for i, producto in enumerate(inventario, 1):
-        # Mostramos cada producto formateado
-        # :.2f formatea el precio con 2 decimales
-        print(f"{i}. {producto['nombre']} - Precio: ${producto['precio']:.2f} - Cantidad: {producto['cantidad']}")
-    print("-------------------------")
+    # Cada página se arma completa y se escribe de una vez (ver presentacion.py)
+    if limite is not None or desplazamiento:
+        # Solo la parte pedida
+        mostrar_pagina(inventario, limite, desplazamiento, orden, descendente)
+    elif es_terminal() and len(inventario) > TAMANO_PAGINA:
+        # En la terminal, de a una página esperando al usuario
+        paginar(inventario, orden, descendente)
+    else:
+        # Hacia un archivo (o pocos productos): todo seguido
+        volcar_todo(inventario, orden, descendente)
 
 def buscar_producto(inventario, nombre):
     """
     Busca un producto por nombre y lo retorna, o None si no existe
     Búsqueda case-insensitive (no distingue mayúsculas/minúsculas)
     """
+    # Si el inventario tiene índice, la búsqueda es directa (O(1))
+    if isinstance(inventario, INVENTARIOS_INDEXADOS):
+        return inventario.buscar(nombre)
+    
     # Convertimos el nombre buscado a minúsculas para comparación
     nombre_buscado = nombre.lower()
     
@@ -52,6 +73,16 @@ def buscar_producto(inventario, nombre):
     # Si llegamos aquí, no encontramos el producto
     return None  # Retornamos None indicando que no existe
 
+def buscar_similares(inventario, texto, limite=10):
+    """
+    Busca productos cuyo nombre coincide, empieza con 'texto' o se le parece
+    (tolera errores de tipeo). Retorna hasta 'limite' pares (producto, tipo)
+    ordenados del mejor al peor resultado
+    """
+    # Con un Inventario (o InventarioColumnar) el índice se crea una sola vez y se mantiene al día;
+    # con una lista normal se arma un índice temporal
+    return IndiceBusqueda.de(inventario).buscar(texto, limite)
+
 def actualizar_producto(inventario, nombre, nuevo_precio=None, nueva_cantidad=None):
     """
     Actualiza el precio y/o cantidad de un producto existente
@@ -64,13 +95,18 @@ def actualizar_producto(inventario, nombre, nuevo_precio=None, nueva_cantidad=No
         print(f"Error: Producto '{nombre}' no encontrado.")
         return False  # Retornamos False indicando fallo
     
-    # Actualizamos precio si se proporcionó nuevo valor
-    if nuevo_precio is not None:
-        producto["precio"] = nuevo_precio
-    
-    # Actualizamos cantidad si se proporcionó nuevo valor
-    if nueva_cantidad is not None:
-        producto["cantidad"] = nueva_cantidad
+    # Con inventario indexado actualizamos a través del contenedor
+    # para que las estadísticas incrementales se enteren del cambio
+    if isinstance(inventario, INVENTARIOS_INDEXADOS):
+        inventario.actualizar(producto, nuevo_precio, nueva_cantidad)
+    else:
+        # Actualizamos precio si se proporcionó nuevo valor
+        if nuevo_precio is not None:
+            producto["precio"] = nuevo_precio
+        
+        # Actualizamos cantidad si se proporcionó nuevo valor
+        if nueva_cantidad is not None:
+            producto["cantidad"] = nueva_cantidad
     
     # Confirmamos la actualización
     print(f"Producto '{nombre}' actualizado exitosamente.")
@@ -80,16 +116,20 @@ def eliminar_producto(inventario, nombre):
     """
     Elimina un producto del inventario
     """
-    # Buscamos el producto primero
-    producto = buscar_producto(inventario, nombre)
+    # Con inventario indexado buscamos y eliminamos en un solo paso (O(1))
+    if isinstance(inventario, INVENTARIOS_INDEXADOS):
+        producto = inventario.eliminar(nombre)
+    else:
+        # Lista normal: buscamos el producto y luego lo removemos
+        producto = buscar_producto(inventario, nombre)
+        if producto is not None:
+            inventario.remove(producto)
     
     # Si no encontramos el producto, mostramos error
     if producto is None:
         print(f"Error: Producto '{nombre}' no encontrado.")
         return False  # Retornamos False indicando fallo
     
-    # Removemos el producto de la lista
-    inventario.remove(producto)
     # Confirmamos la eliminación
     print(f"Producto '{nombre}' eliminado exitosamente.")
     return True  # Retornamos True indicando éxito
@@ -108,6 +148,14 @@ def calcular_estadisticas(inventario):
         print("El inventario está vacío. No hay estadísticas para calcular.")
         return None  # Retornamos None si no hay datos
     
+    # El inventario indexado ya tiene las estadísticas calculadas al día,
+    # así que no hace falta recorrer todos los productos
+    if isinstance(inventario, Inventario):
+        return inventario.estadisticas.calcular()
+    # El inventario columnar las calcula con operaciones vectorizadas
+    if isinstance(inventario, InventarioColumnar):
+        return inventario.calcular_estadisticas()
+    
     # Inicializamos variables para los cálculos
     unidades_totales = 0      # Suma de todas las cantidades
     valor_total = 0.0         # Suma de precio * cantidad de cada producto
@@ -166,14 +214,16 @@ def mostrar_estadisticas(inventario):
     if estadisticas is None:
         return
     
-    # Mostramos las estadísticas formateadas
-    print("\n--- ESTADÍSTICAS DEL INVENTARIO ---")
-    print(f"Unidades totales en stock: {estadisticas['unidades_totales']}")
+    # Armamos el texto completo y lo escribimos de una vez
     # :.2f formatea el float con 2 decimales
-    print(f"Valor total del inventario: ${estadisticas['valor_total']:.2f}")
-    print(f"Producto más caro: {estadisticas['producto_mas_caro']['nombre']} - ${estadisticas['producto_mas_caro']['precio']:.2f}")
-    print(f"Producto con mayor stock: {estadisticas['producto_mayor_stock']['nombre']} - {estadisticas['producto_mayor_stock']['cantidad']} unidades")
-    print("-----------------------------------")
+    escribir(
+        "\n--- ESTADÍSTICAS DEL INVENTARIO ---\n"
+        f"Unidades totales en stock: {estadisticas['unidades_totales']}\n"
+        f"Valor total del inventario: ${estadisticas['valor_total']:.2f}\n"
+        f"Producto más caro: {estadisticas['producto_mas_caro']['nombre']} - ${estadisticas['producto_mas_caro']['precio']:.2f}\n"
+        f"Producto con mayor stock: {estadisticas['producto_mayor_stock']['nombre']} - {estadisticas['producto_mayor_stock']['cantidad']} unidades\n"
+        "-----------------------------------\n"
+    )
 
 # =============================================
 # FUNCIONES DE VALIDACIÓN
@@ -0,0 +1,137 @@
+import json  # Formato del archivo de agregados
+from bloqueos import reemplazar_archivo
+
+# ===== AGREGADOS DE VENTAS MATERIALIZADOS =====
+# Los reportes sumaban todas las ventas cada vez que se pedían (y el de
+# rendimiento recorría las ventas una vez por producto: O(productos × ventas)).
+# Aquí se guardan los totales ya calculados y se actualizan con cada venta
+# en O(1). Los reportes quedan en O(productos), sin importar cuántas ventas haya.
+#
+# Los agregados se guardan en disco junto con cada checkpoint de productos.
+# El archivo recuerda hasta qué posición de ventas.csv incluye (y el ID de la
+# última venta): al iniciar solo se leen y suman las ventas posteriores.
+# Los totales por marca no se guardan: se arman al iniciar desde los totales
+# por producto y la marca actual de cada uno (O(productos)), así siempre
+# coinciden con productos.csv aunque se haya cambiado una marca.
+
+
+class Agregados:
+    """Totales de ventas por producto, por marca y generales"""
+
+    def __init__(self):
+        # {id_producto: {'nombre', 'cantidad', 'ingresos'}} en orden de primera venta
+        self.por_producto = {}
+        # {marca: {'unidades', 'ingresos'}} según la marca actual de cada producto
+        self.por_marca = {}
+        self.bruto = 0     # Suma de precio_unitario * cantidad
+        self.neto = 0      # Suma de los totales (con descuento)
+        self.ventas = 0    # Cantidad de ventas incluidas
+        self.ultima_venta = None  # ID de la última venta incluida
+        self.posicion = 0  # Bytes de ventas.csv incluidos (al último guardado)
+
+    def registrar(self, venta, marca):
+        """Sumar una venta - O(1). marca=None si el producto ya no existe"""
+        pid = venta['id_producto']
+        if pid in self.por_producto:
+            self.por_producto[pid]['cantidad'] += venta['cantidad']
+            self.por_producto[pid]['ingresos'] += venta['total']
+        else:
+            # El nombre que se muestra es el de la primera venta del producto
+            self.por_producto[pid] = {
+                'nombre': venta['nombre_producto'],
+                'cantidad': venta['cantidad'],
+                'ingresos': venta['total']
+            }
+        # Las ventas de productos eliminados no cuentan para ninguna marca
+        if marca is not None:
+            if marca in self.por_marca:
+                self.por_marca[marca]['unidades'] += venta['cantidad']
+                self.por_marca[marca]['ingresos'] += venta['total']
+            else:
+                self.por_marca[marca] = {'unidades': venta['cantidad'], 'ingresos': venta['total']}
+        self.bruto += venta['precio_unitario'] * venta['cantidad']
+        self.neto += venta['total']
+        self.ventas += 1
+        self.ultima_venta = venta['id_venta']
+
+    def quitar_de_marca(self, pid, marca):
+        """Restar de la marca lo vendido de un producto (al eliminarlo o cambiarle la marca)"""
+        if pid not in self.por_producto or marca not in self.por_marca:
+            return
+        datos = self.por_producto[pid]
+        self.por_marca[marca]['unidades'] -= datos['cantidad']
+        self.por_marca[marca]['ingresos'] -= datos['ingresos']
+        # Una marca sin ventas no aparece en el reporte
+        if self.por_marca[marca]['unidades'] <= 0:
+            del self.por_marca[marca]
+
+    def sumar_a_marca(self, pid, marca):
+        """Sumar a la marca todo lo vendido de un producto"""
+        if pid not in self.por_producto:
+            return
+        datos = self.por_producto[pid]
+        if marca in self.por_marca:
+            self.por_marca[marca]['unidades'] += datos['cantidad']
+            self.por_marca[marca]['ingresos'] += datos['ingresos']
+        else:
+            self.por_marca[marca] = {'unidades': datos['cantidad'], 'ingresos': datos['ingresos']}
+
+    def cambiar_marca(self, pid, anterior, nueva):
+        """Mover las ventas de un producto a su nueva marca - O(1)"""
+        if anterior != nueva:
+            self.quitar_de_marca(pid, anterior)
+            self.sumar_a_marca(pid, nueva)
+
+    def vendido(self, pid):
+        """Unidades vendidas de un producto - O(1)"""
+        return self.por_producto[pid]['cantidad'] if pid in self.por_producto else 0
+
+    def recalcular_marcas(self, productos):
+        """Armar los totales por marca desde los totales por producto - O(productos)"""
+        self.por_marca = {}
+        for pid in self.por_producto:
+            if pid in productos:
+                self.sumar_a_marca(pid, productos[pid]['marca'])
+
+    def ponerse_al_dia(self, ventas_nuevas, productos):
+        """Sumar las ventas posteriores al checkpoint (cualquier iterable); retorna cuántas se sumaron"""
+        self.recalcular_marcas(productos)
+        sumadas = 0
+        for venta in ventas_nuevas:
+            producto = productos.get(venta['id_producto'])
+            self.registrar(venta, producto['marca'] if producto else None)
+            sumadas += 1
+        return sumadas
+
+    def guardar(self, ruta, posicion):
+        """Guardar los agregados en disco (reemplazo atómico); posicion = tamaño actual de ventas.csv"""
+        self.posicion = posicion
+        reemplazar_archivo(ruta, json.dumps({
+            'ventas': self.ventas,
+            'ultima_venta': self.ultima_venta,
+            'posicion': self.posicion,
+            'bruto': self.bruto,
+            'neto': self.neto,
+            'por_producto': self.por_producto
+        }, ensure_ascii=False))
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Cargar los agregados guardados (vacíos si no hay archivo o está dañado)"""
+        agregados = cls()
+        try:
+            with open(ruta, 'r', encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+            agregados.ventas = datos['ventas']
+            agregados.ultima_venta = datos['ultima_venta']
+            agregados.bruto = datos['bruto']
+            agregados.neto = datos['neto']
+            agregados.por_producto = datos['por_producto']
+            # Archivos de la versión anterior no tienen posición: se recalculan
+            agregados.posicion = datos.get('posicion', 0)
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Agregados dañados ({e}): se recalculan desde las ventas")
+            agregados = cls()
+        return agregados
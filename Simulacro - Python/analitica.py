@@ -0,0 +1,283 @@
+import argparse  # Opciones de línea de comandos
+import csv  # Lectura de ventas.csv
+import sys
+import time
+
+# NumPy es opcional: solo se necesita para este modo de análisis
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import archivos
+import funciones
+from indice_fechas import normalizar_fecha
+
+# ===== ANALÍTICA COLUMNAR CON NUMPY =====
+# Con millones de ventas, la lista de diccionarios de cargar_ventas ocupa
+# mucha memoria y recorrerla en Python es lento. Aquí las ventas se cargan
+# en columnas con tipo fijo:
+# - producto, nombre, cliente y tipo de cliente como códigos enteros
+#   (cada texto distinto se guarda una sola vez)
+# - cantidad como entero, precios y totales como float64
+# - fecha como datetime64
+# y los reportes se calculan con operaciones vectorizadas (bincount/unique).
+#
+# Los códigos se asignan en el orden en que aparece cada valor por primera
+# vez, y bincount suma en el orden de las filas: los totales por producto y
+# por marca dan exactamente lo mismo que los reportes de funciones.py.
+# Los ingresos también: se suman en orden con np.add.accumulate (sum() y
+# dot() suman por partes y cambian los últimos decimales).
+#
+# Uso: python analitica.py [--reporte top|marcas|ingresos|rendimiento] [--desde FECHA] [--hasta FECHA]
+
+# Filas que se leen antes de convertirlas a columnas NumPy
+FILAS_POR_BLOQUE = 200_000
+
+
+def _codificar(valores, codigos, tipo=np.int32 if np else None):
+    """Columna de texto -> columna de códigos (los valores nuevos se agregan al diccionario)"""
+    # dict.fromkeys deja los valores distintos en el orden en que aparecen por primera vez
+    for valor in dict.fromkeys(valores):
+        codigos.setdefault(valor, len(codigos))
+    return np.fromiter(map(codigos.__getitem__, valores), dtype=tipo, count=len(valores))
+
+
+def _fecha64(texto):
+    """'AAAA-MM-DD HH:MM:SS' -> datetime64 en segundos"""
+    return np.datetime64(texto.replace(' ', 'T'), 's')
+
+
+def _columna(filas, indice):
+    """Valores de una columna en una lista de filas"""
+    return [fila[indice] for fila in filas]
+
+
+def _lineas_completas(archivo):
+    """Líneas del archivo (binario) ya decodificadas, hasta la primera sin salto de línea"""
+    for linea in archivo:
+        if not linea.endswith(b'\n'):
+            return  # Línea cortada o que otro proceso todavía está escribiendo
+        yield linea.decode('utf-8', errors='replace')
+
+
+def _convertir_bloque(filas, posicion, codigos):
+    """Lista de filas -> columnas NumPy del bloque (ValueError si algún dato no se puede convertir)"""
+    texto = lambda nombre: _columna(filas, posicion[nombre])
+    # Primero los números: si fallan, todavía no se agregó ningún código nuevo
+    bloque = {
+        'cantidad': np.array(texto('Cantidad')).astype(np.int64),
+        'precio_unitario': np.array(texto('Precio_Unitario'), dtype=np.float64),
+        'descuento': np.array(texto('Descuento'), dtype=np.float64),
+        'total': np.array(texto('Total'), dtype=np.float64),
+        'fecha': np.array(texto('Fecha'), dtype='datetime64[s]'),
+    }
+    bloque['producto'] = _codificar(texto('ID_Producto'), codigos['producto'])
+    bloque['nombre'] = _codificar(texto('Nombre_Producto'), codigos['nombre'])
+    bloque['cliente'] = _codificar(texto('Cliente'), codigos['cliente'])
+    bloque['tipo'] = _codificar(texto('Tipo_Cliente'), codigos['tipo'], np.int16)
+    return bloque
+
+
+class VentasColumnar:
+    """Historial de ventas guardado en columnas NumPy"""
+
+    def __init__(self):
+        # Valores de cada categoría (el código es la posición en la lista)
+        self.productos = []
+        self.nombres = []
+        self.clientes = []
+        self.tipos = []
+        # Columnas (una posición por venta)
+        self.producto = self.nombre = self.cliente = self.tipo = None
+        self.cantidad = self.precio_unitario = self.descuento = self.total = self.fecha = None
+        # Filas ordenadas por fecha (se calculan la primera vez que se pide un período)
+        self._orden_por_fecha = None
+        self._fechas_ordenadas = None
+
+    def __len__(self):
+        return 0 if self.producto is None else len(self.producto)
+
+    @classmethod
+    def cargar(cls, ruta=archivos.ARCHIVO_VENTAS, filas_por_bloque=FILAS_POR_BLOQUE):
+        """Leer ventas.csv por bloques y armar las columnas"""
+        if np is None:
+            raise ImportError("el modo de análisis necesita NumPy (pip install numpy)")
+        ventas = cls()
+        codigos = {'producto': {}, 'nombre': {}, 'cliente': {}, 'tipo': {}}
+        bloques = {columna: [] for columna in ('producto', 'nombre', 'cliente', 'tipo', 'cantidad',
+                                               'precio_unitario', 'descuento', 'total', 'fecha')}
+
+        # Mismas filas que archivos.iterar_ventas: sin la línea cortada del final,
+        # ni el relleno de terminar_linea_cortada u otras filas incompletas o ilegibles
+        columnas = len(archivos.ENCABEZADO_VENTAS)
+        with open(ruta, 'rb') as archivo:
+            reader = csv.reader(_lineas_completas(archivo))
+            encabezado = next(reader, None)
+            if encabezado is None:
+                return ventas
+            # Posición de cada columna según el encabezado
+            posicion = {nombre: i for i, nombre in enumerate(encabezado)}
+            validas = (fila for fila in reader if len(fila) == columnas)
+            while True:
+                filas = [fila for _, fila in zip(range(filas_por_bloque), validas)]
+                if not filas:
+                    break
+                try:
+                    bloque = _convertir_bloque(filas, posicion, codigos)
+                except ValueError:
+                    # Alguna fila con datos ilegibles: se revisan de a una (caso raro)
+                    filas = [fila for fila in filas if archivos.venta_legible(fila)]
+                    bloque = _convertir_bloque(filas, posicion, codigos)
+                for columna, valores in bloque.items():
+                    bloques[columna].append(valores)
+
+        if not bloques['producto']:
+            return ventas
+        for columna, partes in bloques.items():
+            setattr(ventas, columna, np.concatenate(partes))
+        ventas.productos = list(codigos['producto'])
+        ventas.nombres = list(codigos['nombre'])
+        ventas.clientes = list(codigos['cliente'])
+        ventas.tipos = list(codigos['tipo'])
+        return ventas
+
+    def memoria(self):
+        """Bytes que ocupan las columnas"""
+        if not len(self):
+            return 0
+        return sum(getattr(self, columna).nbytes for columna in ('producto', 'nombre', 'cliente', 'tipo', 'cantidad',
+                                                                 'precio_unitario', 'descuento', 'total', 'fecha'))
+
+    # ===== GROUP-BY VECTORIZADOS =====
+    # Devuelven lo mismo que las funciones resumen_* de funciones.py.
+    # inicio/fin (opcionales, incluidos) limitan las ventas a un período:
+    # con las fechas ordenadas una vez, searchsorted encuentra el período
+    # en O(log n) y solo se agrupan sus k filas.
+
+    def _filas(self, inicio, fin):
+        """Filas del período en orden de fecha (None = todas, en orden de registro)"""
+        if inicio is None and fin is None:
+            return None
+        if self._orden_por_fecha is None:
+            self._orden_por_fecha = np.argsort(self.fecha, kind='stable')
+            self._fechas_ordenadas = self.fecha[self._orden_por_fecha]
+        desde = 0 if inicio is None else np.searchsorted(self._fechas_ordenadas, _fecha64(inicio), side='left')
+        hasta = len(self) if fin is None else np.searchsorted(self._fechas_ordenadas, _fecha64(fin), side='right')
+        return self._orden_por_fecha[desde:max(desde, hasta)]
+
+    def _columnas(self, inicio, fin, *nombres):
+        """Las columnas pedidas, limitadas al período"""
+        filas = self._filas(inicio, fin)
+        if filas is None:
+            return [getattr(self, nombre) for nombre in nombres]
+        return [getattr(self, nombre)[filas] for nombre in nombres]
+
+    def contar(self, inicio=None, fin=None):
+        """Cantidad de ventas del período"""
+        if not len(self):
+            return 0
+        filas = self._filas(inicio, fin)
+        return len(self) if filas is None else len(filas)
+
+    def por_producto(self, inicio=None, fin=None):
+        """Unidades e ingresos por producto: {id: {'nombre', 'cantidad', 'ingresos'}}"""
+        if not self.contar(inicio, fin):
+            return {}
+        producto, nombre, cantidad, total = self._columnas(inicio, fin, 'producto', 'nombre', 'cantidad', 'total')
+        cantidad_productos = len(self.productos)
+        unidades = np.bincount(producto, weights=cantidad, minlength=cantidad_productos)
+        ingresos = np.bincount(producto, weights=total, minlength=cantidad_productos)
+        # Primera venta de cada producto: de ahí sale el nombre que se muestra,
+        # y los productos se devuelven en ese orden (como el diccionario original)
+        presentes, primeras = np.unique(producto, return_index=True)
+        orden = np.argsort(primeras, kind='stable')
+        return {self.productos[codigo]: {'nombre': self.nombres[nombre[primera]],
+                                         'cantidad': int(unidades[codigo]),
+                                         'ingresos': float(ingresos[codigo])}
+                for codigo, primera in zip(presentes[orden].tolist(), primeras[orden].tolist())}
+
+    def por_marca(self, productos, inicio=None, fin=None):
+        """Unidades e ingresos por marca actual del producto: {marca: {'unidades', 'ingresos'}}"""
+        if not self.contar(inicio, fin):
+            return {}
+        producto, cantidad, total = self._columnas(inicio, fin, 'producto', 'cantidad', 'total')
+        # Código de marca de cada producto vendido (-1 si el producto ya no existe)
+        marcas = {}
+        marca_de_producto = np.array([marcas.setdefault(productos[pid]['marca'], len(marcas)) if pid in productos else -1
+                                      for pid in self.productos], dtype=np.int32)
+        marca_de_venta = marca_de_producto[producto]
+        validas = marca_de_venta >= 0
+        unidades = np.bincount(marca_de_venta[validas], weights=cantidad[validas], minlength=len(marcas))
+        ingresos = np.bincount(marca_de_venta[validas], weights=total[validas], minlength=len(marcas))
+        # Solo las marcas con ventas en el período
+        return {marca: {'unidades': int(unidades[codigo]), 'ingresos': float(ingresos[codigo])}
+                for marca, codigo in marcas.items() if unidades[codigo] > 0}
+
+    def ingresos(self, inicio=None, fin=None):
+        """Totales de ingresos: {'bruto', 'neto', 'descuento'}"""
+        if not self.contar(inicio, fin):
+            return {'bruto': 0.0, 'neto': 0.0, 'descuento': 0.0}
+        precio_unitario, cantidad, total = self._columnas(inicio, fin, 'precio_unitario', 'cantidad', 'total')
+        # Suma en orden, igual que el recorrido de resumen_ingresos
+        bruto = float(np.add.accumulate(precio_unitario * cantidad)[-1])
+        neto = float(np.add.accumulate(total)[-1])
+        return {'bruto': bruto, 'neto': neto, 'descuento': bruto - neto}
+
+    def vendido_por_producto(self, inicio=None, fin=None):
+        """Unidades vendidas por producto: {id: unidades}"""
+        if not self.contar(inicio, fin):
+            return {}
+        producto, cantidad = self._columnas(inicio, fin, 'producto', 'cantidad')
+        unidades = np.bincount(producto, weights=cantidad, minlength=len(self.productos))
+        return {self.productos[codigo]: int(unidades[codigo]) for codigo in np.unique(producto).tolist()}
+
+
+REPORTES = {
+    'top': funciones.top_3_productos,
+    'marcas': funciones.ventas_por_marca,
+    'ingresos': funciones.calcular_ingresos,
+    'rendimiento': funciones.rendimiento_inventario,
+}
+
+
+def main(argumentos=None):
+    """Cargar las ventas en columnas y mostrar los reportes"""
+    parser = argparse.ArgumentParser(description="Reportes de ventas con NumPy (solo lectura)")
+    parser.add_argument("--reporte", choices=list(REPORTES) + ['todos'], default='todos')
+    parser.add_argument("--desde", help="fecha inicial AAAA-MM-DD[ HH:MM:SS] (incluida)")
+    parser.add_argument("--hasta", help="fecha final AAAA-MM-DD[ HH:MM:SS] (incluida)")
+    opciones = parser.parse_args(argumentos)
+    try:
+        inicio = normalizar_fecha(opciones.desde) if opciones.desde else None
+        fin = normalizar_fecha(opciones.hasta, fin=True) if opciones.hasta else None
+    except ValueError:
+        print("❌ Fecha inválida (use AAAA-MM-DD o AAAA-MM-DD HH:MM:SS)")
+        return 1
+
+    if np is None:
+        print("❌ El modo de análisis necesita NumPy (pip install numpy)")
+        return 1
+
+    comienzo = time.perf_counter()
+    funciones.productos = archivos.cargar_productos()
+    try:
+        funciones.ventas_columnar = VentasColumnar.cargar(archivos.ARCHIVO_VENTAS)
+    except FileNotFoundError:
+        print(f"❌ No existe '{archivos.ARCHIVO_VENTAS}'")
+        return 1
+    except ValueError as e:
+        print(f"❌ Error al cargar ventas: {e}")
+        return 1
+    ventas = funciones.ventas_columnar
+    print(f"📊 {len(ventas):,} ventas cargadas en {time.perf_counter() - comienzo:.2f} s "
+          f"({ventas.memoria() / 1024 / 1024:.1f} MB en columnas)")
+
+    for nombre, reporte in REPORTES.items():
+        if opciones.reporte in (nombre, 'todos'):
+            reporte(inicio, fin)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 # Importar el módulo de funciones que contiene toda la lógica del negocio
+import argparse  # Opciones de línea de comandos
 import funciones
 
 def mostrar_menu():
@@ -16,75 +17,124 @@ def mostrar_menu():
     print("  8. Ventas por marca")
     print("  9. Reporte de ingresos")
     print("  10. Rendimiento del inventario")
+    print("  11. Reportes por período de fechas")
+    print("  12. Series de ventas por hora/día/mes")
+    print("  13. Importar pedidos desde CSV")
     print("\n  0. Salir")
     print("="*65)
 
+def leer_argumentos():
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Sistema de gestión de inventario y ventas")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="guardar los datos en SQLite (simulacro.db) en lugar de CSV")
+    parser.add_argument("--perezoso", action="store_true",
+                        help="no cargar las ventas al iniciar: leerlas de ventas.csv al pedir reportes")
+    parser.add_argument("--durabilidad", choices=['ninguna', 'lote', 'registro'],
+                        help="fsync de ventas.csv: nunca, por grupo de ventas (por defecto) o por venta")
+    parser.add_argument("--compartido", action="store_true",
+                        help="varias cajas usan los mismos CSV a la vez (bloqueos entre procesos)")
+    opciones = parser.parse_args()
+    if opciones.sqlite and opciones.perezoso:
+        parser.error("--perezoso solo se usa con los archivos CSV")
+    if opciones.sqlite and opciones.durabilidad:
+        parser.error("--durabilidad solo se usa con los archivos CSV")
+    if opciones.sqlite and opciones.compartido:
+        parser.error("--compartido solo se usa con los archivos CSV")
+    return opciones
+
 def main():
     """Bucle principal de la aplicación"""
+    opciones = leer_argumentos()
+    if opciones.sqlite:
+        funciones.usar_sqlite()  # Migrar antes los CSV con: python archivos_sqlite.py
+    if opciones.perezoso:
+        funciones.usar_modo_perezoso()
+    if opciones.durabilidad:
+        funciones.usar_durabilidad(opciones.durabilidad)
+    if opciones.compartido:
+        funciones.usar_modo_compartido()
+    
     print("\n🔧 Inicializando sistema...")
     funciones.inicializar_datos()  # Cargar datos iniciales y archivos
     print("✅ ¡Sistema listo!\n")
     
-    # Bucle infinito que mantiene la aplicación corriendo
-    while True:
-        try:
-            mostrar_menu()  # Mostrar opciones al usuario
-            opcion = input("\nSeleccione una opción: ").strip()  # strip() elimina espacios en blanco
+    try:
+        # Bucle infinito que mantiene la aplicación corriendo
+        while True:
+            try:
+                mostrar_menu()  # Mostrar opciones al usuario
+                opcion = input("\nSeleccione una opción: ").strip()  # strip() elimina espacios en blanco
+                funciones.sincronizar()  # Modo compartido: ver lo que hicieron las otras cajas
+            
+                # Estructura if-elif para manejar todas las opciones del menú
+                # Esta estructura es escalable y fácil de mantener
+                if opcion == '1':
+                    funciones.agregar_producto()  # Llamar función específica del CRUD
             
-            # Estructura if-elif para manejar todas las opciones del menú
-            # Esta estructura es escalable y fácil de mantener
-            if opcion == '1':
-                funciones.agregar_producto()  # Llamar función específica del CRUD
+                elif opcion == '2':
+                    funciones.ver_productos()  # Función de lectura/consulta
             
-            elif opcion == '2':
-                funciones.ver_productos()  # Función de lectura/consulta
+                elif opcion == '3':
+                    funciones.actualizar_producto()  # Función de actualización
             
-            elif opcion == '3':
-                funciones.actualizar_producto()  # Función de actualización
+                elif opcion == '4':
+                    funciones.eliminar_producto()  # Función de eliminación
             
-            elif opcion == '4':
-                funciones.eliminar_producto()  # Función de eliminación
+                elif opcion == '5':
+                    funciones.registrar_venta()  # Función de proceso de ventas
             
-            elif opcion == '5':
-                funciones.registrar_venta()  # Función de proceso de ventas
+                elif opcion == '6':
+                    funciones.ver_ventas()  # Consulta de historial
             
-            elif opcion == '6':
-                funciones.ver_ventas()  # Consulta de historial
+                elif opcion == '7':
+                    funciones.top_3_productos()  # Reporte analítico
             
-            elif opcion == '7':
-                funciones.top_3_productos()  # Reporte analítico
+                elif opcion == '8':
+                    funciones.ventas_por_marca()  # Reporte por categoría
             
-            elif opcion == '8':
-                funciones.ventas_por_marca()  # Reporte por categoría
+                elif opcion == '9':
+                    funciones.calcular_ingresos()  # Reporte financiero
             
-            elif opcion == '9':
-                funciones.calcular_ingresos()  # Reporte financiero
+                elif opcion == '10':
+                    funciones.rendimiento_inventario()  # Reporte de inventario
             
-            elif opcion == '10':
-                funciones.rendimiento_inventario()  # Reporte de inventario
+                elif opcion == '11':
+                    funciones.reportes_por_periodo()  # Reportes de un rango de fechas
             
-            elif opcion == '0':
-                print("\n👋 ¡Gracias por usar el sistema. Hasta luego!")
-                break  # Romper el bucle para salir
+                elif opcion == '12':
+                    funciones.mostrar_serie_ventas()  # Rollups por hora/día/mes
             
-            else:
-                print("\n❌ Opción inválida. Por favor intente nuevamente.")
+                elif opcion == '13':
+                    funciones.importar_pedidos()  # Muchos pedidos en una sola pasada
             
-            # Pausa para que el usuario pueda leer los resultados
-            input("\nPresione Enter para continuar...")
+                elif opcion == '0':
+                    print("\n👋 ¡Gracias por usar el sistema. Hasta luego!")
+                    break  # Romper el bucle para salir
             
-        # Manejo de interrupción por teclado (Ctrl+C)
-        except KeyboardInterrupt:
-            print("\n\n⚠️ Operación cancelada por el usuario")
-            confirmar = input("¿Desea salir? (si/no): ").lower()
-            if confirmar == 'si':
-                print("\n👋 ¡Hasta luego!")
-                break  # Salir confirmada
+                else:
+                    print("\n❌ Opción inválida. Por favor intente nuevamente.")
+            
+                # Pausa para que el usuario pueda leer los resultados
+                input("\nPresione Enter para continuar...")
+            
+            # Manejo de interrupción por teclado (Ctrl+C)
+            except KeyboardInterrupt:
+                print("\n\n⚠️ Operación cancelada por el usuario")
+                funciones.vaciar_ventas()  # Que las ventas del búfer no esperen la respuesta
+                confirmar = input("¿Desea salir? (si/no): ").lower()
+                if confirmar == 'si':
+                    print("\n👋 ¡Hasta luego!")
+                    break  # Salir confirmada
         
-        # Manejo de cualquier error inesperado
-        except Exception as e:
-            print(f"\n❌ Error inesperado: {e}")
-            print("El sistema continuará funcionando...")  # Sistema resiliente
+            # Manejo de cualquier error inesperado
+            except Exception as e:
+                print(f"\n❌ Error inesperado: {e}")
+                print("El sistema continuará funcionando...")  # Sistema resiliente
+    
+    finally:
+        # Guardar lo pendiente (checkpoint y ventas del búfer) aunque se salga con Ctrl+C
+        funciones.finalizar_datos()
 
 # Patrón común en Python: ejecutar main() solo si es el script principal
 if __name__ == "__main__":
@@ -1,10 +1,31 @@
 import csv  # Módulo para trabajar con archivos CSV
 import os   # Módulo para operaciones del sistema de archivos
+import io   # Para leer CSV desde texto ya cargado en memoria
+import zlib  # crc32: huella del contenido de productos.csv
 from datetime import datetime
+from bloqueos import bloquear, reemplazar_archivo
+from registro_ventas import RegistroVentas
 
 # Rutas de archivos - BUENA PRÁCTICA: Centralizar configuraciones
 ARCHIVO_PRODUCTOS = "productos.csv"
 ARCHIVO_VENTAS = "ventas.csv"
+# Últimos IDs entregados (ver secuencias.py)
+ARCHIVO_SECUENCIA_PRODUCTOS = "productos.seq"
+ARCHIVO_SECUENCIA_VENTAS = "ventas.seq"
+# Hasta qué punto de ventas.csv está incluido el stock de productos.csv
+ARCHIVO_CHECKPOINT = "productos.checkpoint"
+# Totales de ventas ya calculados para los reportes (ver agregados.py)
+ARCHIVO_AGREGADOS = "agregados.json"
+# Totales por hora, día y mes (ver rollups.py)
+ARCHIVO_ROLLUPS = "rollups.json.gz"
+
+# Política de fsync de ventas.csv: 'ninguna', 'lote' o 'registro' (ver registro_ventas.py)
+DURABILIDAD_VENTAS = 'lote'
+
+# Encabezados de los CSV
+ENCABEZADO_PRODUCTOS = ['ID', 'Nombre', 'Marca', 'Categoria', 'Precio', 'Stock', 'Garantia']
+ENCABEZADO_VENTAS = ['ID_Venta', 'Cliente', 'Tipo_Cliente', 'ID_Producto', 'Nombre_Producto',
+                     'Cantidad', 'Precio_Unitario', 'Descuento', 'Total', 'Fecha']
 
 def crear_archivos_si_no_existen():
     """Crear archivos CSV si no existen"""
@@ -13,106 +34,359 @@ def crear_archivos_si_no_existen():
         with open(ARCHIVO_PRODUCTOS, 'w', newline='', encoding='utf-8') as archivo:
             writer = csv.writer(archivo)
             # Escribir encabezados - BUENA PRÁCTICA: Definir estructura de datos
-            writer.writerow(['ID', 'Nombre', 'Marca', 'Categoria', 'Precio', 'Stock', 'Garantia'])
+            writer.writerow(ENCABEZADO_PRODUCTOS)
     
     # VERIFICAR Y CREAR ARCHIVO DE VENTAS  
     if not os.path.exists(ARCHIVO_VENTAS):
         with open(ARCHIVO_VENTAS, 'w', newline='', encoding='utf-8') as archivo:
             writer = csv.writer(archivo)
-            writer.writerow(['ID_Venta', 'Cliente', 'Tipo_Cliente', 'ID_Producto', 'Nombre_Producto', 
-                           'Cantidad', 'Precio_Unitario', 'Descuento', 'Total', 'Fecha'])
+            writer.writerow(ENCABEZADO_VENTAS)
+
+# ===== CHECKPOINT DEL STOCK =====
+# Cada venta ya queda escrita en ventas.csv con su producto y cantidad: esa
+# línea ES el cambio de stock. Por eso registrar una venta no reescribe
+# productos.csv; el catálogo se guarda solo en un "checkpoint" (cada cierta
+# cantidad de ventas, al salir o al editar productos).
+# productos.checkpoint guarda la posición (en bytes) de ventas.csv hasta la
+# que el stock de productos.csv ya está descontado. Al cargar, se descuentan
+# solo las ventas escritas después de esa posición.
+# Cada posición va junto a la huella (crc32) del productos.csv al que
+# corresponde: si el programa se corta entre escribir la marca y el
+# catálogo, se usa la marca del catálogo que quedó en disco.
+
+def _leer_checkpoints():
+    """Leer las marcas guardadas: lista de (posición en ventas.csv, crc32 de productos.csv)"""
+    marcas = []
+    try:
+        with open(ARCHIVO_CHECKPOINT, 'r', encoding='utf-8') as archivo:
+            for linea in archivo:
+                posicion, crc = linea.strip().split(',')
+                marcas.append((int(posicion), int(crc)))
+    except FileNotFoundError:
+        pass
+    return marcas
 
 def guardar_productos(productos):
-    """Guardar todos los productos en el archivo CSV"""
+    """Guardar todos los productos en el archivo CSV (checkpoint del stock)"""
     try:
-        # 'w' sobrescribe el archivo completo - adecuado para guardar todo el inventario
-        with open(ARCHIVO_PRODUCTOS, 'w', newline='', encoding='utf-8') as archivo:
-            writer = csv.writer(archivo)
-            writer.writerow(['ID', 'Nombre', 'Marca', 'Categoria', 'Precio', 'Stock', 'Garantia'])
-            
-            # Escribir cada producto como una fila en el CSV
-            for id_producto, datos in productos.items():
-                writer.writerow([
-                    id_producto,
-                    datos['nombre'],
-                    datos['marca'],
-                    datos['categoria'],
-                    datos['precio'],
-                    datos['stock'],
-                    datos['garantia']
-                ])
+        # Armar el CSV completo en memoria
+        texto = io.StringIO(newline='')
+        writer = csv.writer(texto)
+        writer.writerow(ENCABEZADO_PRODUCTOS)
+        
+        # Escribir cada producto como una fila en el CSV
+        for id_producto, datos in productos.items():
+            writer.writerow([
+                id_producto,
+                datos['nombre'],
+                datos['marca'],
+                datos['categoria'],
+                datos['precio'],
+                datos['stock'],
+                datos['garantia']
+            ])
+        contenido = texto.getvalue()
+        
+        # El stock en memoria ya incluye todas las ventas: primero se escriben las del búfer
+        vaciar_ventas()
+        posicion = os.path.getsize(ARCHIVO_VENTAS) if os.path.exists(ARCHIVO_VENTAS) else 0
+        # Se conserva la marca del catálogo actual por si el reemplazo no llega a hacerse
+        marcas = [(posicion, zlib.crc32(contenido.encode('utf-8')))]
+        if os.path.exists(ARCHIVO_PRODUCTOS):
+            with open(ARCHIVO_PRODUCTOS, 'rb') as archivo:
+                crc_actual = zlib.crc32(archivo.read())
+            if crc_actual != marcas[0][1]:
+                marcas += [marca for marca in _leer_checkpoints() if marca[1] == crc_actual][:1]
+        
+        # Primero la marca y después el catálogo, ambos con reemplazo atómico
+        reemplazar_archivo(ARCHIVO_CHECKPOINT, "".join(f"{p},{c}\n" for p, c in marcas))
+        reemplazar_archivo(ARCHIVO_PRODUCTOS, contenido)
         return True  # Indicar éxito
     except Exception as e:
         print(f"Error al guardar productos: {e}")
         return False  # Indicar fallo
 
-def cargar_productos():
-    """Cargar productos desde el archivo CSV"""
+def hay_checkpoint():
+    """Indica si ya existe la marca del checkpoint (no existe en archivos de versiones anteriores)"""
+    return os.path.exists(ARCHIVO_CHECKPOINT)
+
+def aplicar_ventas_pendientes(productos, crc_productos):
+    """Descontar del stock las ventas posteriores al último checkpoint"""
+    marcas = _leer_checkpoints()
+    if not marcas:
+        # Archivos de versiones anteriores: productos.csv ya tiene el stock al día
+        return 0
+    posicion = next((p for p, crc in marcas if crc == crc_productos), None)
+    if posicion is None:
+        print("⚠️ productos.csv fue modificado fuera del sistema: no se aplican ventas pendientes")
+        return 0
+    if not os.path.exists(ARCHIVO_VENTAS) or os.path.getsize(ARCHIVO_VENTAS) < posicion:
+        print("⚠️ ventas.csv es más corto que el último checkpoint: no se aplican ventas pendientes")
+        return 0
+    
+    # Leer solo la parte nueva de ventas.csv
+    with open(ARCHIVO_VENTAS, 'rb') as archivo:
+        archivo.seek(posicion)
+        resto = archivo.read()
+    # Una línea cortada al final (sin salto de línea) no es una venta completa
+    # Un byte dañado solo arruina su propia venta (que después se omite)
+    resto = resto[:resto.rfind(b'\n') + 1].decode('utf-8', errors='replace')
+    
+    aplicadas = 0
+    omitidas = 0
+    for fila in csv.reader(io.StringIO(resto, newline='')):
+        # Ignorar líneas incompletas (ej: corte mientras se escribía)
+        if len(fila) != len(ENCABEZADO_VENTAS):
+            continue
+        # Se convierte antes de tocar el stock: una venta ilegible se omite
+        # (y no deja el catálogo a medio descontar)
+        try:
+            venta = _convertir_venta(fila)
+        except ValueError:
+            omitidas += 1
+            continue
+        if venta['id_producto'] in productos:
+            productos[venta['id_producto']]['stock'] -= venta['cantidad']
+            aplicadas += 1
+    if omitidas:
+        print(f"⚠️ Se omitieron {omitidas} ventas ilegibles de ventas.csv")
+    return aplicadas
+
+def cargar_productos(avisar=True):
+    """Cargar productos desde el archivo CSV (checkpoint + ventas posteriores)"""
     productos = {}  # Diccionario vacío para llenar
     try:
         if os.path.exists(ARCHIVO_PRODUCTOS):
-            with open(ARCHIVO_PRODUCTOS, 'r', encoding='utf-8') as archivo:
-                reader = csv.DictReader(archivo)  # Leer como diccionarios
-                for fila in reader:
-                    id_producto = fila['ID']
-                    # Convertir tipos de datos apropiados
-                    productos[id_producto] = {
-                        'nombre': fila['Nombre'],
-                        'marca': fila['Marca'],
-                        'categoria': fila['Categoria'],
-                        'precio': float(fila['Precio']),  # Convertir a float
-                        'stock': int(fila['Stock']),      # Convertir a int
-                        'garantia': int(fila['Garantia']) # Convertir a int
-                    }
+            # Se lee en bytes para calcular la huella del archivo
+            with open(ARCHIVO_PRODUCTOS, 'rb') as archivo:
+                contenido = archivo.read()
+            reader = csv.DictReader(io.StringIO(contenido.decode('utf-8'), newline=''))  # Leer como diccionarios
+            for fila in reader:
+                id_producto = fila['ID']
+                # Convertir tipos de datos apropiados
+                productos[id_producto] = {
+                    'nombre': fila['Nombre'],
+                    'marca': fila['Marca'],
+                    'categoria': fila['Categoria'],
+                    'precio': float(fila['Precio']),  # Convertir a float
+                    'stock': int(fila['Stock']),      # Convertir a int
+                    'garantia': int(fila['Garantia']) # Convertir a int
+                }
+            
+            # Stock actual = checkpoint - ventas registradas después
+            aplicadas = aplicar_ventas_pendientes(productos, zlib.crc32(contenido))
+            if aplicadas and avisar:
+                print(f"🔄 Stock actualizado con {aplicadas} ventas posteriores al último checkpoint")
     except Exception as e:
         print(f"Error al cargar productos: {e}")
     
     return productos  # Devolver diccionario cargado (o vacío si hay error)
 
+# ===== ESCRITURA DE VENTAS =====
+# ventas.csv queda abierto y las ventas se escriben en grupos (ver
+# registro_ventas.py). Antes de leer ventas.csv o de guardar un checkpoint
+# se vacía el búfer, así nadie ve el archivo sin las últimas ventas.
+
+_registro = None  # Se abre con la primera venta
+_limites_registro = {}  # max_ventas, max_bytes, max_espera (si no, los de registro_ventas.py)
+
+def configurar_registro_ventas(durabilidad=None, **limites):
+    """Elegir la durabilidad y los límites del búfer (max_ventas, max_bytes, max_espera)"""
+    global DURABILIDAD_VENTAS, _limites_registro
+    cerrar()  # Las ventas pendientes se escriben con la configuración anterior
+    if durabilidad is not None:
+        DURABILIDAD_VENTAS = durabilidad
+    _limites_registro = limites
+
+def vaciar_ventas():
+    """Escribir en ventas.csv las ventas que están en el búfer"""
+    if _registro is not None:
+        _registro.vaciar()
+
+def cerrar():
+    """Escribir las ventas pendientes y cerrar ventas.csv (al salir del sistema)"""
+    global _registro
+    if _registro is not None:
+        _registro.cerrar()
+        _registro = None
+
 def guardar_venta(venta):
     """Agregar una nueva venta al archivo CSV"""
+    return guardar_ventas([venta])
+
+def guardar_ventas(ventas_nuevas, vaciar=False):
+    """Agregar varias ventas (ej: las líneas de un pedido) en una sola escritura
+    (vaciar=True: quedan en ventas.csv al retornar, sin esperar en el búfer)"""
+    global _registro
     try:
-        # 'a' append - agrega al final sin borrar existentes
-        with open(ARCHIVO_VENTAS, 'a', newline='', encoding='utf-8') as archivo:
-            writer = csv.writer(archivo)
-            writer.writerow([
-                venta['id_venta'],
-                venta['cliente'],
-                venta['tipo_cliente'],
-                venta['id_producto'],
-                venta['nombre_producto'],
-                venta['cantidad'],
-                venta['precio_unitario'],
-                venta['descuento'],
-                venta['total'],
-                venta['fecha']
-            ])
+        if _registro is None:
+            terminar_linea_cortada()  # Que la primera venta no quede pegada a una línea cortada
+            _registro = RegistroVentas(ARCHIVO_VENTAS, DURABILIDAD_VENTAS, **_limites_registro)
+        _registro.escribir_varias([[
+            venta['id_venta'],
+            venta['cliente'],
+            venta['tipo_cliente'],
+            venta['id_producto'],
+            venta['nombre_producto'],
+            venta['cantidad'],
+            venta['precio_unitario'],
+            venta['descuento'],
+            venta['total'],
+            venta['fecha']
+        ] for venta in ventas_nuevas], vaciar)
         return True
     except Exception as e:
         print(f"Error al guardar venta: {e}")
         return False
 
+def terminar_linea_cortada():
+    """Cerrar una línea cortada al final de ventas.csv (ej: un proceso que se cortó escribiendo)"""
+    completo = tamano_ventas()
+    if os.path.exists(ARCHIVO_VENTAS) and os.path.getsize(ARCHIVO_VENTAS) != completo:
+        with open(ARCHIVO_VENTAS, 'ab') as archivo:
+            # Con columnas de más ningún lector la toma como venta
+            archivo.write(b',' * len(ENCABEZADO_VENTAS) + b'\n')
+
+def bloquear_ventas():
+    """Bloqueo exclusivo de ventas.csv entre procesos (modo compartido, usar con 'with')"""
+    return bloquear(ARCHIVO_VENTAS)
+
+def firma_productos():
+    """Identifica la versión de productos.csv en disco: cambia cuando alguien lo reescribe"""
+    try:
+        estado = os.stat(ARCHIVO_PRODUCTOS)
+    except FileNotFoundError:
+        return None
+    return (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+
+def tamano_ventas():
+    """Bytes de ventas.csv hasta la última línea completa (0 si no existe)"""
+    vaciar_ventas()
+    if not os.path.exists(ARCHIVO_VENTAS):
+        return 0
+    with open(ARCHIVO_VENTAS, 'rb') as archivo:
+        fin = archivo.seek(0, os.SEEK_END)
+        # Una línea cortada al final (ej: corte mientras se escribía) no cuenta:
+        # la venta siguiente se escribe pegada a ella y las dos se ignoran juntas
+        while fin > 0:
+            inicio = max(0, fin - 4096)
+            archivo.seek(inicio)
+            bloque = archivo.read(fin - inicio)
+            if b'\n' in bloque:
+                return inicio + bloque.rindex(b'\n') + 1
+            fin = inicio
+    return 0
+
+def _convertir_venta(fila):
+    """Fila del CSV (en el orden de ENCABEZADO_VENTAS) -> diccionario de venta"""
+    return {
+        'id_venta': fila[0],
+        'cliente': fila[1],
+        'tipo_cliente': fila[2],
+        'id_producto': fila[3],
+        'nombre_producto': fila[4],
+        'cantidad': int(fila[5]),
+        'precio_unitario': float(fila[6]),
+        'descuento': float(fila[7]),
+        'total': float(fila[8]),
+        'fecha': fila[9]
+    }
+
+def venta_legible(fila):
+    """Indica si una fila de ventas.csv es una venta completa y con datos válidos"""
+    if len(fila) != len(ENCABEZADO_VENTAS):
+        return False
+    try:
+        _convertir_venta(fila)
+    except ValueError:
+        return False
+    return True
+
+def iterar_ventas(desde=0, hasta=None):
+    """
+    Generador: lee las ventas de a una, sin cargarlas todas en memoria.
+    desde/hasta son posiciones en bytes de ventas.csv (ej: la de un checkpoint)
+    """
+    vaciar_ventas()
+    if not os.path.exists(ARCHIVO_VENTAS):
+        return
+    with open(ARCHIVO_VENTAS, 'rb') as archivo:
+        archivo.seek(desde)
+        
+        def lineas():
+            # Línea por línea en binario: así la posición en bytes es exacta
+            for linea in iter(archivo.readline, b''):
+                if hasta is not None and archivo.tell() > hasta:
+                    return  # Escrita después de 'hasta'
+                if not linea.endswith(b'\n'):
+                    return  # Línea cortada o que otro proceso todavía está escribiendo
+                yield linea.decode('utf-8', errors='replace')
+        
+        reader = csv.reader(lineas())
+        if desde == 0:
+            next(reader, None)  # Saltar el encabezado
+        for fila in reader:
+            # Ignorar líneas incompletas (ej: corte mientras se escribía)
+            if len(fila) != len(ENCABEZADO_VENTAS):
+                continue
+            # Ni las que tienen datos ilegibles (igual que aplicar_ventas_pendientes)
+            try:
+                venta = _convertir_venta(fila)
+            except ValueError:
+                continue
+            yield venta
+
+def leer_ultima_venta(hasta=None):
+    """Última venta de ventas.csv antes de 'hasta' leyendo solo el final del archivo"""
+    fin = tamano_ventas() if hasta is None else hasta
+    if fin <= 0:
+        return None
+    with open(ARCHIVO_VENTAS, 'rb') as archivo:
+        # Se leen bloques desde el final hasta encontrar un registro completo y válido
+        # (los incompletos o ilegibles, ej: de un corte, se saltan como en iterar_ventas).
+        # Un registro puede ocupar varias líneas (saltos de línea entre comillas):
+        # un salto de línea solo separa registros si después de él, hasta el final
+        # del registro, hay un número par de comillas
+        datos = b''         # Contenido de ventas.csv desde 'inicio' hasta 'fin'
+        inicio = fin
+        fin_registro = fin  # El registro que se busca termina aquí (con su salto de línea)
+        corte = fin - 1     # Se buscan saltos de línea antes de esta posición
+        while fin_registro > 0:
+            salto = datos.rfind(b'\n', 0, max(0, corte - inicio))
+            if salto < 0 and inicio > 0:
+                # El comienzo del registro está antes: leer otro bloque
+                nuevo_inicio = max(0, inicio - 4096)
+                archivo.seek(nuevo_inicio)
+                datos = archivo.read(inicio - nuevo_inicio) + datos
+                inicio = nuevo_inicio
+                continue
+            comienzo = inicio + salto + 1  # 0 si se llegó al principio del archivo
+            if salto >= 0 and datos.count(b'"', comienzo - inicio, fin_registro - inicio) % 2:
+                corte = comienzo - 1  # Salto de línea dentro de un campo: seguir buscando
+                continue
+            texto = datos[comienzo - inicio:fin_registro - inicio].decode('utf-8', errors='replace')
+            fila = next(csv.reader(io.StringIO(texto, newline='')), [])
+            if fila != ENCABEZADO_VENTAS and venta_legible(fila):
+                return _convertir_venta(fila)
+            fin_registro = comienzo
+            corte = comienzo - 1
+    return None
+
+def venta_termina_en(posicion, id_venta):
+    """Indica si en ventas.csv la venta 'id_venta' termina en esa posición (validar un checkpoint)"""
+    if not posicion:
+        return id_venta is None  # Checkpoint sin ventas
+    if tamano_ventas() < posicion:
+        return False  # Archivo recortado
+    ultima = leer_ultima_venta(posicion)
+    return ultima is not None and ultima['id_venta'] == id_venta
+
 def cargar_ventas():
     """Cargar todas las ventas desde el archivo CSV"""
     ventas = []  # Lista vacía para llenar
     try:
-        if os.path.exists(ARCHIVO_VENTAS):
-            with open(ARCHIVO_VENTAS, 'r', encoding='utf-8') as archivo:
-                reader = csv.DictReader(archivo)
-                for fila in reader:
-                    # Convertir tipos de datos apropiados
-                    ventas.append({
-                        'id_venta': fila['ID_Venta'],
-                        'cliente': fila['Cliente'],
-                        'tipo_cliente': fila['Tipo_Cliente'],
-                        'id_producto': fila['ID_Producto'],
-                        'nombre_producto': fila['Nombre_Producto'],
-                        'cantidad': int(fila['Cantidad']),
-                        'precio_unitario': float(fila['Precio_Unitario']),
-                        'descuento': float(fila['Descuento']),
-                        'total': float(fila['Total']),
-                        'fecha': fila['Fecha']
-                    })
+        # Mismo lector que el modo perezoso: salta las líneas cortadas o incompletas
+        ventas.extend(iterar_ventas())
     except Exception as e:
         print(f"Error al cargar ventas: {e}")
     
@@ -0,0 +1,301 @@
+import sqlite3  # Base de datos SQLite (incluida en Python)
+import sys
+
+import archivos  # Backend CSV: para migrar sus datos y compartir configuración
+from rollups import GRANULARIDADES, TOTAL
+
+# ===== BACKEND SQLITE =====
+# Alternativa a archivos.py que guarda productos y ventas en una base SQLite
+# en lugar de leer/reescribir CSV completos. Tiene las mismas funciones que
+# archivos.py (se usa con: python app.py --sqlite) y además consultas que
+# hacen las sumas y agrupaciones dentro de la base, usando índices.
+#
+# - Modo WAL: las lecturas no bloquean a las escrituras
+# - guardar_venta inserta la venta y descuenta el stock en una sola transacción,
+#   así el stock de la base siempre está al día (no hace falta reprocesar ventas)
+# - Migración desde los CSV: python archivos_sqlite.py
+
+# Ruta de la base de datos - BUENA PRÁCTICA: Centralizar configuraciones
+BASE_DATOS = "simulacro.db"
+# Los IDs se siguen generando con las mismas secuencias que el backend CSV
+ARCHIVO_SECUENCIA_PRODUCTOS = archivos.ARCHIVO_SECUENCIA_PRODUCTOS
+ARCHIVO_SECUENCIA_VENTAS = archivos.ARCHIVO_SECUENCIA_VENTAS
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS productos (
+    id        TEXT PRIMARY KEY,
+    nombre    TEXT NOT NULL,
+    marca     TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    precio    REAL NOT NULL,
+    stock     INTEGER NOT NULL,
+    garantia  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ventas (
+    id_venta        TEXT PRIMARY KEY,
+    cliente         TEXT NOT NULL,
+    tipo_cliente    TEXT NOT NULL,
+    id_producto     TEXT NOT NULL,
+    nombre_producto TEXT NOT NULL,
+    cantidad        INTEGER NOT NULL,
+    precio_unitario REAL NOT NULL,
+    descuento       REAL NOT NULL,
+    total           REAL NOT NULL,
+    fecha           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ventas_producto ON ventas (id_producto);
+CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha);
+CREATE INDEX IF NOT EXISTS idx_ventas_tipo_cliente ON ventas (tipo_cliente);
+CREATE INDEX IF NOT EXISTS idx_productos_marca ON productos (marca);
+"""
+
+COLUMNAS_VENTA = ('id_venta', 'cliente', 'tipo_cliente', 'id_producto', 'nombre_producto',
+                  'cantidad', 'precio_unitario', 'descuento', 'total', 'fecha')
+
+_conexion = None  # Conexión abierta (se crea la primera vez que se usa)
+
+
+def conectar():
+    """Abrir la base (una sola vez) y crear las tablas si no existen"""
+    global _conexion
+    if _conexion is None:
+        _conexion = sqlite3.connect(BASE_DATOS)
+        _conexion.execute("PRAGMA journal_mode=WAL")    # Lectores y escritor en paralelo
+        _conexion.execute("PRAGMA synchronous=NORMAL")  # Seguro con WAL y mucho más rápido
+        _conexion.executescript(ESQUEMA)
+    return _conexion
+
+
+def cerrar():
+    """Cerrar la conexión con la base"""
+    global _conexion
+    if _conexion is not None:
+        _conexion.close()
+        _conexion = None
+
+
+# ===== MISMAS FUNCIONES QUE archivos.py =====
+
+def crear_archivos_si_no_existen():
+    """Crear la base y sus tablas si no existen"""
+    conectar()
+
+
+def hay_checkpoint():
+    """El stock de la base siempre está al día (compatibilidad con archivos.py)"""
+    return True
+
+
+def guardar_productos(productos):
+    """Guardar todos los productos (inserta/actualiza y borra los que ya no están)"""
+    try:
+        conexion = conectar()
+        with conexion:  # Una sola transacción: todo o nada
+            conexion.executemany(
+                "INSERT OR REPLACE INTO productos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(id_producto, datos['nombre'], datos['marca'], datos['categoria'],
+                  datos['precio'], datos['stock'], datos['garantia'])
+                 for id_producto, datos in productos.items()])
+            # Productos eliminados en memoria
+            existentes = [fila[0] for fila in conexion.execute("SELECT id FROM productos")]
+            conexion.executemany("DELETE FROM productos WHERE id = ?",
+                                 [(id_producto,) for id_producto in existentes if id_producto not in productos])
+        return True
+    except sqlite3.Error as e:
+        print(f"Error al guardar productos: {e}")
+        return False
+
+
+def cargar_productos():
+    """Cargar productos desde la base"""
+    productos = {}
+    try:
+        for fila in conectar().execute("SELECT id, nombre, marca, categoria, precio, stock, garantia FROM productos"):
+            productos[fila[0]] = {
+                'nombre': fila[1],
+                'marca': fila[2],
+                'categoria': fila[3],
+                'precio': fila[4],
+                'stock': fila[5],
+                'garantia': fila[6]
+            }
+    except sqlite3.Error as e:
+        print(f"Error al cargar productos: {e}")
+    return productos
+
+
+def guardar_venta(venta):
+    """Guardar una venta y descontar su stock en la misma transacción"""
+    return guardar_ventas([venta])
+
+
+def guardar_ventas(ventas_nuevas, vaciar=False):
+    """Guardar varias ventas (ej: un pedido) y su stock en una sola transacción (siempre se escribe ya)"""
+    try:
+        conexion = conectar()
+        with conexion:
+            conexion.executemany("INSERT INTO ventas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [[venta[columna] for columna in COLUMNAS_VENTA] for venta in ventas_nuevas])
+            conexion.executemany("UPDATE productos SET stock = stock - ? WHERE id = ?",
+                                 [(venta['cantidad'], venta['id_producto']) for venta in ventas_nuevas])
+        return True
+    except sqlite3.Error as e:
+        print(f"Error al guardar venta: {e}")
+        return False
+
+
+def cargar_ventas():
+    """Cargar todas las ventas (en el orden en que se registraron)"""
+    ventas = []
+    try:
+        cursor = conectar().execute(f"SELECT {', '.join(COLUMNAS_VENTA)} FROM ventas ORDER BY rowid")
+        for fila in cursor:
+            ventas.append(dict(zip(COLUMNAS_VENTA, fila)))
+    except sqlite3.Error as e:
+        print(f"Error al cargar ventas: {e}")
+    return ventas
+
+
+# ===== CONSULTAS PARA LOS REPORTES =====
+# Devuelven los mismos datos que calculan los reportes de funciones.py,
+# pero la agrupación la hace SQLite.
+# inicio/fin (opcionales, incluidos) limitan las ventas a un período usando
+# el índice por fecha.
+
+def _periodo(inicio, fin, tabla='ventas'):
+    """Condición SQL y parámetros para filtrar por fecha"""
+    condiciones = []
+    parametros = []
+    if inicio is not None:
+        condiciones.append(f"{tabla}.fecha >= ?")
+        parametros.append(inicio)
+    if fin is not None:
+        condiciones.append(f"{tabla}.fecha <= ?")
+        parametros.append(fin)
+    return " AND ".join(condiciones) or "1", parametros
+
+
+def consultar_ventas_por_producto(inicio=None, fin=None):
+    """Unidades e ingresos por producto: {id: {'nombre', 'cantidad', 'ingresos'}}"""
+    # El nombre es el de la primera venta del producto (igual que en funciones.py)
+    # y el orden es el de la primera venta de cada producto. Sin período,
+    # "primera" es en orden de registro; con período, en orden de fecha
+    # (igual que el índice por fecha de funciones.py)
+    orden = "rowid" if inicio is None and fin is None else "fecha, rowid"
+    condicion, parametros = _periodo(inicio, fin)
+    cursor = conectar().execute(f"""
+        WITH seleccion AS (
+            SELECT id_producto, cantidad, total,
+                   ROW_NUMBER() OVER (ORDER BY {orden}) AS posicion,
+                   FIRST_VALUE(nombre_producto) OVER (PARTITION BY id_producto ORDER BY {orden}) AS nombre
+            FROM ventas
+            WHERE {condicion}
+        )
+        SELECT id_producto, MIN(nombre), SUM(cantidad), SUM(total)
+        FROM seleccion
+        GROUP BY id_producto
+        ORDER BY MIN(posicion)
+    """, parametros)
+    return {pid: {'nombre': nombre, 'cantidad': cantidad, 'ingresos': ingresos}
+            for pid, nombre, cantidad, ingresos in cursor}
+
+
+def consultar_ventas_por_marca(inicio=None, fin=None):
+    """Unidades e ingresos por marca actual del producto: {marca: {'unidades', 'ingresos'}}"""
+    condicion, parametros = _periodo(inicio, fin, 'v')
+    cursor = conectar().execute(f"""
+        SELECT p.marca, SUM(v.cantidad), SUM(v.total)
+        FROM ventas v JOIN productos p ON p.id = v.id_producto
+        WHERE {condicion}
+        GROUP BY p.marca
+    """, parametros)
+    return {marca: {'unidades': unidades, 'ingresos': ingresos} for marca, unidades, ingresos in cursor}
+
+
+def consultar_ingresos(inicio=None, fin=None):
+    """Totales de ingresos: {'bruto', 'neto', 'descuento'}"""
+    condicion, parametros = _periodo(inicio, fin)
+    bruto, neto = conectar().execute(
+        f"SELECT TOTAL(precio_unitario * cantidad), TOTAL(total) FROM ventas WHERE {condicion}", parametros).fetchone()
+    return {'bruto': bruto, 'neto': neto, 'descuento': bruto - neto}
+
+
+def consultar_vendido_por_producto(inicio=None, fin=None):
+    """Unidades vendidas por producto: {id: unidades}"""
+    condicion, parametros = _periodo(inicio, fin)
+    return dict(conectar().execute(
+        f"SELECT id_producto, SUM(cantidad) FROM ventas WHERE {condicion} GROUP BY id_producto", parametros))
+
+
+def consultar_serie(granularidad='dia', dimension='total', clave=TOTAL, inicio=None, fin=None):
+    """Serie por hora/día/mes: lista de (cubo, unidades, bruto, descuento, neto) (igual que rollups.py)"""
+    largo = GRANULARIDADES[granularidad]
+    condiciones = ["1"]
+    parametros = [largo]
+    if dimension == 'producto':
+        condiciones.append("v.id_producto = ?")
+        parametros.append(clave)
+    elif dimension == 'tipo_cliente':
+        condiciones.append("v.tipo_cliente = ?")
+        parametros.append(clave)
+    elif dimension == 'marca':
+        condiciones.append("p.marca = ?")
+        parametros.append(clave)
+    # Se eligen los cubos que contienen las fechas (igual que rollups.py)
+    if inicio is not None:
+        condiciones.append("v.fecha >= ?")
+        parametros.append(inicio[:largo])
+    if fin is not None:
+        condiciones.append("substr(v.fecha, 1, ?) <= ?")
+        parametros += [largo, fin[:largo]]
+    union = "JOIN productos p ON p.id = v.id_producto" if dimension == 'marca' else ""
+    cursor = conectar().execute(f"""
+        SELECT substr(v.fecha, 1, ?) AS cubo, SUM(v.cantidad),
+               TOTAL(v.precio_unitario * v.cantidad),
+               TOTAL(v.precio_unitario * v.cantidad) - TOTAL(v.total),
+               TOTAL(v.total)
+        FROM ventas v {union}
+        WHERE {' AND '.join(condiciones)}
+        GROUP BY cubo
+        ORDER BY cubo
+    """, parametros)
+    return cursor.fetchall()
+
+
+def consultar_claves(dimension):
+    """Claves con ventas de una dimensión (ej: las marcas)"""
+    consultas = {
+        'total': "SELECT DISTINCT '' FROM ventas",
+        'producto': "SELECT DISTINCT id_producto FROM ventas ORDER BY 1",
+        'tipo_cliente': "SELECT DISTINCT tipo_cliente FROM ventas ORDER BY 1",
+        'marca': "SELECT DISTINCT p.marca FROM ventas v JOIN productos p ON p.id = v.id_producto ORDER BY 1",
+    }
+    return [fila[0] for fila in conectar().execute(consultas[dimension])]
+
+
+# ===== MIGRACIÓN DESDE CSV =====
+
+def migrar_desde_csv():
+    """Copiar productos.csv y ventas.csv a la base (se puede repetir sin duplicar)"""
+    productos = archivos.cargar_productos()  # Incluye las ventas posteriores al checkpoint
+    ventas = archivos.cargar_ventas()
+    try:
+        conexion = conectar()
+        with conexion:
+            conexion.executemany(
+                "INSERT OR REPLACE INTO productos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(id_producto, datos['nombre'], datos['marca'], datos['categoria'],
+                  datos['precio'], datos['stock'], datos['garantia'])
+                 for id_producto, datos in productos.items()])
+            conexion.executemany("INSERT OR REPLACE INTO ventas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [[venta[columna] for columna in COLUMNAS_VENTA] for venta in ventas])
+    except sqlite3.Error as e:
+        print(f"❌ Error al migrar: {e}")
+        return False
+    print(f"✅ Migración completa: {len(productos)} productos y {len(ventas)} ventas en '{BASE_DATOS}'")
+    return True
+
+
+# Migración en un paso: python archivos_sqlite.py
+if __name__ == "__main__":
+    sys.exit(0 if migrar_desde_csv() else 1)
@@ -0,0 +1,151 @@
+import argparse  # Opciones de línea de comandos
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import archivos
+import funciones
+from archivos import ENCABEZADO_VENTAS
+from registro_ventas import DURABILIDADES, MAX_BYTES, MAX_ESPERA, MAX_VENTAS, RegistroVentas
+
+# ===== BENCHMARK DE ESCRITURA DE VENTAS =====
+# Mide cuántas ventas por segundo se pueden guardar en ventas.csv de forma
+# sostenida con cada política de durabilidad del registro agrupado, y con la
+# forma anterior (abrir, escribir una fila y cerrar el archivo por venta).
+# Cada modo escribe ventas durante unos segundos en un archivo temporal; el
+# tiempo incluye cerrar el registro (escribir lo que quedó en el búfer).
+# El modo registrar_pedido mide el camino completo de la aplicación
+# (funciones.registrar_pedido: validar, IDs de ventas.seq, stock, ventas.csv
+# y checkpoints) con la durabilidad de --durabilidad, en un directorio aparte.
+#
+# Uso: python benchmark_ventas.py [--segundos 3] [--max-ventas 256] [--durabilidad lote] [--directorio DIR]
+# (--directorio elige el disco a medir; por defecto el directorio temporal)
+
+SEGUNDOS = 3.0
+# Cada cuántas ventas se mira el reloj (mirarlo en cada venta también cuesta)
+VENTAS_POR_MEDICION = 64
+# Productos de prueba del modo registrar_pedido (con stock de sobra)
+PRODUCTOS_PEDIDO = 400
+STOCK_PEDIDO = 10 ** 9
+
+
+def fila_venta(numero):
+    """Venta sintética con el mismo formato que las del sistema"""
+    cantidad = numero % 9 + 1
+    return [f"V{numero:04d}", "Cliente Prueba", "regular", f"P{numero % 400 + 1:03d}", "Producto de prueba",
+            cantidad, 199.99, 0.0, round(199.99 * cantidad, 2), "2024-05-01 12:00:00"]
+
+
+def escribir_por_venta(ruta, fila):
+    """Forma anterior de guardar_venta: un open/close por venta"""
+    with open(ruta, 'a', newline='', encoding='utf-8') as archivo:
+        csv.writer(archivo).writerow(fila)
+
+
+def medir(ruta, modo, segundos, limites):
+    """Escribir ventas durante 'segundos'; retorna (ventas, segundos reales)"""
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        csv.writer(archivo).writerow(ENCABEZADO_VENTAS)
+    registro = None if modo == 'por_venta' else RegistroVentas(ruta, modo, **limites)
+    escritas = 0
+    comienzo = time.perf_counter()
+    limite = comienzo + segundos
+    while time.perf_counter() < limite:
+        for _ in range(VENTAS_POR_MEDICION):
+            escritas += 1
+            if registro is None:
+                escribir_por_venta(ruta, fila_venta(escritas))
+            else:
+                registro.escribir(fila_venta(escritas))
+    if registro is not None:
+        registro.cerrar()
+    return escritas, time.perf_counter() - comienzo
+
+
+def medir_pedidos(directorio, segundos, limites, durabilidad):
+    """Registrar pedidos de una línea con funciones.registrar_pedido; retorna (ventas, segundos reales)"""
+    original = os.getcwd()
+    os.makedirs(directorio, exist_ok=True)
+    os.chdir(directorio)  # archivos.py usa rutas relativas
+    try:
+        archivos.crear_archivos_si_no_existen()
+        archivos.guardar_productos({
+            f"P{i:03d}": {'nombre': f"Producto {i}", 'marca': f"Marca {i % 7}", 'categoria': 'Prueba',
+                          'precio': 199.99, 'stock': STOCK_PEDIDO, 'garantia': 12}
+            for i in range(1, PRODUCTOS_PEDIDO + 1)})
+        funciones.usar_durabilidad(durabilidad, **limites)
+        funciones.usar_ids_en_bloque()  # Como el servidor: sin un fsync de ventas.seq por venta
+        funciones.inicializar_datos()
+        escritas = 0
+        comienzo = time.perf_counter()
+        limite = comienzo + segundos
+        while time.perf_counter() < limite:
+            for _ in range(VENTAS_POR_MEDICION):
+                escritas += 1
+                funciones.registrar_pedido("Cliente Prueba", 'regular',
+                                           [(f"P{escritas % PRODUCTOS_PEDIDO + 1:03d}", escritas % 9 + 1)])
+        funciones.finalizar_datos()
+        return escritas, time.perf_counter() - comienzo
+    finally:
+        os.chdir(original)
+
+
+def contar_filas(ruta):
+    """Filas de ventas en el archivo (para comprobar que no se perdió ninguna)"""
+    with open(ruta, 'r', newline='', encoding='utf-8') as archivo:
+        return sum(1 for _ in csv.reader(archivo)) - 1
+
+
+def ejecutar(directorio, modos, segundos, limites, durabilidad):
+    """Medir cada modo y mostrar la tabla de resultados"""
+    ruta = os.path.join(directorio, "ventas_benchmark.csv")
+    print(f"{'Modo':<16} {'Ventas':>10} {'Segundos':>9} {'Ventas/s':>12}")
+    print("-" * 50)
+    resultados = {}
+    for modo in modos:
+        if modo == 'registrar_pedido':
+            directorio_pedidos = os.path.join(directorio, "pedidos_benchmark")
+            escritas, transcurrido = medir_pedidos(directorio_pedidos, segundos, limites, durabilidad)
+            ruta_modo = os.path.join(directorio_pedidos, archivos.ARCHIVO_VENTAS)
+        else:
+            escritas, transcurrido = medir(ruta, modo, segundos, limites)
+            ruta_modo = ruta
+        if contar_filas(ruta_modo) != escritas:
+            print(f"❌ {modo}: se escribieron {escritas} ventas pero el archivo tiene {contar_filas(ruta_modo)}")
+            return None
+        resultados[modo] = escritas / transcurrido
+        print(f"{modo:<16} {escritas:>10,} {transcurrido:>9.2f} {resultados[modo]:>12,.0f}")
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    return resultados
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Ventas por segundo al escribir ventas.csv")
+    parser.add_argument("--segundos", type=float, default=SEGUNDOS, help="duración de cada medición")
+    parser.add_argument("--modos", nargs='+', choices=['por_venta', *DURABILIDADES, 'registrar_pedido'],
+                        default=['por_venta', *DURABILIDADES, 'registrar_pedido'])
+    parser.add_argument("--durabilidad", choices=DURABILIDADES, default=archivos.DURABILIDAD_VENTAS,
+                        help="durabilidad del modo registrar_pedido")
+    parser.add_argument("--max-ventas", type=int, default=MAX_VENTAS, help="ventas por grupo")
+    parser.add_argument("--max-bytes", type=int, default=MAX_BYTES, help="bytes por grupo")
+    parser.add_argument("--max-espera", type=float, default=MAX_ESPERA, help="segundos máximos en el búfer")
+    parser.add_argument("--directorio", help="directorio donde escribir (por defecto uno temporal)")
+    opciones = parser.parse_args(argumentos)
+    limites = {'max_ventas': opciones.max_ventas, 'max_bytes': opciones.max_bytes, 'max_espera': opciones.max_espera}
+
+    if opciones.directorio:
+        os.makedirs(opciones.directorio, exist_ok=True)
+        resultados = ejecutar(opciones.directorio, opciones.modos, opciones.segundos, limites,
+                              opciones.durabilidad)
+    else:
+        with tempfile.TemporaryDirectory() as directorio:
+            resultados = ejecutar(directorio, opciones.modos, opciones.segundos, limites,
+                                  opciones.durabilidad)
+    return 0 if resultados is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
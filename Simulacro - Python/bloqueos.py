@@ -0,0 +1,47 @@
+import os  # Módulo para operaciones del sistema de archivos
+from contextlib import contextmanager  # Para usar el bloqueo con 'with'
+
+# Bloqueos de archivo del sistema operativo - BUENA PRÁCTICA: Coordinar procesos
+# fcntl existe en Linux/macOS; en Windows se usa msvcrt
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def bloquear(ruta):
+    """Bloqueo exclusivo entre procesos sobre '<ruta>.lock' (usar con 'with')"""
+    # El bloqueo se toma sobre un archivo aparte: así el archivo de datos
+    # se puede reemplazar con os.replace sin perder el bloqueo
+    with open(ruta + ".lock", 'a+') as archivo:
+        if fcntl is not None:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)  # Espera hasta obtenerlo
+        else:
+            archivo.seek(0)
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            # Liberar siempre, aunque haya ocurrido un error
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+            else:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def reemplazar_archivo(ruta, contenido):
+    """Escribir un archivo completo (texto o bytes) de forma atómica (nunca queda a medias)"""
+    # Un temporal por proceso: dos procesos pueden reemplazar el mismo archivo a la vez
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    if isinstance(contenido, bytes):
+        archivo = open(temporal, 'wb')
+    else:
+        archivo = open(temporal, 'w', newline='', encoding='utf-8')
+    with archivo:
+        archivo.write(contenido)
+        archivo.flush()
+        os.fsync(archivo.fileno())  # Asegurar que los datos llegaron al disco
+    os.replace(temporal, ruta)  # Reemplazo atómico
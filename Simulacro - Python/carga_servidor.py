@@ -0,0 +1,193 @@
+import argparse  # Opciones de línea de comandos
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import archivos
+
+# ===== GENERADOR DE CARGA PARA EL SERVIDOR =====
+# Abre muchas conexiones keep-alive contra servidor.py y durante unos
+# segundos manda peticiones sin pausa: lecturas (un producto, el catálogo y
+# los cuatro reportes) y una proporción de ventas (POST /ventas).
+# Al final muestra peticiones por segundo y la latencia (p50, p90, p99,
+# p99.9 y máxima) de las lecturas y de las escrituras por separado.
+#
+# Por defecto inicia su propio servidor en otro proceso, sobre un directorio
+# temporal con productos de prueba (con stock de sobra para no rechazar ventas).
+# Con --puerto mide un servidor que ya está corriendo (usa sus productos y
+# registra ventas de verdad).
+#
+# Uso: python carga_servidor.py [--conexiones 64] [--segundos 5] [--escrituras 0.1] [--puerto P]
+
+CONEXIONES = 64
+SEGUNDOS = 5.0
+ESCRITURAS = 0.1  # Proporción de peticiones que son ventas
+# Lecturas que se reparten al azar (la de un producto se completa con un ID)
+LECTURAS = ['/productos/{id}', '/productos', '/reportes/top3', '/reportes/marcas',
+            '/reportes/ingresos', '/reportes/rendimiento']
+PERCENTILES = (50, 90, 99, 99.9)
+ESPERA_INICIO = 30.0  # Segundos máximos para que el servidor propio empiece a escuchar
+
+
+async def pedir(lector, escritor, metodo, camino, datos=None):
+    """Mandar una petición por una conexión abierta y leer la respuesta; retorna (estado, cuerpo)"""
+    cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else b''
+    escritor.write(f"{metodo} {camino} HTTP/1.1\r\nHost: carga\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(cuerpo)}\r\n\r\n".encode('latin-1') + cuerpo)
+    await escritor.drain()
+    estado = int((await lector.readline()).split()[1])
+    largo = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b'\r\n', b'\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        if nombre.strip().lower() == 'content-length':
+            largo = int(valor)
+    return estado, await lector.readexactly(largo)
+
+
+async def cliente(host, puerto, numero, opciones, id_productos, limite, medidas):
+    """Una conexión: peticiones seguidas hasta el límite de tiempo"""
+    azar = random.Random(opciones.semilla + numero)
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while time.perf_counter() < limite:
+            if azar.random() < opciones.escrituras:
+                tipo, metodo, camino = 'escritura', 'POST', '/ventas'
+                datos = {'cliente': f"Carga {numero}", 'tipo_cliente': 'regular',
+                         'lineas': [{'id_producto': azar.choice(id_productos), 'cantidad': 1}]}
+            else:
+                tipo, metodo, datos = 'lectura', 'GET', None
+                camino = azar.choice(LECTURAS).format(id=azar.choice(id_productos))
+            comienzo = time.perf_counter()
+            estado, _ = await pedir(lector, escritor, metodo, camino, datos)
+            medidas[tipo].append(time.perf_counter() - comienzo)
+            if estado >= 400:
+                medidas['errores'][estado] = medidas['errores'].get(estado, 0) + 1
+    finally:
+        escritor.close()
+
+
+async def medir(host, puerto, opciones):
+    """Correr todas las conexiones a la vez; retorna (medidas, segundos)"""
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    _, cuerpo = await pedir(lector, escritor, 'GET', '/productos')
+    escritor.close()
+    id_productos = sorted(json.loads(cuerpo))
+    if not id_productos:
+        raise SystemExit("❌ El servidor no tiene productos")
+
+    medidas = {'lectura': [], 'escritura': [], 'errores': {}}
+    comienzo = time.perf_counter()
+    limite = comienzo + opciones.segundos
+    await asyncio.gather(*(cliente(host, puerto, numero, opciones, id_productos, limite, medidas)
+                           for numero in range(opciones.conexiones)))
+    return medidas, time.perf_counter() - comienzo
+
+
+def percentil(ordenadas, porcentaje):
+    """Percentil (por rango más cercano) de una lista ya ordenada"""
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * porcentaje / 100))]
+
+
+def mostrar(medidas, segundos):
+    """Tabla de peticiones por segundo y latencias en milisegundos"""
+    total = len(medidas['lectura']) + len(medidas['escritura'])
+    print(f"{total:,} peticiones en {segundos:.2f} s: {total / segundos:,.0f} peticiones/s")
+    columnas = ''.join(f"{'p' + format(p, 'g'):>9}" for p in PERCENTILES)
+    print(f"\n{'Tipo':<11} {'Peticiones':>10} {'Por seg.':>9}{columnas}{'máx':>9}  (ms)")
+    print("-" * (41 + 9 * len(PERCENTILES)))
+    for tipo in ('lectura', 'escritura'):
+        tiempos = sorted(medidas[tipo])
+        if not tiempos:
+            continue
+        valores = ''.join(f"{percentil(tiempos, p) * 1000:>9.2f}" for p in PERCENTILES)
+        print(f"{tipo:<11} {len(tiempos):>10,} {len(tiempos) / segundos:>9,.0f}{valores}{tiempos[-1] * 1000:>9.2f}")
+    if medidas['errores']:
+        print(f"\n⚠️ Respuestas con error por código: {medidas['errores']}")
+
+
+def puerto_libre():
+    """Un puerto TCP libre en 127.0.0.1"""
+    with socket.socket() as conexion:
+        conexion.bind(('127.0.0.1', 0))
+        return conexion.getsockname()[1]
+
+
+def preparar_productos(opciones):
+    """productos.csv de prueba en el directorio actual (y en simulacro.db si el servidor usa --sqlite)"""
+    archivos.crear_archivos_si_no_existen()
+    archivos.guardar_productos({
+        f"P{i:03d}": {'nombre': f"Producto {i}", 'marca': f"Marca {i % 7}", 'categoria': 'Prueba',
+                      'precio': 10.0 + i, 'stock': opciones.stock, 'garantia': 12}
+        for i in range(1, opciones.productos + 1)})
+    if '--sqlite' in opciones.servidor:
+        import archivos_sqlite  # Solo hace falta para este caso
+        archivos_sqlite.migrar_desde_csv()
+        archivos_sqlite.cerrar()
+
+
+def iniciar_servidor(directorio, puerto, opciones):
+    """Lanzar servidor.py en otro proceso y esperar a que acepte conexiones"""
+    comando = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'servidor.py'),
+               '--puerto', str(puerto), *opciones.servidor]
+    proceso = subprocess.Popen(comando, cwd=directorio, stdout=subprocess.DEVNULL)
+    limite = time.monotonic() + ESPERA_INICIO
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise SystemExit("❌ El servidor terminó al iniciar")
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=1).close()
+            return proceso
+        except OSError:
+            time.sleep(0.05)
+    proceso.terminate()
+    raise SystemExit("❌ El servidor no empezó a escuchar a tiempo")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Peticiones por segundo y latencia del servidor")
+    parser.add_argument("--conexiones", type=int, default=CONEXIONES, help="clientes a la vez (keep-alive)")
+    parser.add_argument("--segundos", type=float, default=SEGUNDOS, help="duración de la medición")
+    parser.add_argument("--escrituras", type=float, default=ESCRITURAS, help="proporción de ventas (0 a 1)")
+    parser.add_argument("--semilla", type=int, default=12345)
+    parser.add_argument("--host", default='127.0.0.1', help="servidor ya iniciado (con --puerto)")
+    parser.add_argument("--puerto", type=int, help="medir un servidor ya iniciado en lugar de uno propio")
+    parser.add_argument("--productos", type=int, default=200, help="productos de prueba (servidor propio)")
+    parser.add_argument("--stock", type=int, default=10 ** 6, help="stock de cada producto (servidor propio)")
+    parser.add_argument("--servidor", nargs=argparse.REMAINDER, default=[],
+                        help="opciones para el servidor propio (ej: --servidor --durabilidad registro)")
+    opciones = parser.parse_args(argumentos)
+
+    if opciones.puerto:
+        medidas, segundos = asyncio.run(medir(opciones.host, opciones.puerto, opciones))
+        mostrar(medidas, segundos)
+        return 0
+
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)  # archivos.py usa rutas relativas
+        try:
+            preparar_productos(opciones)
+        finally:
+            os.chdir(original)
+        puerto = puerto_libre()
+        proceso = iniciar_servidor(directorio, puerto, opciones)
+        try:
+            medidas, segundos = asyncio.run(medir('127.0.0.1', puerto, opciones))
+        finally:
+            proceso.terminate()  # SIGTERM: el servidor guarda lo pendiente y sale
+            proceso.wait()
+    mostrar(medidas, segundos)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
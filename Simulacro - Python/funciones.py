@@ -1,11 +1,59 @@
 # Importar módulos necesarios
+import csv  # Para importar pedidos desde un CSV
+from contextlib import contextmanager, nullcontext
 from datetime import datetime  # Para manejar fechas en ventas
+from itertools import chain  # Para volver a unir una venta ya leída con el resto
 import archivos  # Módulo personalizado para manejo de archivos
+import secuencias  # Generadores de IDs persistentes
+from agregados import Agregados  # Totales de ventas para los reportes
+from rollups import Rollups, GRANULARIDADES, DIMENSIONES, TOTAL  # Totales por hora, día y mes
+from indice_fechas import IndiceFechas, normalizar_fecha  # Ventas ordenadas por fecha
 
 # Estructuras de datos globales - BUENA PRÁCTICA: Centralizar datos en variables globales
 productos = {}  # Diccionario para productos: clave=ID, valor=datos del producto
 ventas = []     # Lista para almacenar todas las ventas
-contador_ventas = 1  # Contador para generar IDs únicos de ventas
+# Ventas registradas desde el último checkpoint de productos.csv
+ventas_sin_checkpoint = 0
+# Cada cuántas ventas se reescribe productos.csv (el stock se recupera de ventas.csv)
+CHECKPOINT_CADA_VENTAS = 100
+# Los rollups ocupan más: se guardan cada tantas ventas (y al salir)
+ROLLUPS_CADA_VENTAS = 1000
+
+# Secuencias de IDs (se crean en inicializar_datos) - O(1) por ID nuevo
+secuencia_productos = None
+secuencia_ventas = None
+# IDs que cada secuencia reserva por acceso a su archivo (bloqueo + fsync).
+# En la caja de a una venta se reserva de a uno: los comprobantes quedan
+# seguidos (V0003, V0004...). El servidor y el modo compartido venden mucho
+# más rápido y reservan un bloque (ver usar_ids_en_bloque); al cerrar se
+# devuelve lo que no se usó, salvo que otra caja haya reservado después.
+# Las importaciones ya piden todos sus IDs con un solo acceso.
+BLOQUE_IDS_PRODUCTOS = 1
+BLOQUE_IDS_VENTAS = 1
+BLOQUE_IDS_VENTAS_RAPIDO = 256
+
+# Totales de ventas ya calculados (se crean en inicializar_datos) - reportes en O(productos)
+# None con SQLite: la base hace las sumas con sus índices
+agregados_ventas = None
+# Totales por hora, día y mes (se crean en inicializar_datos, None con SQLite)
+rollups_ventas = None
+
+# Índice de las ventas por fecha (se crea en inicializar_datos) - reportes por período
+indice_ventas = None
+
+# Ventas en columnas NumPy (solo en el modo de análisis, ver analitica.py)
+ventas_columnar = None
+
+# Modo perezoso: las ventas no se cargan en memoria; se leen de ventas.csv
+# cuando un reporte o el historial las necesita (memoria constante)
+modo_perezoso = False
+
+# Modo compartido: varias cajas (procesos) usan los mismos archivos (ver sincronizar)
+modo_compartido = False
+version_ventas = 0     # Bytes de ventas.csv ya aplicados a 'productos' (la versión del stock)
+firma_catalogo = None  # Versión de productos.csv que tiene este proceso
+# Intentos sin bloqueo antes de validar una venta con el bloqueo tomado
+INTENTOS_OPTIMISTAS = 5
 
 # Descuentos por tipo de cliente - BUENA PRÁCTICA: Constantes en mayúsculas
 # Este diccionario es fácil de modificar para agregar nuevos tipos de cliente
@@ -16,99 +64,393 @@ DESCUENTOS_CLIENTE = {
     'empleado': 30   # Empleado con 30% descuento
 }
 
+def usar_sqlite():
+    """Usar la base SQLite en lugar de los CSV (llamar antes de inicializar_datos)"""
+    global archivos
+    import archivos_sqlite
+    # Mismas funciones que archivos.py: el resto del código no cambia
+    archivos = archivos_sqlite
+
+def usar_durabilidad(durabilidad, **limites):
+    """Política de fsync y tamaño de los grupos al escribir ventas.csv (backend CSV)"""
+    archivos.configurar_registro_ventas(durabilidad, **limites)
+
+def usar_modo_perezoso():
+    """No cargar las ventas al iniciar: leerlas del disco cuando se necesiten (backend CSV)"""
+    global modo_perezoso
+    modo_perezoso = True
+
+def usar_modo_compartido():
+    """Varias cajas con los mismos CSV: bloqueos entre procesos y stock versionado (backend CSV)"""
+    global modo_compartido
+    modo_compartido = True
+    usar_ids_en_bloque()
+
+def usar_ids_en_bloque(tamano=BLOQUE_IDS_VENTAS_RAPIDO):
+    """Reservar los IDs de ventas de a bloques (muchas ventas por segundo: servidor, varias cajas)"""
+    global BLOQUE_IDS_VENTAS
+    BLOQUE_IDS_VENTAS = tamano
+
+def _cargar_totales(clase, ruta, hasta=None):
+    """Cargar totales guardados (Agregados o Rollups) y sumarles las ventas posteriores"""
+    totales = clase.cargar(ruta)
+    # Si ventas.csv cambió por fuera (editado o recortado), se recalcula desde el principio
+    if not archivos.venta_termina_en(totales.posicion, totales.ultima_venta):
+        totales = clase()
+    # Solo se leen las ventas escritas después del último guardado
+    if hasta is None:
+        hasta = archivos.tamano_ventas()
+    if totales.ponerse_al_dia(archivos.iterar_ventas(totales.posicion, hasta), productos):
+        totales.guardar(ruta, hasta)
+    return totales
+
 def inicializar_datos():
     """Inicializar el sistema con datos precargados"""
-    global productos, ventas, contador_ventas  # Acceder a variables globales
+    global productos, ventas, secuencia_productos, secuencia_ventas, ventas_sin_checkpoint, agregados_ventas, rollups_ventas, indice_ventas  # Acceder a variables globales
+    global version_ventas, firma_catalogo
     
     # Crear archivos CSV si no existen - Previene errores de archivo no encontrado
     archivos.crear_archivos_si_no_existen()
-    # Cargar datos desde archivos a memoria
-    productos = archivos.cargar_productos()
-    ventas = archivos.cargar_ventas()
-    
-    # Configurar contador de ventas basado en el último ID
-    # Esto evita duplicados de IDs al reiniciar el programa
-    if ventas:
-        ultimo_id = int(ventas[-1]['id_venta'].replace('V', ''))  # Extraer número del ID
-        contador_ventas = ultimo_id + 1  # Siguiente ID disponible
-    
-    # Si no hay productos, crear inventario inicial
-    # BUENA PRÁCTICA: Datos de ejemplo para probar el sistema
-    if not productos:
-        productos = {
-            'P001': {
-                'nombre': 'iPhone 15 Pro',
-                'marca': 'Apple',
-                'categoria': 'Smartphone',
-                'precio': 999.99,
-                'stock': 50,
-                'garantia': 12
-            },
-            # ... más productos de ejemplo
-        }
-        # Guardar los productos de ejemplo en el archivo
-        archivos.guardar_productos(productos)
+    # En el modo compartido el catálogo se lee con ventas.csv bloqueado: así se sabe
+    # exactamente hasta qué venta está descontado el stock (la versión)
+    with archivos.bloquear_ventas() if modo_compartido else nullcontext():
+        # Cargar datos desde archivos a memoria
+        productos = archivos.cargar_productos()
+        
+        # Si no hay productos, crear inventario inicial
+        # BUENA PRÁCTICA: Datos de ejemplo para probar el sistema
+        if not productos:
+            productos = {
+                'P001': {
+                    'nombre': 'iPhone 15 Pro',
+                    'marca': 'Apple',
+                    'categoria': 'Smartphone',
+                    'precio': 999.99,
+                    'stock': 50,
+                    'garantia': 12
+                },
+                # ... más productos de ejemplo
+            }
+            # Guardar los productos de ejemplo en el archivo
+            archivos.guardar_productos(productos)
+        elif not archivos.hay_checkpoint():
+            # Archivos de una versión anterior: el primer checkpoint marca desde dónde
+            # se descuentan las ventas nuevas
+            archivos.guardar_productos(productos)
+        if modo_compartido:
+            version_ventas = archivos.tamano_ventas()
+            firma_catalogo = archivos.firma_productos()
+    # Las ventas posteriores al checkpoint ya se descontaron al cargar
+    ventas_sin_checkpoint = 0
+    
+    # Cargar las ventas (no en el modo perezoso; en el compartido, hasta la versión del stock)
+    if modo_perezoso:
+        ventas = []
+    elif modo_compartido:
+        ventas = list(archivos.iterar_ventas(0, version_ventas))
+    else:
+        ventas = archivos.cargar_ventas()
+    
+    # Secuencias de IDs guardadas junto a los CSV
+    # Esto evita duplicados de IDs al reiniciar el programa (y entre procesos)
+    secuencia_productos = secuencias.Secuencia(archivos.ARCHIVO_SECUENCIA_PRODUCTOS, 'P', 3,
+                                               tamano_bloque=BLOQUE_IDS_PRODUCTOS)
+    secuencia_ventas = secuencias.Secuencia(archivos.ARCHIVO_SECUENCIA_VENTAS, 'V', 4,
+                                            tamano_bloque=BLOQUE_IDS_VENTAS)
+    # Primera vez (o archivo borrado): la marca de agua se calcula una sola vez con los datos existentes
+    if not secuencia_productos.existe():
+        secuencia_productos.asegurar_minimo(secuencias.ultimo_numero(productos, 'P'))
+    if not secuencia_ventas.existe():
+        if modo_perezoso:
+            # Solo se lee el final de ventas.csv para conocer el último ID
+            ultima = archivos.leer_ultima_venta()
+            ids_ventas = [ultima['id_venta']] if ultima else []
+        else:
+            ids_ventas = (v['id_venta'] for v in ventas)
+        secuencia_ventas.asegurar_minimo(secuencias.ultimo_numero(ids_ventas, 'V'))
+    
+    # Índice por fecha para los reportes de un período (en el modo perezoso se lee el disco)
+    indice_ventas = None if modo_perezoso else IndiceFechas(ventas)
+    
+    # Totales de ventas: se cargan del último checkpoint y solo se suman las ventas nuevas
+    agregados_ventas = None
+    if not hasattr(archivos, 'consultar_ventas_por_producto'):
+        agregados_ventas = _cargar_totales(Agregados, archivos.ARCHIVO_AGREGADOS, version_ventas or None)
+    
+    # Rollups por hora/día/mes: igual que los totales, desde su último checkpoint
+    rollups_ventas = None
+    if not hasattr(archivos, 'consultar_serie'):
+        rollups_ventas = _cargar_totales(Rollups, archivos.ARCHIVO_ROLLUPS, version_ventas or None)
+
+def _guardar_checkpoint():
+    """Reescribir productos.csv con el stock actual (en el modo compartido, con el bloqueo tomado)"""
+    global ventas_sin_checkpoint, firma_catalogo
+    if archivos.guardar_productos(productos):
+        ventas_sin_checkpoint = 0
+        if modo_compartido:
+            firma_catalogo = archivos.firma_productos()  # Cambio propio: no hace falta recargarlo
+    # Los totales de ventas se guardan junto con el stock
+    if agregados_ventas is not None:
+        agregados_ventas.guardar(archivos.ARCHIVO_AGREGADOS, archivos.tamano_ventas())
+    # Los cambios de marca no hace falta guardarlos: los cubos por marca se arman al cargar
+    if rollups_ventas is not None and rollups_ventas.sin_guardar() >= ROLLUPS_CADA_VENTAS:
+        rollups_ventas.guardar(archivos.ARCHIVO_ROLLUPS, archivos.tamano_ventas())
+
+def guardar_checkpoint():
+    """Reescribir productos.csv con el stock actual (checkpoint)"""
+    with _ventas_al_dia():
+        _guardar_checkpoint()
+
+def finalizar_datos():
+    """Guardar lo pendiente antes de salir del sistema"""
+    with _ventas_al_dia():
+        if ventas_sin_checkpoint:
+            _guardar_checkpoint()
+        if rollups_ventas is not None and rollups_ventas.sin_guardar():
+            rollups_ventas.guardar(archivos.ARCHIVO_ROLLUPS, archivos.tamano_ventas())
+    # IDs reservados y sin usar: vuelven a la secuencia (si nadie reservó después)
+    if secuencia_ventas is not None:
+        secuencia_ventas.devolver()
+    # CSV: escribir las ventas del búfer y cerrar ventas.csv; SQLite: cerrar la conexión
+    archivos.cerrar()
+
+def vaciar_ventas():
+    """Escribir ya las ventas que esperan en el búfer (ej: al presionar Ctrl+C)"""
+    if hasattr(archivos, 'vaciar_ventas'):
+        archivos.vaciar_ventas()
+
+# ===== MODO COMPARTIDO (VARIAS CAJAS) =====
+# Cada proceso tiene su propio 'productos' en memoria: si dos cajas validan
+# el stock al mismo tiempo, las dos pueden vender la última unidad.
+# ventas.csv es el registro de todos los cambios de stock, así que su tamaño
+# en bytes sirve como versión del stock: 'productos' de este proceso es el
+# checkpoint más todas las ventas hasta version_ventas.
+# Para vender se usa "compare-and-swap":
+#   1. sin bloqueo: aplicar las ventas nuevas de los demás y validar el stock
+#   2. con ventas.csv bloqueado: si sigue en la misma versión, escribir las
+#      ventas (la versión avanza); si otro proceso escribió, reintentar
+# El bloqueo solo dura la comparación y la escritura. Si hay mucha competencia
+# (INTENTOS_OPTIMISTAS fallidos), se valida con el bloqueo tomado.
+# Los cambios de catálogo (productos y checkpoints) también se hacen con el
+# bloqueo tomado y con todo al día; los demás procesos los ven al cambiar la
+# firma de productos.csv.
+
+def _registrar_en_memoria(venta):
+    """Agregar una venta al historial, al índice y a los totales en memoria"""
+    producto = productos.get(venta['id_producto'])
+    marca = producto['marca'] if producto else None
+    if not modo_perezoso:
+        ventas.append(venta)
+        indice_ventas.agregar(venta['fecha'], len(ventas) - 1)
+    if agregados_ventas is not None:
+        agregados_ventas.registrar(venta, marca)  # O(1)
+    if rollups_ventas is not None:
+        rollups_ventas.registrar(venta, marca)  # O(1)
+
+def _aplicar_ventas_ajenas(hasta):
+    """Aplicar las ventas que escribieron otros procesos desde version_ventas"""
+    global version_ventas
+    for venta in archivos.iterar_ventas(version_ventas, hasta):
+        producto = productos.get(venta['id_producto'])
+        if producto is not None:
+            producto['stock'] -= venta['cantidad']
+        _registrar_en_memoria(venta)
+    version_ventas = hasta
+
+def sincronizar(bloqueado=False):
+    """Modo compartido: ponerse al día con las ventas y el catálogo de los otros procesos"""
+    global productos, firma_catalogo
+    if not modo_compartido:
+        return
+    if archivos.firma_productos() == firma_catalogo:
+        _aplicar_ventas_ajenas(archivos.tamano_ventas())
+        return
+    # Otro proceso reescribió productos.csv: se vuelve a leer con ventas.csv bloqueado
+    if not bloqueado:
+        with archivos.bloquear_ventas():
+            sincronizar(bloqueado=True)
+        return
+    _aplicar_ventas_ajenas(archivos.tamano_ventas())
+    # El stock del disco (checkpoint + ventas posteriores) ya está en la versión actual
+    productos = archivos.cargar_productos(avisar=False)
+    firma_catalogo = archivos.firma_productos()
+    # Las marcas pueden haber cambiado: los totales por marca se vuelven a armar
+    if agregados_ventas is not None:
+        agregados_ventas.recalcular_marcas(productos)
+    if rollups_ventas is not None:
+        rollups_ventas.recalcular_marcas(productos)
+
+@contextmanager
+def _ventas_al_dia():
+    """Modo compartido: bloquear ventas.csv y ponerse al día (para cambiar el catálogo)"""
+    if not modo_compartido:
+        yield
+        return
+    with archivos.bloquear_ventas():
+        sincronizar(bloqueado=True)
+        yield
+
+def _vender_compartido(preparar):
+    """Guardar las ventas que arma preparar() con compare-and-swap sobre la versión de ventas.csv"""
+    global version_ventas
+    ids = []
+    for intento in range(INTENTOS_OPTIMISTAS + 1):
+        optimista = intento < INTENTOS_OPTIMISTAS
+        if optimista:
+            # Sin bloqueo: aplicar las ventas de los demás y validar con esa versión del stock
+            sincronizar()
+            ventas_nuevas = preparar()
+            # Los IDs se piden fuera del bloqueo y se reusan en los reintentos
+            if len(ids) < len(ventas_nuevas):
+                ids += secuencia_ventas.siguientes(len(ventas_nuevas) - len(ids))
+        with archivos.bloquear_ventas():
+            archivos.terminar_linea_cortada()
+            if optimista and (archivos.tamano_ventas() != version_ventas
+                              or archivos.firma_productos() != firma_catalogo):
+                continue  # Otro proceso escribió después de validar: reintentar
+            if not optimista:
+                # Mucha competencia: validar con el bloqueo tomado (siempre termina)
+                sincronizar(bloqueado=True)
+                ventas_nuevas = preparar()
+                if len(ids) < len(ventas_nuevas):
+                    ids += secuencia_ventas.siguientes(len(ventas_nuevas) - len(ids))
+            for venta, id_venta in zip(ventas_nuevas, ids):
+                venta['id_venta'] = id_venta
+            # Las ventas quedan en el archivo antes de soltar el bloqueo (o se lanza OSError)
+            _aplicar_ventas(ventas_nuevas)
+            version_ventas = archivos.tamano_ventas()
+            return ventas_nuevas
+
+def _vender(preparar):
+    """Validar (preparar() lanza ValueError si no se puede) y guardar ventas nuevas"""
+    if modo_compartido:
+        return _vender_compartido(preparar)
+    ventas_nuevas = preparar()
+    _aplicar_ventas(ventas_nuevas)
+    return ventas_nuevas
 
 # ===== CRUD DE PRODUCTOS =====
 # ESTAS FUNCIONES SON REUTILIZABLES PARA CUALQUIER SISTEMA DE INVENTARIO
+# crear/modificar/borrar_producto no piden nada por teclado (las usan el menú
+# y el servidor, ver servidor.py); agregar/actualizar/eliminar_producto son
+# las opciones del menú.
+
+# Regla de cada campo del producto y el motivo si no se cumple
+REGLAS_PRODUCTO = {
+    'nombre': (lambda valor: bool(valor), "El nombre no puede estar vacío"),
+    'marca': (lambda valor: bool(valor), "La marca no puede estar vacía"),
+    'categoria': (lambda valor: bool(valor), "La categoría no puede estar vacía"),
+    'precio': (lambda valor: valor > 0, "El precio debe ser positivo"),
+    'stock': (lambda valor: valor >= 0, "El stock no puede ser negativo"),
+    'garantia': (lambda valor: valor >= 0, "La garantía no puede ser negativa")
+}
+
+def error_producto(campo, valor):
+    """Motivo por el que un valor no sirve para un campo del producto (None si sirve)"""
+    if campo not in REGLAS_PRODUCTO:
+        return f"Campo desconocido: {campo}"
+    regla, motivo = REGLAS_PRODUCTO[campo]
+    return None if regla(valor) else motivo
+
+def _validar_producto(datos):
+    """Revisar los campos de un producto (todos o solo los que cambian) - ValueError con el motivo"""
+    for campo, valor in datos.items():
+        motivo = error_producto(campo, valor)
+        if motivo:
+            raise ValueError(motivo)
+
+def _campo_valido(campo, valor):
+    """Menú: mostrar el motivo si el valor no sirve; retorna True si sirve"""
+    motivo = error_producto(campo, valor)
+    if motivo:
+        print(f"❌ {motivo}")
+    return motivo is None
+
+def crear_producto(nombre, marca, categoria, precio, stock, garantia):
+    """Agregar un producto y guardarlo; retorna su ID nuevo (ValueError si un dato no sirve)"""
+    datos = {'nombre': nombre, 'marca': marca, 'categoria': categoria,
+             'precio': precio, 'stock': stock, 'garantia': garantia}
+    _validar_producto(datos)
+    
+    # Generar nuevo ID automáticamente - EVITA IDs DUPLICADOS
+    # Se pide recién ahora para no gastar IDs en entradas inválidas
+    nuevo_id = secuencia_productos.siguiente()  # Formato: P001, P002, ..., P1000
+    
+    with _ventas_al_dia():
+        # Agregar producto al diccionario
+        productos[nuevo_id] = datos
+        
+        # Persistir inmediatamente - BUENA PRÁCTICA: Guardar cambios en disco
+        _guardar_checkpoint()  # También es un checkpoint del stock
+    return nuevo_id
+
+def modificar_producto(id_producto, **cambios):
+    """
+    Cambiar algunos campos de un producto y guardarlo; retorna el producto.
+    LookupError si no existe, ValueError si un dato no sirve.
+    """
+    _validar_producto(cambios)
+    with _ventas_al_dia():
+        # Modo compartido: otra caja pudo eliminarlo mientras tanto
+        if id_producto not in productos:
+            raise LookupError(f"Producto no encontrado: {id_producto}")
+        producto = productos[id_producto]
+        if 'marca' in cambios:
+            # Las ventas del producto pasan a contar para la nueva marca
+            if agregados_ventas is not None:
+                agregados_ventas.cambiar_marca(id_producto, producto['marca'], cambios['marca'])
+            if rollups_ventas is not None:
+                rollups_ventas.cambiar_marca(id_producto, producto['marca'], cambios['marca'])
+        producto.update(cambios)
+        
+        _guardar_checkpoint()  # También es un checkpoint del stock
+    return producto
+
+def borrar_producto(id_producto):
+    """Eliminar un producto y guardar el cambio (LookupError si no existe)"""
+    with _ventas_al_dia():
+        if id_producto not in productos:
+            raise LookupError(f"Producto no encontrado: {id_producto}")  # Ya lo eliminó otra caja
+        # Sus ventas siguen en el top de productos, pero ya no cuentan para su marca
+        if agregados_ventas is not None:
+            agregados_ventas.quitar_de_marca(id_producto, productos[id_producto]['marca'])
+        if rollups_ventas is not None:
+            rollups_ventas.quitar_de_marca(id_producto, productos[id_producto]['marca'])
+        del productos[id_producto]  # Eliminar del diccionario
+        _guardar_checkpoint()  # También es un checkpoint del stock
 
 def agregar_producto():
     """Agregar un nuevo producto al inventario"""
     try:
         print("\n=== AGREGAR NUEVO PRODUCTO ===")
         
-        # Generar nuevo ID automáticamente - EVITA IDs DUPLICADOS
-        if productos:
-            # Encontrar el máximo ID existente y incrementarlo
-            ultimo_id = max([int(pid.replace('P', '')) for pid in productos.keys()])
-            nuevo_id = f"P{str(ultimo_id + 1).zfill(3)}"  # Formato: P001, P002, etc.
-        else:
-            nuevo_id = "P001"  # Primer producto
-        
         # Validaciones de entrada - BUENA PRÁCTICA: Validar antes de procesar
         nombre = input("Nombre del producto: ").strip()
-        if not nombre:
-            print("❌ El nombre no puede estar vacío")
+        if not _campo_valido('nombre', nombre):
             return  # Salir temprano si hay error
         
         marca = input("Marca: ").strip()
-        if not marca:
-            print("❌ La marca no puede estar vacía")
+        if not _campo_valido('marca', marca):
             return
         
         categoria = input("Categoría: ").strip()
-        if not categoria:
-            print("❌ La categoría no puede estar vacía")
+        if not _campo_valido('categoria', categoria):
             return
         
         # Conversión con validación
         precio = float(input("Precio unitario: $"))
-        if precio <= 0:
-            print("❌ El precio debe ser positivo")
+        if not _campo_valido('precio', precio):
             return
         
         stock = int(input("Stock inicial: "))
-        if stock < 0:
-            print("❌ El stock no puede ser negativo")
+        if not _campo_valido('stock', stock):
             return
         
         garantia = int(input("Garantía (meses): "))
-        if garantia < 0:
-            print("❌ La garantía no puede ser negativa")
+        if not _campo_valido('garantia', garantia):
             return
         
-        # Agregar producto al diccionario
-        productos[nuevo_id] = {
-            'nombre': nombre,
-            'marca': marca,
-            'categoria': categoria,
-            'precio': precio,
-            'stock': stock,
-            'garantia': garantia
-        }
-        
-        # Persistir inmediatamente - BUENA PRÁCTICA: Guardar cambios en disco
-        archivos.guardar_productos(productos)
+        nuevo_id = crear_producto(nombre, marca, categoria, precio, stock, garantia)
         print(f"✅ Producto agregado exitosamente con ID: {nuevo_id}")
         
     except ValueError:
@@ -155,23 +497,28 @@ def actualizar_producto():
         stock = input(f"Stock [{productos[id_producto]['stock']}]: ").strip()
         garantia = input(f"Garantía [{productos[id_producto]['garantia']} meses]: ").strip()
         
-        # Actualizar solo los campos que cambiaron
+        # Cambiar solo los campos que se escribieron
+        cambios = {}
         if nombre:
-            productos[id_producto]['nombre'] = nombre
+            cambios['nombre'] = nombre
         if marca:
-            productos[id_producto]['marca'] = marca
+            cambios['marca'] = marca
         if categoria:
-            productos[id_producto]['categoria'] = categoria
+            cambios['categoria'] = categoria
         if precio:
-            productos[id_producto]['precio'] = float(precio)
+            cambios['precio'] = float(precio)
         if stock:
-            productos[id_producto]['stock'] = int(stock)
+            cambios['stock'] = int(stock)
         if garantia:
-            productos[id_producto]['garantia'] = int(garantia)
+            cambios['garantia'] = int(garantia)
+        if not all(_campo_valido(campo, valor) for campo, valor in cambios.items()):
+            return
         
-        archivos.guardar_productos(productos)
+        modificar_producto(id_producto, **cambios)
         print("✅ Producto actualizado exitosamente")
         
+    except LookupError as e:
+        print(f"❌ {e}")
     except ValueError:
         print("❌ Entrada inválida")
     except Exception as e:
@@ -191,22 +538,133 @@ def eliminar_producto():
         confirmar = input(f"¿Está seguro de eliminar '{productos[id_producto]['nombre']}'? (si/no): ").lower()
         
         if confirmar == 'si':
-            del productos[id_producto]  # Eliminar del diccionario
-            archivos.guardar_productos(productos)
+            borrar_producto(id_producto)
             print("✅ Producto eliminado exitosamente")
         else:
             print("❌ Eliminación cancelada")
             
+    except LookupError as e:
+        print(f"❌ {e}")
     except Exception as e:
         print(f"❌ Error al eliminar producto: {e}")
 
 # ===== GESTIÓN DE VENTAS =====
 # ESTAS FUNCIONES PUEDEN ADAPTARSE PARA DIFERENTES TIPOS DE TRANSACCIONES
 
-def registrar_venta():
-    """Registrar una nueva venta"""
-    global contador_ventas  # Modificar variable global
+def _calcular_pedido(cliente, tipo_cliente, lineas, reservado=None):
+    """
+    Validar un pedido completo y calcular sus ventas sin modificar nada.
+    lineas: lista de (id_producto, cantidad). reservado: unidades ya tomadas por
+    otros pedidos que todavía no descontaron su stock (importación).
+    Lanza ValueError con el motivo si alguna línea no se puede vender.
+    """
+    if not cliente:
+        raise ValueError("El nombre del cliente no puede estar vacío")
+    if tipo_cliente not in DESCUENTOS_CLIENTE:
+        raise ValueError(f"Tipo de cliente inválido: {tipo_cliente}")
+    if not lineas:
+        raise ValueError("El pedido no tiene productos")
+    
+    # Un mismo producto puede aparecer en varias líneas: se valida el total pedido
+    pedido = {}
+    for id_producto, cantidad in lineas:
+        if id_producto not in productos:
+            raise ValueError(f"Producto no encontrado: {id_producto}")
+        if cantidad <= 0:
+            raise ValueError(f"La cantidad debe ser positiva ({id_producto})")
+        pedido[id_producto] = pedido.get(id_producto, 0) + cantidad
+    for id_producto, cantidad in pedido.items():
+        disponible = productos[id_producto]['stock'] - (reservado or {}).get(id_producto, 0)
+        if disponible < cantidad:
+            raise ValueError(f"Stock insuficiente de {id_producto}. Disponible: {disponible}")
+    
+    # CÁLCULOS DE LA VENTA - REUTILIZABLE PARA CUALQUIER SISTEMA DE VENTAS
+    porcentaje_descuento = DESCUENTOS_CLIENTE[tipo_cliente]
+    ventas_pedido = []
+    for id_producto, cantidad in lineas:
+        precio_unitario = productos[id_producto]['precio']
+        subtotal = precio_unitario * cantidad
+        monto_descuento = subtotal * (porcentaje_descuento / 100)
+        ventas_pedido.append({
+            'cliente': cliente,
+            'tipo_cliente': tipo_cliente,
+            'id_producto': id_producto,
+            'nombre_producto': productos[id_producto]['nombre'],
+            'cantidad': cantidad,
+            'precio_unitario': precio_unitario,
+            'descuento': porcentaje_descuento,
+            'total': subtotal - monto_descuento
+        })
+    return ventas_pedido
+
+def _aplicar_ventas(ventas_nuevas):
+    """Dar IDs, guardar ventas ya validadas (una sola escritura) y descontar stock (OSError si no se guardan)"""
+    global ventas_sin_checkpoint
+    # Todos los IDs con un solo acceso a ventas.seq (el modo compartido ya los trae)
+    sin_id = [venta for venta in ventas_nuevas if 'id_venta' not in venta]
+    for venta, id_venta in zip(sin_id, secuencia_ventas.siguientes(len(sin_id))):
+        venta['id_venta'] = id_venta
+    
+    # Guardar primero (también registra el cambio de stock): todas las líneas juntas.
+    # Si falla, la memoria queda como estaba (y en el modo compartido la versión no avanza).
+    # En el modo compartido tienen que estar en el archivo antes de soltar el bloqueo
+    if not archivos.guardar_ventas(ventas_nuevas, vaciar=modo_compartido):
+        raise OSError("No se pudieron guardar las ventas")
     
+    for venta in ventas_nuevas:
+        # Actualizar stock del producto
+        productos[venta['id_producto']]['stock'] -= venta['cantidad']
+        _registrar_en_memoria(venta)
+    
+    # productos.csv se reescribe solo cada CHECKPOINT_CADA_VENTAS ventas
+    # (en el modo compartido esto ya corre con el bloqueo tomado y todo al día)
+    ventas_sin_checkpoint += len(ventas_nuevas)
+    if ventas_sin_checkpoint >= CHECKPOINT_CADA_VENTAS:
+        _guardar_checkpoint()
+
+def registrar_pedido(cliente, tipo_cliente, lineas, fecha=None):
+    """
+    Registrar un pedido de varias líneas [(id_producto, cantidad), ...].
+    Se valida completo antes de descontar stock: o se registran todas las
+    líneas o ninguna (ValueError con el motivo). Retorna las ventas creadas.
+    """
+    # Todas las líneas del pedido llevan la misma fecha
+    fecha = fecha or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    def preparar():
+        ventas_pedido = _calcular_pedido(cliente, tipo_cliente, lineas)
+        for venta in ventas_pedido:
+            venta['fecha'] = fecha
+        return ventas_pedido
+    
+    return _vender(preparar)
+
+def mostrar_recibo(ventas_pedido):
+    """Mostrar el recibo de un pedido"""
+    primera = ventas_pedido[0]
+    subtotal = sum(venta['precio_unitario'] * venta['cantidad'] for venta in ventas_pedido)
+    total = sum(venta['total'] for venta in ventas_pedido)
+    ids = primera['id_venta'] if len(ventas_pedido) == 1 else f"{primera['id_venta']} a {ventas_pedido[-1]['id_venta']}"
+    
+    print("\n" + "="*70)
+    print("RECIBO DE VENTA")
+    print("="*70)
+    print(f"ID Venta: {ids}")
+    print(f"Cliente: {primera['cliente']} ({primera['tipo_cliente']})")
+    print(f"{'Producto':<30} {'Cant':>5} {'Precio Unit.':>14} {'Total':>14}")
+    for venta in ventas_pedido:
+        precio = f"${venta['precio_unitario']:.2f}"
+        total_linea = f"${venta['total']:.2f}"
+        print(f"{venta['nombre_producto']:<30} {venta['cantidad']:>5} {precio:>14} {total_linea:>14}")
+    print("-"*70)
+    print(f"Subtotal: ${subtotal:.2f}")
+    print(f"Descuento: {primera['descuento']}% (-${subtotal - total:.2f})")
+    print(f"TOTAL: ${total:.2f}")
+    print(f"Fecha: {primera['fecha']}")
+    print("="*70)
+
+def registrar_venta():
+    """Registrar una nueva venta (uno o varios productos)"""
     try:
         print("\n=== REGISTRAR NUEVA VENTA ===")
         
@@ -227,77 +685,134 @@ def registrar_venta():
             print("❌ Tipo de cliente inválido")
             return
         
-        id_producto = input("ID del producto: ").strip().upper()
-        if id_producto not in productos:
-            print("❌ Producto no encontrado")
-            return
-        
-        cantidad = int(input("Cantidad: "))
-        if cantidad <= 0:
-            print("❌ La cantidad debe ser positiva")
-            return
+        # Carrito: se piden productos hasta dejar el ID vacío
+        print("\nAgregue los productos (Enter sin ID para terminar)")
+        lineas = []
+        en_carrito = {}  # Unidades de cada producto ya agregadas
+        while True:
+            id_producto = input("ID del producto: ").strip().upper()
+            if not id_producto:
+                break
+            if id_producto not in productos:
+                print("❌ Producto no encontrado")
+                continue
+            try:
+                cantidad = int(input("Cantidad: "))
+            except ValueError:
+                print("❌ Cantidad inválida")
+                continue
+            if cantidad <= 0:
+                print("❌ La cantidad debe ser positiva")
+                continue
+            # Validar stock disponible (descontando lo que ya está en el carrito)
+            disponible = productos[id_producto]['stock'] - en_carrito.get(id_producto, 0)
+            if disponible < cantidad:
+                print(f"❌ Stock insuficiente. Disponible: {disponible}")
+                continue
+            lineas.append((id_producto, cantidad))
+            en_carrito[id_producto] = en_carrito.get(id_producto, 0) + cantidad
         
-        # Validar stock disponible
-        if productos[id_producto]['stock'] < cantidad:
-            print(f"❌ Stock insuficiente. Disponible: {productos[id_producto]['stock']}")
+        if not lineas:
+            print("❌ La venta no tiene productos")
             return
         
-        # CÁLCULOS DE LA VENTA - REUTILIZABLE PARA CUALQUIER SISTEMA DE VENTAS
-        precio_unitario = productos[id_producto]['precio']
-        porcentaje_descuento = DESCUENTOS_CLIENTE[tipo_cliente]
-        subtotal = precio_unitario * cantidad
-        monto_descuento = subtotal * (porcentaje_descuento / 100)
-        total = subtotal - monto_descuento
-        
-        # Crear registro de venta con todos los datos necesarios
-        id_venta = f"V{str(contador_ventas).zfill(4)}"  # Formato: V0001, V0002, etc.
-        venta = {
-            'id_venta': id_venta,
-            'cliente': cliente,
-            'tipo_cliente': tipo_cliente,
-            'id_producto': id_producto,
-            'nombre_producto': productos[id_producto]['nombre'],
-            'cantidad': cantidad,
-            'precio_unitario': precio_unitario,
-            'descuento': porcentaje_descuento,
-            'total': total,
-            'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # Timestamp exacto
-        }
-        
-        # Actualizar stock del producto
-        productos[id_producto]['stock'] -= cantidad
-        
-        # Persistir todos los cambios
-        ventas.append(venta)
-        archivos.guardar_venta(venta)  # Guardar en archivo
-        archivos.guardar_productos(productos)  # Actualizar stock en archivo
-        
-        contador_ventas += 1  # Incrementar para próxima venta
-        
-        # Mostrar recibo detallado al usuario
-        print("\n" + "="*50)
-        print("RECIBO DE VENTA")
-        print("="*50)
-        print(f"ID Venta: {id_venta}")
-        print(f"Cliente: {cliente} ({tipo_cliente})")
-        print(f"Producto: {productos[id_producto]['nombre']}")
-        print(f"Cantidad: {cantidad}")
-        print(f"Precio Unitario: ${precio_unitario:.2f}")
-        print(f"Subtotal: ${subtotal:.2f}")
-        print(f"Descuento: {porcentaje_descuento}% (-${monto_descuento:.2f})")
-        print(f"TOTAL: ${total:.2f}")
-        print(f"Fecha: {venta['fecha']}")
-        print("="*50)
+        mostrar_recibo(registrar_pedido(cliente, tipo_cliente, lineas))
         print("✅ Venta registrada exitosamente")
         
-    except ValueError:
-        print("❌ Entrada inválida")
+    except ValueError as e:
+        print(f"❌ {e}")
     except Exception as e:
         print(f"❌ Error al registrar venta: {e}")
 
+# ===== IMPORTACIÓN DE PEDIDOS =====
+# CSV con una fila por línea de pedido:
+#   Pedido,Cliente,Tipo_Cliente,ID_Producto,Cantidad[,Fecha]
+# Las filas con el mismo Pedido forman un pedido (cliente, tipo y fecha se
+# toman de su primera fila). El archivo se lee una sola vez; cada pedido se
+# valida completo contra el stock que dejan los anteriores y los que no se
+# pueden hacer se rechazan enteros. Todas las ventas aceptadas se guardan
+# con una sola escritura en ventas.csv y un solo checkpoint de productos.csv.
+
+COLUMNAS_PEDIDOS = ['Pedido', 'Cliente', 'Tipo_Cliente', 'ID_Producto', 'Cantidad']
+
+def cargar_pedidos_csv(ruta):
+    """Importar pedidos desde un CSV. Retorna (pedidos aceptados, [(pedido, motivo) rechazados])"""
+    # Una pasada por el archivo: agrupar las filas por pedido (en orden de aparición)
+    pedidos = {}
+    with open(ruta, 'r', newline='', encoding='utf-8') as archivo:
+        reader = csv.DictReader(archivo)
+        faltantes = [columna for columna in COLUMNAS_PEDIDOS if columna not in (reader.fieldnames or [])]
+        if faltantes:
+            raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+        for fila in reader:
+            pedido = pedidos.setdefault(fila['Pedido'], {'fila': fila, 'lineas': [], 'error': None})
+            try:
+                pedido['lineas'].append((fila['ID_Producto'].strip().upper(), int(fila['Cantidad'])))
+            except (ValueError, TypeError, AttributeError):
+                pedido['error'] = pedido['error'] or f"Cantidad inválida: {fila['Cantidad']}"
+    
+    ahora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rechazados = []
+    
+    def preparar():
+        # En el modo compartido se puede repetir si otra caja vendió mientras tanto
+        rechazados.clear()
+        reservado = {}  # Unidades tomadas por los pedidos ya aceptados
+        ventas_importadas = []
+        for numero, pedido in pedidos.items():
+            fila = pedido['fila']
+            try:
+                if pedido['error']:
+                    raise ValueError(pedido['error'])
+                fecha = normalizar_fecha(fila['Fecha']) if fila.get('Fecha') else ahora
+                ventas_pedido = _calcular_pedido(fila['Cliente'].strip(), fila['Tipo_Cliente'].strip().lower(),
+                                                 pedido['lineas'], reservado)
+            except (ValueError, AttributeError) as e:
+                rechazados.append((numero, str(e)))
+                continue
+            for venta in ventas_pedido:
+                venta['fecha'] = fecha
+                reservado[venta['id_producto']] = reservado.get(venta['id_producto'], 0) + venta['cantidad']
+            ventas_importadas.extend(ventas_pedido)
+        return ventas_importadas
+    
+    if _vender(preparar):
+        guardar_checkpoint()  # Un solo productos.csv para toda la importación
+    return len(pedidos) - len(rechazados), rechazados
+
+def importar_pedidos():
+    """Importar pedidos desde un archivo CSV"""
+    print("\n=== IMPORTAR PEDIDOS DESDE CSV ===")
+    print(f"Columnas: {','.join(COLUMNAS_PEDIDOS)}[,Fecha]")
+    ruta = input("Ruta del archivo CSV: ").strip()
+    if not ruta:
+        print("❌ Debe indicar un archivo")
+        return
+    try:
+        aceptados, rechazados = cargar_pedidos_csv(ruta)
+    except FileNotFoundError:
+        print(f"❌ No existe el archivo '{ruta}'")
+        return
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    print(f"✅ {aceptados} pedidos importados")
+    if rechazados:
+        print(f"⚠️ {len(rechazados)} pedidos rechazados:")
+        for numero, motivo in rechazados[:20]:
+            print(f"  - {numero}: {motivo}")
+        if len(rechazados) > 20:
+            print(f"  ... y {len(rechazados) - 20} más")
+
 def ver_ventas():
     """Mostrar todas las ventas"""
-    if not ventas:
+    historial = ventas
+    if modo_perezoso:
+        # Se leen de a una desde el disco: se mira la primera para saber si hay alguna
+        filas = archivos.iterar_ventas()
+        primera = next(filas, None)
+        historial = [] if primera is None else chain([primera], filas)
+    if not historial:
         print("\n❌ No hay ventas registradas")
         return
     
@@ -306,7 +821,7 @@ def ver_ventas():
     print(f"{'ID Venta':<10} {'Cliente':<20} {'Tipo':<12} {'Producto':<30} {'Cant':<6} {'Precio':<10} {'Desc%':<7} {'Total':<10} {'Fecha':<20}")
     print("="*130)
     
-    for venta in ventas:
+    for venta in historial:
         print(f"{venta['id_venta']:<10} {venta['cliente']:<20} {venta['tipo_cliente']:<12} "
               f"{venta['nombre_producto']:<30} {venta['cantidad']:<6} ${venta['precio_unitario']:<9.2f} "
               f"{venta['descuento']:<6}% ${venta['total']:<9.2f} {venta['fecha']:<20}")
@@ -314,19 +829,58 @@ def ver_ventas():
     print("="*130)
 
 # ===== REPORTES =====
-# ESTAS FUNCIONES DE ANÁLISIS SON REUTILIZABLES PARA DIFERENTES DATOS
+# Cada reporte obtiene sus datos con una función resumen_* y después los muestra.
+# Si el backend sabe agrupar por su cuenta (SQLite), la agrupación se hace ahí;
+# en el modo de análisis se usan las columnas NumPy (ventas_columnar);
+# si no, se usan los totales materializados (agregados_ventas).
+# Recorrer todas las ventas queda solo como respaldo.
+#
+# Todos aceptan un período opcional (inicio, fin: fechas 'AAAA-MM-DD HH:MM:SS',
+# ambas incluidas). Con período se leen solo las ventas de esas fechas,
+# que se encuentran con el índice por fecha (indice_ventas).
 
-def top_3_productos():
-    """Mostrar top 3 productos más vendidos"""
-    print("\n=== TOP 3 PRODUCTOS MÁS VENDIDOS ===")
-    
-    if not ventas:
-        print("❌ No hay datos de ventas disponibles")
-        return
+def ventas_en_periodo(inicio=None, fin=None):
+    """Ventas entre dos fechas usando el índice - O(log n + k)"""
+    if modo_perezoso:
+        # Generador sobre ventas.csv: se recorre una sola vez y la memoria no crece
+        filas = archivos.iterar_ventas()
+        if inicio is None and fin is None:
+            return filas
+        return (venta for venta in filas
+                if (inicio is None or venta['fecha'] >= inicio) and (fin is None or venta['fecha'] <= fin))
+    if inicio is None and fin is None:
+        return ventas
+    return [ventas[posicion] for posicion in indice_ventas.posiciones_en(inicio, fin)]
+
+def contar_ventas(inicio=None, fin=None):
+    """Cantidad de ventas del período"""
+    if ventas_columnar is not None:
+        return ventas_columnar.contar(inicio, fin)
+    if modo_perezoso:
+        if inicio is None and fin is None and agregados_ventas is not None:
+            return agregados_ventas.ventas
+        return sum(1 for _ in ventas_en_periodo(inicio, fin))
+    return indice_ventas.contar(inicio, fin) if indice_ventas is not None else len(ventas)
+
+def hay_ventas(inicio=None, fin=None):
+    """Indica si hay ventas para los reportes"""
+    if modo_perezoso and ventas_columnar is None:
+        # Alcanza con encontrar la primera venta del período
+        return next(iter(ventas_en_periodo(inicio, fin)), None) is not None
+    return contar_ventas(inicio, fin) > 0
+
+def resumen_por_producto(inicio=None, fin=None):
+    """Unidades e ingresos por producto: {id: {'nombre', 'cantidad', 'ingresos'}}"""
+    if hasattr(archivos, 'consultar_ventas_por_producto'):
+        return archivos.consultar_ventas_por_producto(inicio, fin)
+    if ventas_columnar is not None:
+        return ventas_columnar.por_producto(inicio, fin)
+    if agregados_ventas is not None and inicio is None and fin is None:
+        return agregados_ventas.por_producto
     
     # Agrupar ventas por producto usando diccionario
     ventas_por_producto = {}
-    for venta in ventas:
+    for venta in ventas_en_periodo(inicio, fin):
         pid = venta['id_producto']
         if pid in ventas_por_producto:
             # Acumular cantidad e ingresos
@@ -339,31 +893,20 @@ def top_3_productos():
                 'cantidad': venta['cantidad'],
                 'ingresos': venta['total']
             }
-    
-    # Ordenar por cantidad vendida (descendente) usando lambda
-    # REUTILIZABLE: Cambiando la key se pueden hacer diferentes ordenamientos
-    productos_ordenados = sorted(ventas_por_producto.items(), 
-                               key=lambda x: x[1]['cantidad'], 
-                               reverse=True)
-    
-    print(f"\n{'Posición':<10} {'ID Producto':<12} {'Nombre Producto':<35} {'Unidades':<12} {'Ingresos':<12}")
-    print("="*85)
-    
-    # Mostrar solo los top 3
-    for i, (pid, datos) in enumerate(productos_ordenados[:3], 1):
-        print(f"{i:<10} {pid:<12} {datos['nombre']:<35} {datos['cantidad']:<12} ${datos['ingresos']:<11.2f}")
+    return ventas_por_producto
 
-def ventas_por_marca():
-    """Mostrar ventas agrupadas por marca"""
-    print("\n=== VENTAS POR MARCA ===")
-    
-    if not ventas:
-        print("❌ No hay datos de ventas disponibles")
-        return
+def resumen_por_marca(inicio=None, fin=None):
+    """Unidades e ingresos por marca: {marca: {'unidades', 'ingresos'}}"""
+    if hasattr(archivos, 'consultar_ventas_por_marca'):
+        return archivos.consultar_ventas_por_marca(inicio, fin)
+    if ventas_columnar is not None:
+        return ventas_columnar.por_marca(productos, inicio, fin)
+    if agregados_ventas is not None and inicio is None and fin is None:
+        return agregados_ventas.por_marca
     
     ventas_marca = {}
     
-    for venta in ventas:
+    for venta in ventas_en_periodo(inicio, fin):
         pid = venta['id_producto']
         if pid in productos:
             marca = productos[pid]['marca']
@@ -377,6 +920,112 @@ def ventas_por_marca():
                     'unidades': venta['cantidad'],
                     'ingresos': venta['total']
                 }
+    return ventas_marca
+
+def resumen_ingresos(inicio=None, fin=None):
+    """Ingresos brutos, netos y descuentos: {'bruto', 'neto', 'descuento'}"""
+    if hasattr(archivos, 'consultar_ingresos'):
+        return archivos.consultar_ingresos(inicio, fin)
+    if ventas_columnar is not None:
+        return ventas_columnar.ingresos(inicio, fin)
+    if agregados_ventas is not None and inicio is None and fin is None:
+        return {'bruto': agregados_ventas.bruto, 'neto': agregados_ventas.neto,
+                'descuento': agregados_ventas.bruto - agregados_ventas.neto}
+    
+    # Una sola pasada: en el modo perezoso las ventas llegan de un generador
+    ingreso_bruto = ingreso_neto = 0
+    for venta in ventas_en_periodo(inicio, fin):
+        ingreso_bruto += venta['precio_unitario'] * venta['cantidad']
+        ingreso_neto += venta['total']
+    return {'bruto': ingreso_bruto, 'neto': ingreso_neto, 'descuento': ingreso_bruto - ingreso_neto}
+
+def resumen_vendidos(inicio=None, fin=None):
+    """Unidades vendidas de todos los productos en una sola pasada: {id: unidades} (None si no aplica)"""
+    if hasattr(archivos, 'consultar_vendido_por_producto'):
+        return archivos.consultar_vendido_por_producto(inicio, fin)
+    if ventas_columnar is not None:
+        return ventas_columnar.vendido_por_producto(inicio, fin)
+    if inicio is None and fin is None:
+        return None  # Se usa vendido_por_producto (O(1) con los agregados)
+    vendidos = {}
+    for venta in ventas_en_periodo(inicio, fin):
+        vendidos[venta['id_producto']] = vendidos.get(venta['id_producto'], 0) + venta['cantidad']
+    return vendidos
+
+def vendido_por_producto(pid):
+    """Total de unidades vendidas de un producto"""
+    if agregados_ventas is not None:
+        return agregados_ventas.vendido(pid)  # O(1)
+    # REUTILIZABLE: Esta técnica de sum con comprensión de lista es muy útil
+    return sum([v['cantidad'] for v in ventas if v['id_producto'] == pid])
+
+def resumen_top_productos(inicio=None, fin=None, cantidad=3):
+    """Productos más vendidos: lista de (id, {'nombre', 'cantidad', 'ingresos'}) ordenada"""
+    # Ordenar por cantidad vendida (descendente) usando lambda
+    # REUTILIZABLE: Cambiando la key se pueden hacer diferentes ordenamientos
+    productos_ordenados = sorted(resumen_por_producto(inicio, fin).items(),
+                               key=lambda x: x[1]['cantidad'],
+                               reverse=True)
+    return productos_ordenados[:cantidad]
+
+def estado_inventario(stock, vendido):
+    """Estado de un producto según su stock y lo vendido"""
+    # Lógica de clasificación de estado - FÁCIL DE MODIFICAR
+    if stock == 0:
+        return "SIN STOCK"
+    elif stock < 10:
+        return "STOCK BAJO"
+    elif vendido > stock:
+        return "ALTA DEMANDA"
+    return "NORMAL"
+
+def resumen_rendimiento(inicio=None, fin=None):
+    """Stock, unidades vendidas y estado de cada producto: lista de dicts"""
+    # Con SQLite, NumPy o un período se obtienen todas las unidades vendidas de una sola vez
+    vendidos = resumen_vendidos(inicio, fin)
+    filas = []
+    for pid, datos in productos.items():
+        # Calcular total vendido para este producto
+        vendido = vendidos.get(pid, 0) if vendidos is not None else vendido_por_producto(pid)
+        filas.append({'id_producto': pid, 'nombre': datos['nombre'], 'stock': datos['stock'],
+                      'vendido': vendido, 'estado': estado_inventario(datos['stock'], vendido)})
+    return filas
+
+def mostrar_periodo(inicio, fin):
+    """Mostrar el período del reporte (si hay uno)"""
+    if inicio is not None or fin is not None:
+        print(f"Período: {inicio or 'el principio'} a {fin or 'hoy'}")
+
+# ESTAS FUNCIONES DE ANÁLISIS SON REUTILIZABLES PARA DIFERENTES DATOS
+
+def top_3_productos(inicio=None, fin=None):
+    """Mostrar top 3 productos más vendidos"""
+    print("\n=== TOP 3 PRODUCTOS MÁS VENDIDOS ===")
+    mostrar_periodo(inicio, fin)
+    
+    if not hay_ventas(inicio, fin):
+        print("❌ No hay datos de ventas disponibles")
+        return
+    
+    productos_ordenados = resumen_top_productos(inicio, fin)
+    
+    print(f"\n{'Posición':<10} {'ID Producto':<12} {'Nombre Producto':<35} {'Unidades':<12} {'Ingresos':<12}")
+    print("="*85)
+    
+    # Mostrar solo los top 3
+    for i, (pid, datos) in enumerate(productos_ordenados, 1):
+        print(f"{i:<10} {pid:<12} {datos['nombre']:<35} {datos['cantidad']:<12} ${datos['ingresos']:<11.2f}")
+
+def ventas_por_marca(inicio=None, fin=None):
+    """Mostrar ventas agrupadas por marca"""
+    print("\n=== VENTAS POR MARCA ===")
+    mostrar_periodo(inicio, fin)
+    
+    if not hay_ventas(inicio, fin):
+        print("❌ No hay datos de ventas disponibles")
+        return
+    
+    ventas_marca = resumen_por_marca(inicio, fin)
     
     print(f"\n{'Marca':<20} {'Unidades Vendidas':<20} {'Ingresos Totales':<20}")
     print("="*60)
@@ -385,45 +1034,125 @@ def ventas_por_marca():
     for marca, datos in sorted(ventas_marca.items()):
         print(f"{marca:<20} {datos['unidades']:<20} ${datos['ingresos']:<19.2f}")
 
-def calcular_ingresos():
+def calcular_ingresos(inicio=None, fin=None):
     """Calcular ingresos brutos y netos"""
     print("\n=== REPORTE DE INGRESOS ===")
+    mostrar_periodo(inicio, fin)
     
-    if not ventas:
+    if not hay_ventas(inicio, fin):
         print("❌ No hay datos de ventas disponibles")
         return
     
-    # Usando map y lambda para cálculos funcionales
-    # ALTERNATIVA REUTILIZABLE: Se puede cambiar la lambda para diferentes cálculos
-    ingreso_bruto = sum(map(lambda v: v['precio_unitario'] * v['cantidad'], ventas))
-    ingreso_neto = sum(map(lambda v: v['total'], ventas))
-    descuento_total = ingreso_bruto - ingreso_neto
+    ingresos = resumen_ingresos(inicio, fin)
+    ingreso_bruto = ingresos['bruto']
+    ingreso_neto = ingresos['neto']
+    descuento_total = ingresos['descuento']
     
     print(f"\nIngreso Bruto: ${ingreso_bruto:.2f}")
     print(f"Descuentos Totales: -${descuento_total:.2f}")
     print(f"Ingreso Neto: ${ingreso_neto:.2f}")
     print(f"Descuento Promedio: {(descuento_total/ingreso_bruto*100):.2f}%")
 
-def rendimiento_inventario():
+def rendimiento_inventario(inicio=None, fin=None):
     """Mostrar reporte de rendimiento del inventario"""
     print("\n=== REPORTE DE RENDIMIENTO DEL INVENTARIO ===")
+    mostrar_periodo(inicio, fin)
     
     print(f"\n{'ID Producto':<12} {'Nombre Producto':<35} {'Stock':<10} {'Vendido':<10} {'Estado':<20}")
     print("="*90)
     
-    for pid, datos in productos.items():
-        # Calcular total vendido para este producto
-        # REUTILIZABLE: Esta técnica de sum con comprensión de lista es muy útil
-        vendido = sum([v['cantidad'] for v in ventas if v['id_producto'] == pid])
-        
-        # Lógica de clasificación de estado - FÁCIL DE MODIFICAR
-        if datos['stock'] == 0:
-            estado = "SIN STOCK"
-        elif datos['stock'] < 10:
-            estado = "STOCK BAJO"
-        elif vendido > datos['stock']:
-            estado = "ALTA DEMANDA"
-        else:
-            estado = "NORMAL"
-        
-        print(f"{pid:<12} {datos['nombre']:<35} {datos['stock']:<10} {vendido:<10} {estado:<20}")
\ No newline at end of file
+    for fila in resumen_rendimiento(inicio, fin):
+        print(f"{fila['id_producto']:<12} {fila['nombre']:<35} {fila['stock']:<10} {fila['vendido']:<10} "
+              f"{fila['estado']:<20}")
+
+def pedir_periodo():
+    """Pedir fechas desde/hasta al usuario; retorna (inicio, fin) o None si son inválidas"""
+    print("Fechas como AAAA-MM-DD o AAAA-MM-DD HH:MM:SS (Enter = sin límite)")
+    try:
+        inicio = input("Desde: ").strip()
+        fin = input("Hasta: ").strip()
+        inicio = normalizar_fecha(inicio) if inicio else None
+        fin = normalizar_fecha(fin, fin=True) if fin else None
+    except ValueError:
+        print("❌ Fecha inválida")
+        return None
+    return inicio, fin
+
+def reportes_por_periodo():
+    """Mostrar todos los reportes de un período de fechas"""
+    print("\n=== REPORTES POR PERÍODO ===")
+    periodo = pedir_periodo()
+    if periodo is None:
+        return
+    inicio, fin = periodo
+    
+    top_3_productos(inicio, fin)
+    ventas_por_marca(inicio, fin)
+    calcular_ingresos(inicio, fin)
+    rendimiento_inventario(inicio, fin)
+
+# ===== SERIES POR HORA, DÍA Y MES =====
+# Se responden con los rollups (o con SQL en el backend SQLite):
+# ninguna de estas funciones recorre las ventas.
+
+def serie_ventas(granularidad='dia', dimension='total', clave=TOTAL, inicio=None, fin=None):
+    """Serie de ventas: lista de (cubo, unidades, bruto, descuento, neto) en orden"""
+    if hasattr(archivos, 'consultar_serie'):
+        return archivos.consultar_serie(granularidad, dimension, clave, inicio, fin)
+    return rollups_ventas.serie(granularidad, dimension, clave, inicio, fin)
+
+def claves_serie(dimension):
+    """Valores con ventas de una dimensión (ej: las marcas)"""
+    if hasattr(archivos, 'consultar_claves'):
+        return archivos.consultar_claves(dimension)
+    return rollups_ventas.claves(dimension)
+
+def mostrar_serie_ventas():
+    """Mostrar una serie de ventas por hora, día o mes"""
+    print("\n=== SERIES DE VENTAS ===")
+    
+    granularidad = input(f"Agrupar por ({'/'.join(GRANULARIDADES)}): ").strip().lower()
+    if granularidad not in GRANULARIDADES:
+        print("❌ Agrupación inválida")
+        return
+    
+    dimension = input(f"Dimensión ({'/'.join(DIMENSIONES)}) [total]: ").strip().lower() or 'total'
+    if dimension not in DIMENSIONES:
+        print("❌ Dimensión inválida")
+        return
+    
+    clave = TOTAL
+    if dimension != 'total':
+        claves = claves_serie(dimension)
+        if not claves:
+            print("❌ No hay datos de ventas disponibles")
+            return
+        # Mostrar algunas opciones como ayuda
+        print(f"Con ventas: {', '.join(claves[:20])}{' ...' if len(claves) > 20 else ''}")
+        clave = input("Valor: ").strip()
+        if dimension == 'producto':
+            clave = clave.upper()
+        elif dimension == 'tipo_cliente':
+            clave = clave.lower()
+        if clave not in claves:
+            print("❌ Sin ventas para ese valor")
+            return
+    
+    periodo = pedir_periodo()
+    if periodo is None:
+        return
+    inicio, fin = periodo
+    
+    serie = serie_ventas(granularidad, dimension, clave, inicio, fin)
+    if not serie:
+        print("❌ No hay ventas en el período")
+        return
+    
+    print(f"\n{'Período':<16} {'Unidades':<10} {'Bruto':<15} {'Descuento':<15} {'Neto':<15}")
+    print("="*75)
+    for cubo, unidades, bruto, descuento, neto in serie:
+        print(f"{cubo:<16} {unidades:<10} ${bruto:<14.2f} ${descuento:<14.2f} ${neto:<14.2f}")
+    print("="*75)
+    # Totales de la serie
+    print(f"{'TOTAL':<16} {sum(fila[1] for fila in serie):<10} ${sum(fila[2] for fila in serie):<14.2f} "
+          f"${sum(fila[3] for fila in serie):<14.2f} ${sum(fila[4] for fila in serie):<14.2f}")
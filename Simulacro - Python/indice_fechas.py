@@ -0,0 +1,65 @@
+from bisect import bisect_left, bisect_right  # Búsqueda binaria en listas ordenadas
+from datetime import datetime
+
+# ===== ÍNDICE DE VENTAS POR FECHA =====
+# Para un reporte de "esta semana" había que revisar todas las ventas.
+# Este índice guarda las fechas ordenadas junto con la posición de cada venta
+# en la lista 'ventas': con búsqueda binaria se encuentran el principio y el
+# fin del período en O(log n) y después solo se leen las k ventas del período.
+#
+# Las fechas se guardan como texto 'AAAA-MM-DD HH:MM:SS': en ese formato el
+# orden alfabético es el mismo que el orden cronológico.
+
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+FORMATO_DIA = '%Y-%m-%d'
+
+
+def normalizar_fecha(texto, fin=False):
+    """'AAAA-MM-DD' o 'AAAA-MM-DD HH:MM:SS' -> fecha completa (ValueError si no es válida)"""
+    texto = texto.strip()
+    try:
+        return datetime.strptime(texto, FORMATO_FECHA).strftime(FORMATO_FECHA)
+    except ValueError:
+        dia = datetime.strptime(texto, FORMATO_DIA)  # Si tampoco es un día, sale el ValueError
+        # Un día solo como fin del período incluye el día completo
+        return dia.strftime(FORMATO_DIA) + (' 23:59:59' if fin else ' 00:00:00')
+
+
+class IndiceFechas:
+    """Posiciones de las ventas ordenadas por fecha"""
+
+    def __init__(self, ventas=()):
+        # Las ventas normalmente ya están en orden: sorted lo detecta y es O(n)
+        pares = sorted((venta['fecha'], posicion) for posicion, venta in enumerate(ventas))
+        self.fechas = [fecha for fecha, _ in pares]
+        self.posiciones = [posicion for _, posicion in pares]
+
+    def __len__(self):
+        return len(self.fechas)
+
+    def agregar(self, fecha, posicion):
+        """Agregar una venta nueva - O(1) si es la más reciente (el caso normal)"""
+        if not self.fechas or fecha >= self.fechas[-1]:
+            self.fechas.append(fecha)
+            self.posiciones.append(posicion)
+        else:
+            # Venta con fecha anterior (ej: importada): insertarla en su lugar
+            i = bisect_right(self.fechas, fecha)
+            self.fechas.insert(i, fecha)
+            self.posiciones.insert(i, posicion)
+
+    def _limites(self, inicio, fin):
+        """Primera y última+1 posición del índice dentro del período - O(log n)"""
+        desde = 0 if inicio is None else bisect_left(self.fechas, inicio)
+        hasta = len(self.fechas) if fin is None else bisect_right(self.fechas, fin)
+        return desde, max(desde, hasta)
+
+    def contar(self, inicio=None, fin=None):
+        """Cantidad de ventas del período (ambas fechas incluidas) - O(log n)"""
+        desde, hasta = self._limites(inicio, fin)
+        return hasta - desde
+
+    def posiciones_en(self, inicio=None, fin=None):
+        """Posiciones en 'ventas' de las ventas del período, en orden de fecha - O(log n + k)"""
+        desde, hasta = self._limites(inicio, fin)
+        return self.posiciones[desde:hasta]
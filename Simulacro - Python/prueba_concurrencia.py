@@ -0,0 +1,158 @@
+import argparse  # Opciones de línea de comandos
+import io
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import archivos
+import funciones
+
+# ===== PRUEBA DE ESTRÉS: VARIAS CAJAS A LA VEZ =====
+# Lanza muchos procesos que venden los mismos productos al mismo tiempo sobre
+# los mismos CSV (en un directorio temporal) y después revisa ventas.csv:
+#   - ningún producto vendió más unidades que su stock inicial (sin sobreventas)
+#   - cada venta que un proceso dio por registrada está en el archivo
+#   - no hay IDs de venta repetidos
+#   - el stock que se carga de productos.csv coincide con lo vendido
+# Con --sin-bloqueo corre cada caja sin el modo compartido, para ver el problema.
+#
+# Uso: python prueba_concurrencia.py [--procesos 24] [--productos 10] [--stock 40] [--intentos 200]
+
+
+def caja(numero, opciones, barrera, resultados):
+    """Proceso de una caja: intentar 'intentos' pedidos al azar"""
+    azar = random.Random(opciones.semilla + numero)
+    vendidas = {}
+    ids = []
+    aceptadas = rechazadas = 0
+    with redirect_stdout(io.StringIO()):
+        if not opciones.sin_bloqueo:
+            funciones.usar_modo_compartido()
+        funciones.usar_durabilidad(opciones.durabilidad)
+        funciones.inicializar_datos()
+        id_productos = sorted(funciones.productos)
+        barrera.wait()  # Todas las cajas empiezan juntas
+        comienzo = time.perf_counter()
+        for _ in range(opciones.intentos):
+            lineas = [(azar.choice(id_productos), azar.randint(1, opciones.max_cantidad))
+                      for _ in range(azar.randint(1, 2))]
+            try:
+                for venta in funciones.registrar_pedido(f"Caja {numero}", 'regular', lineas):
+                    vendidas[venta['id_producto']] = vendidas.get(venta['id_producto'], 0) + venta['cantidad']
+                    ids.append(venta['id_venta'])
+                aceptadas += 1
+            except ValueError:
+                rechazadas += 1  # Sin stock suficiente
+        transcurrido = time.perf_counter() - comienzo
+        funciones.finalizar_datos()
+    resultados.put({'vendidas': vendidas, 'ids': ids, 'aceptadas': aceptadas,
+                    'rechazadas': rechazadas, 'segundos': transcurrido})
+
+
+def preparar_archivos(opciones):
+    """Crear productos.csv y ventas.csv vacíos en el directorio actual"""
+    archivos.crear_archivos_si_no_existen()
+    productos = {f"P{i:03d}": {'nombre': f"Producto {i}", 'marca': f"Marca {i % 3}", 'categoria': 'Prueba',
+                               'precio': 10.0 + i, 'stock': opciones.stock, 'garantia': 12}
+                 for i in range(1, opciones.productos + 1)}
+    archivos.guardar_productos(productos)
+    return productos
+
+
+def verificar(productos, resultados):
+    """Revisar los archivos contra lo que informaron las cajas; retorna la cantidad de errores"""
+    errores = 0
+    vendidas_archivo = {}
+    ids_archivo = []
+    for venta in archivos.iterar_ventas():
+        vendidas_archivo[venta['id_producto']] = vendidas_archivo.get(venta['id_producto'], 0) + venta['cantidad']
+        ids_archivo.append(venta['id_venta'])
+
+    sobreventas = {pid: vendidas_archivo.get(pid, 0) - datos['stock'] for pid, datos in productos.items()
+                   if vendidas_archivo.get(pid, 0) > datos['stock']}
+    if sobreventas:
+        errores += len(sobreventas)
+        print(f"❌ Sobreventas (unidades de más): {sobreventas}")
+    else:
+        print("✅ Sin sobreventas")
+
+    vendidas_cajas = {}
+    for resultado in resultados:
+        for pid, cantidad in resultado['vendidas'].items():
+            vendidas_cajas[pid] = vendidas_cajas.get(pid, 0) + cantidad
+    ids_cajas = sorted(id_venta for resultado in resultados for id_venta in resultado['ids'])
+    if vendidas_cajas != vendidas_archivo or ids_cajas != sorted(ids_archivo):
+        errores += 1
+        print("❌ Las ventas de ventas.csv no coinciden con las que registraron las cajas")
+    else:
+        print("✅ Todas las ventas registradas están en ventas.csv")
+
+    if len(set(ids_archivo)) != len(ids_archivo):
+        errores += 1
+        print(f"❌ IDs de venta repetidos: {len(ids_archivo) - len(set(ids_archivo))}")
+    else:
+        print("✅ Sin IDs repetidos")
+
+    en_disco = archivos.cargar_productos(avisar=False)
+    esperado = {pid: datos['stock'] - vendidas_archivo.get(pid, 0) for pid, datos in productos.items()}
+    if {pid: datos['stock'] for pid, datos in en_disco.items()} != esperado:
+        errores += 1
+        print("❌ El stock de productos.csv no coincide con las ventas")
+    else:
+        print("✅ El stock guardado coincide con las ventas")
+    return errores
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Prueba de ventas concurrentes sin sobreventas")
+    parser.add_argument("--procesos", type=int, default=24, help="cajas vendiendo a la vez")
+    parser.add_argument("--productos", type=int, default=10)
+    parser.add_argument("--stock", type=int, default=40, help="stock inicial de cada producto")
+    parser.add_argument("--intentos", type=int, default=200, help="pedidos que intenta cada caja")
+    parser.add_argument("--max-cantidad", type=int, default=3, help="unidades máximas por línea")
+    parser.add_argument("--durabilidad", choices=['ninguna', 'lote', 'registro'], default='lote')
+    parser.add_argument("--semilla", type=int, default=12345)
+    parser.add_argument("--sin-bloqueo", action="store_true", help="sin el modo compartido (muestra las sobreventas)")
+    parser.add_argument("--directorio", help="directorio de los CSV (por defecto uno temporal)")
+    opciones = parser.parse_args(argumentos)
+
+    original = os.getcwd()
+    temporal = None
+    if opciones.directorio:
+        os.makedirs(opciones.directorio, exist_ok=True)
+        directorio = opciones.directorio
+    else:
+        temporal = tempfile.TemporaryDirectory()
+        directorio = temporal.name
+    os.chdir(directorio)  # archivos.py usa rutas relativas
+    try:
+        productos = preparar_archivos(opciones)
+        barrera = multiprocessing.Barrier(opciones.procesos)
+        cola = multiprocessing.Queue()
+        cajas = [multiprocessing.Process(target=caja, args=(numero, opciones, barrera, cola))
+                 for numero in range(opciones.procesos)]
+        for proceso in cajas:
+            proceso.start()
+        resultados = [cola.get() for _ in cajas]
+        for proceso in cajas:
+            proceso.join()
+
+        aceptadas = sum(resultado['aceptadas'] for resultado in resultados)
+        rechazadas = sum(resultado['rechazadas'] for resultado in resultados)
+        duracion = max(resultado['segundos'] for resultado in resultados)
+        print(f"{opciones.procesos} cajas: {aceptadas} pedidos registrados y {rechazadas} rechazados por stock "
+              f"en {duracion:.2f} s ({(aceptadas + rechazadas) / duracion:,.0f} pedidos/s)")
+        errores = verificar(productos, resultados)
+    finally:
+        os.chdir(original)
+        if temporal is not None:
+            temporal.cleanup()
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
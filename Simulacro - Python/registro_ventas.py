@@ -0,0 +1,140 @@
+import atexit  # Vaciar lo pendiente aunque el programa termine sin llamar a cerrar()
+import csv
+import io
+import os
+import threading  # Hilo que vacía el búfer cuando pasa el tiempo máximo
+import time
+
+# ===== REGISTRO DE VENTAS CON ESCRITURA AGRUPADA =====
+# guardar_venta abría ventas.csv, escribía una fila y lo cerraba en cada
+# venta. Con muchas ventas seguidas, abrir/cerrar (y el flush de cada cierre)
+# cuesta más que escribir la fila.
+# Aquí el archivo queda abierto y las filas se juntan en un búfer que se
+# escribe de una sola vez ("group commit") cuando se cumple lo primero de:
+#   - max_ventas filas pendientes
+#   - max_bytes de texto pendiente
+#   - max_espera segundos desde la fila pendiente más antigua (lo revisa un hilo)
+#
+# Durabilidad (qué se pierde si se corta la luz):
+#   'ninguna':  sin fsync; el sistema operativo decide cuándo llega al disco
+#   'lote':     fsync después de escribir cada grupo de filas
+#   'registro': cada venta (o pedido) se escribe y se hace fsync antes de seguir (sin búfer)
+# Si el programa se corta, como mucho se pierden las ventas del búfer (nunca
+# queda una fila a medias: cada grupo se escribe completo con un solo write).
+
+DURABILIDADES = ('ninguna', 'lote', 'registro')
+MAX_VENTAS = 256
+MAX_BYTES = 64 * 1024
+MAX_ESPERA = 1.0  # Segundos
+
+
+class RegistroVentas:
+    """Archivo de ventas abierto que escribe las filas en grupos"""
+
+    def __init__(self, ruta, durabilidad='lote', max_ventas=MAX_VENTAS, max_bytes=MAX_BYTES, max_espera=MAX_ESPERA):
+        if durabilidad not in DURABILIDADES:
+            raise ValueError(f"durabilidad inválida: {durabilidad} (opciones: {', '.join(DURABILIDADES)})")
+        self.ruta = ruta
+        self.durabilidad = durabilidad
+        self.max_ventas = max_ventas
+        self.max_bytes = max_bytes
+        self.max_espera = max_espera
+        # 'ab': cada write va al final del archivo (aunque otro proceso también escriba)
+        self._archivo = open(ruta, 'ab')
+        # Filas pendientes, ya en formato CSV
+        self._texto = io.StringIO(newline='')
+        self._writer = csv.writer(self._texto)
+        self._pendientes = 0
+        self._primera = 0.0  # Momento en que llegó la fila pendiente más antigua
+        self._condicion = threading.Condition()
+        self._cerrado = False
+        self._hilo = None
+        atexit.register(self.cerrar)
+
+    def escribir(self, fila):
+        """Agregar una fila (lista de valores) - se escribe según los límites y la durabilidad"""
+        self.escribir_varias([fila])
+
+    def escribir_varias(self, filas, vaciar=False):
+        """Agregar varias filas juntas (ej: un pedido): quedan siempre en el mismo grupo
+        (vaciar=True: escribir ya el grupo, ej: antes de soltar el bloqueo de ventas.csv)"""
+        with self._condicion:
+            if self._cerrado:
+                raise ValueError("el registro de ventas está cerrado")
+            nuevo_grupo = not self._pendientes
+            posicion, pendientes = self._texto.tell(), self._pendientes
+            self._writer.writerows(filas)
+            self._pendientes += len(filas)
+            if nuevo_grupo:
+                self._primera = time.monotonic()
+            # Los límites se revisan después de agregar todas: un pedido no se parte en dos writes
+            if (vaciar or self.durabilidad == 'registro' or self._pendientes >= self.max_ventas
+                    or self._texto.tell() >= self.max_bytes):
+                try:
+                    self._vaciar()
+                except OSError:
+                    # Si no se escribieron, estas filas se quitan del búfer (quien llama
+                    # recibe el error y no las registra); las anteriores se reintentan
+                    if self._pendientes:
+                        self._texto.seek(posicion)
+                        self._texto.truncate()
+                        self._pendientes = pendientes
+                    raise
+            elif nuevo_grupo and self._pendientes:
+                # Primera fila del grupo: el hilo la escribe si no llegan más
+                if self._hilo is None:
+                    self._hilo = threading.Thread(target=self._vigilar, daemon=True)
+                    self._hilo.start()
+                self._condicion.notify()
+
+    def _vaciar(self):
+        """Escribir las filas pendientes en el archivo (con el bloqueo tomado)"""
+        if not self._pendientes:
+            return
+        self._archivo.write(self._texto.getvalue().encode('utf-8'))
+        self._archivo.flush()  # Del búfer de Python al sistema operativo
+        # Recién ahora se descartan del búfer (si write falla, quedan para reintentar)
+        self._texto.seek(0)
+        self._texto.truncate()
+        self._pendientes = 0
+        if self.durabilidad != 'ninguna':
+            os.fsync(self._archivo.fileno())  # Del sistema operativo al disco
+
+    def vaciar(self):
+        """Escribir ya todas las filas pendientes (ej: antes de leer ventas.csv)"""
+        with self._condicion:
+            if not self._cerrado:
+                self._vaciar()
+
+    def _vigilar(self):
+        """Hilo: escribir el grupo cuando su fila más antigua cumple max_espera"""
+        with self._condicion:
+            while not self._cerrado:
+                if not self._pendientes:
+                    self._condicion.wait()
+                    continue
+                restante = self._primera + self.max_espera - time.monotonic()
+                if restante > 0:
+                    self._condicion.wait(restante)
+                    continue
+                try:
+                    self._vaciar()
+                except OSError as e:
+                    # Las filas quedan en el búfer: se reintenta con la próxima venta o al cerrar
+                    print(f"⚠️ Error al escribir ventas: {e}")
+                    self._primera = time.monotonic()
+
+    def cerrar(self):
+        """Escribir lo pendiente y cerrar el archivo (se puede llamar más de una vez)"""
+        with self._condicion:
+            if self._cerrado:
+                return
+            try:
+                self._vaciar()
+            finally:
+                self._cerrado = True
+                self._archivo.close()
+                self._condicion.notify()
+        if self._hilo is not None:
+            self._hilo.join()
+        atexit.unregister(self.cerrar)
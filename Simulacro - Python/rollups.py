@@ -0,0 +1,155 @@
+import gzip  # El archivo de rollups se guarda comprimido
+import json
+from bisect import bisect_left, bisect_right
+from bloqueos import reemplazar_archivo
+
+# ===== ROLLUPS POR HORA, DÍA Y MES =====
+# Para "ingresos por día" o "unidades por mes de cada marca" había que
+# agrupar todas las ventas por un pedazo de la fecha cada vez. Aquí se
+# guardan los totales ya sumados por período ("cubos"):
+#   granularidad: hora ('2024-05-01 14'), dia ('2024-05-01') o mes ('2024-05')
+#   dimensión:    total, producto, marca o tipo_cliente
+#   valores:      [unidades, bruto, descuento, neto]
+# Cada venta suma en O(1) a sus cubos y las consultas de una serie no leen
+# ninguna venta.
+#
+# Se guarda (gzip + JSON) cada tantas ventas, igual que agregados.py: el
+# archivo recuerda hasta qué posición de ventas.csv incluye y al iniciar
+# solo se suman las ventas nuevas. Los cubos por marca tampoco se guardan: se arman desde los
+# cubos por producto con la marca actual de cada uno (como en los reportes).
+
+# Largo del prefijo de la fecha 'AAAA-MM-DD HH:MM:SS' que identifica cada cubo
+GRANULARIDADES = {'hora': 13, 'dia': 10, 'mes': 7}
+DIMENSIONES = ('total', 'producto', 'marca', 'tipo_cliente')
+# Clave de la dimensión 'total' (un solo grupo con todas las ventas)
+TOTAL = ''
+
+
+def _sumar(tabla, clave, cubo, valores, signo=1):
+    """Sumar (o restar con signo=-1) los valores a un cubo"""
+    cubos = tabla.setdefault(clave, {})
+    if cubo in cubos:
+        actuales = cubos[cubo]
+        for i, valor in enumerate(valores):
+            actuales[i] += signo * valor
+        # Un cubo que queda sin unidades se elimina (ej: al mover un producto de marca)
+        if actuales[0] <= 0:
+            del cubos[cubo]
+            if not cubos:
+                del tabla[clave]
+    elif signo > 0:
+        cubos[cubo] = list(valores)
+
+
+class Rollups:
+    """Totales de ventas por hora, día y mes"""
+
+    def __init__(self):
+        # {granularidad: {dimensión: {clave: {cubo: [unidades, bruto, descuento, neto]}}}}
+        self.cubos = {granularidad: {dimension: {} for dimension in DIMENSIONES} for granularidad in GRANULARIDADES}
+        self.ventas = 0           # Cantidad de ventas incluidas
+        self.ultima_venta = None  # ID de la última venta incluida
+        self.ventas_guardadas = 0  # Ventas incluidas en el archivo
+        self.posicion = 0          # Bytes de ventas.csv incluidos (al último guardado)
+
+    def registrar(self, venta, marca):
+        """Sumar una venta a sus cubos - O(1). marca=None si el producto ya no existe"""
+        bruto = venta['precio_unitario'] * venta['cantidad']
+        valores = (venta['cantidad'], bruto, bruto - venta['total'], venta['total'])
+        claves = [('total', TOTAL), ('producto', venta['id_producto']), ('tipo_cliente', venta['tipo_cliente'])]
+        if marca is not None:
+            claves.append(('marca', marca))
+        for granularidad, largo in GRANULARIDADES.items():
+            cubo = venta['fecha'][:largo]
+            for dimension, clave in claves:
+                _sumar(self.cubos[granularidad][dimension], clave, cubo, valores)
+        self.ventas += 1
+        self.ultima_venta = venta['id_venta']
+
+    def _mover_producto(self, pid, marca, signo):
+        """Sumar (o restar) a una marca todos los cubos de un producto"""
+        for tablas in self.cubos.values():
+            for cubo, valores in tablas['producto'].get(pid, {}).items():
+                _sumar(tablas['marca'], marca, cubo, valores, signo)
+
+    def quitar_de_marca(self, pid, marca):
+        """Restar de la marca los cubos de un producto (al eliminarlo o cambiarle la marca)"""
+        self._mover_producto(pid, marca, -1)
+
+    def cambiar_marca(self, pid, anterior, nueva):
+        """Mover los cubos de un producto a su nueva marca - O(cubos del producto)"""
+        if anterior != nueva:
+            self._mover_producto(pid, anterior, -1)
+            self._mover_producto(pid, nueva, 1)
+
+    def recalcular_marcas(self, productos):
+        """Armar los cubos por marca desde los cubos por producto"""
+        for tablas in self.cubos.values():
+            tablas['marca'] = {}
+        for pid in self.cubos['mes']['producto']:
+            if pid in productos:
+                self._mover_producto(pid, productos[pid]['marca'], 1)
+
+    def ponerse_al_dia(self, ventas_nuevas, productos):
+        """Sumar las ventas posteriores al checkpoint (cualquier iterable); retorna cuántas se sumaron"""
+        self.recalcular_marcas(productos)
+        sumadas = 0
+        for venta in ventas_nuevas:
+            producto = productos.get(venta['id_producto'])
+            self.registrar(venta, producto['marca'] if producto else None)
+            sumadas += 1
+        return sumadas
+
+    def serie(self, granularidad='dia', dimension='total', clave=TOTAL, inicio=None, fin=None):
+        """
+        Serie de una clave: lista de (cubo, unidades, bruto, descuento, neto) en orden.
+        inicio/fin (fechas 'AAAA-MM-DD HH:MM:SS', incluidas) eligen los cubos que
+        las contienen. No lee ninguna venta.
+        """
+        largo = GRANULARIDADES[granularidad]
+        cubos = self.cubos[granularidad][dimension].get(clave, {})
+        # Los cubos se crean casi siempre en orden: sorted lo hace en O(n)
+        orden = sorted(cubos)
+        desde = 0 if inicio is None else bisect_left(orden, inicio[:largo])
+        hasta = len(orden) if fin is None else bisect_right(orden, fin[:largo])
+        return [(cubo, *cubos[cubo]) for cubo in orden[desde:hasta]]
+
+    def claves(self, dimension):
+        """Claves con ventas de una dimensión (ej: las marcas)"""
+        return sorted(self.cubos['mes'][dimension])
+
+    def guardar(self, ruta, posicion):
+        """Guardar los rollups comprimidos (reemplazo atómico); posicion = tamaño actual de ventas.csv"""
+        self.posicion = posicion
+        # Los cubos por marca se vuelven a armar al cargar
+        cubos = {granularidad: {dimension: tabla for dimension, tabla in tablas.items() if dimension != 'marca'}
+                 for granularidad, tablas in self.cubos.items()}
+        datos = {'ventas': self.ventas, 'ultima_venta': self.ultima_venta, 'posicion': self.posicion, 'cubos': cubos}
+        # Nivel 1: mucho más rápido que el nivel por defecto y comprime casi lo mismo
+        reemplazar_archivo(ruta, gzip.compress(json.dumps(datos, separators=(',', ':')).encode('utf-8'), compresslevel=1))
+        self.ventas_guardadas = self.ventas
+
+    def sin_guardar(self):
+        """Ventas incluidas que todavía no están en el archivo"""
+        return self.ventas - self.ventas_guardadas
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Cargar los rollups guardados (vacíos si no hay archivo o está dañado)"""
+        rollups = cls()
+        try:
+            with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+            rollups.ventas = rollups.ventas_guardadas = datos['ventas']
+            rollups.ultima_venta = datos['ultima_venta']
+            rollups.posicion = datos.get('posicion', 0)
+            for granularidad in GRANULARIDADES:
+                for dimension in DIMENSIONES:
+                    if dimension != 'marca':
+                        rollups.cubos[granularidad][dimension] = datos['cubos'][granularidad][dimension]
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Rollups dañados ({e}): se recalculan desde las ventas")
+            rollups = cls()
+        return rollups
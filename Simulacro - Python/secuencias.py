@@ -0,0 +1,103 @@
+import os  # Módulo para operaciones del sistema de archivos
+from bloqueos import bloquear, reemplazar_archivo
+
+# ===== SECUENCIAS DE IDs =====
+# En lugar de buscar el ID más alto recorriendo todos los productos (O(n)),
+# cada secuencia guarda en un archivo pequeño el último número entregado
+# (la "marca de agua"). Pedir un ID nuevo es O(1).
+#
+# Varios procesos pueden pedir IDs al mismo tiempo: el archivo se bloquea
+# mientras se lee y se actualiza. Un proceso que carga muchos datos puede
+# reservar un bloque de IDs de una sola vez (tamano_bloque) y usarlos sin
+# volver a tocar el archivo. Los IDs de un bloque que no se usen se devuelven
+# al cerrar si nadie reservó después; si no, se pierden (quedan huecos),
+# pero nunca se repiten.
+
+
+class Secuencia:
+    """Generador de IDs únicos con la marca de agua guardada en disco"""
+
+    def __init__(self, ruta, prefijo, ancho, tamano_bloque=1):
+        self.ruta = ruta                    # Archivo con el último número reservado
+        self.prefijo = prefijo              # Ej: 'P' para productos, 'V' para ventas
+        self.ancho = ancho                  # Dígitos mínimos: P001, V0001
+        self.tamano_bloque = tamano_bloque  # IDs que se reservan por acceso al archivo
+        # Bloque reservado por este proceso: números desde _siguiente hasta _limite - 1
+        self._siguiente = 0
+        self._limite = 0
+
+    def existe(self):
+        """Indica si la secuencia ya tiene archivo (si no, hay que inicializarla)"""
+        return os.path.exists(self.ruta)
+
+    def _leer(self):
+        """Leer el último número reservado (0 si no hay archivo)"""
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as archivo:
+                return int(archivo.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def reservar(self, cantidad):
+        """Reservar 'cantidad' números seguidos; devuelve (primero, último + 1)"""
+        with bloquear(self.ruta):
+            ultimo = self._leer()
+            reemplazar_archivo(self.ruta, f"{ultimo + cantidad}\n")
+        return ultimo + 1, ultimo + cantidad + 1
+
+    def asegurar_minimo(self, ultimo_usado):
+        """Subir la marca de agua si hay IDs en uso más altos (ej: datos ya existentes)"""
+        with bloquear(self.ruta):
+            ultimo = self._leer()
+            if ultimo < ultimo_usado or not self.existe():
+                reemplazar_archivo(self.ruta, f"{max(ultimo, ultimo_usado)}\n")
+
+    def devolver(self):
+        """Devolver los números sin usar del bloque (al cerrar) si la marca de agua sigue en su final"""
+        if self._siguiente >= self._limite:
+            return
+        with bloquear(self.ruta):
+            # Si otro proceso reservó después, devolverlos repetiría sus IDs
+            if self._leer() == self._limite - 1:
+                reemplazar_archivo(self.ruta, f"{self._siguiente - 1}\n")
+        self._limite = self._siguiente
+
+    def siguiente_numero(self):
+        """Siguiente número de la secuencia - O(1)"""
+        if self._siguiente >= self._limite:
+            # Bloque agotado: reservar otro en el archivo compartido
+            self._siguiente, self._limite = self.reservar(self.tamano_bloque)
+        numero = self._siguiente
+        self._siguiente += 1
+        return numero
+
+    def siguientes(self, cantidad):
+        """Varios IDs (ej: las líneas de un pedido) con un solo acceso al archivo"""
+        numeros = []
+        while len(numeros) < cantidad:
+            if self._siguiente >= self._limite:
+                # Reservar de una vez todo lo que falta (o un bloque, si es más grande)
+                self._siguiente, self._limite = self.reservar(max(self.tamano_bloque, cantidad - len(numeros)))
+            tomar = min(self._limite - self._siguiente, cantidad - len(numeros))
+            numeros.extend(range(self._siguiente, self._siguiente + tomar))
+            self._siguiente += tomar
+        return [self.formatear(numero) for numero in numeros]
+
+    def siguiente(self):
+        """Siguiente ID con formato (ej: 'P004')"""
+        return self.formatear(self.siguiente_numero())
+
+    def formatear(self, numero):
+        """Número -> ID con prefijo y ceros a la izquierda (P999, P1000, ...)"""
+        return f"{self.prefijo}{str(numero).zfill(self.ancho)}"
+
+
+def ultimo_numero(ids, prefijo):
+    """Mayor número entre IDs como 'P012' (se usa una sola vez, para inicializar)"""
+    ultimo = 0
+    for id_texto in ids:
+        numero = id_texto[len(prefijo):]
+        # Ignorar IDs con otro formato (ej: editados a mano)
+        if id_texto.startswith(prefijo) and numero.isdigit():
+            ultimo = max(ultimo, int(numero))
+    return ultimo
@@ -0,0 +1,460 @@
+import argparse  # Opciones de línea de comandos
+import asyncio  # Servidor HTTP sin dependencias externas
+import json
+import re
+import signal
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import funciones
+from indice_fechas import normalizar_fecha
+
+# ===== SERVIDOR HTTP CON API JSON =====
+# Expone el inventario y las ventas a otros sistemas, con los mismos datos en
+# memoria que el menú de app.py (funciones.productos, funciones.ventas, los
+# agregados y los índices):
+#   GET    /productos                  catálogo completo
+#   GET    /productos/{id}             un producto
+#   POST   /productos                  agregar (nombre, marca, categoria, precio, stock, garantia)
+#   PATCH  /productos/{id}             cambiar solo los campos enviados
+#   DELETE /productos/{id}             eliminar
+#   POST   /ventas                     registrar un pedido {cliente, tipo_cliente, lineas: [{id_producto, cantidad}]}
+#   GET    /reportes/top3              los 3 productos más vendidos
+#   GET    /reportes/marcas            ventas por marca
+#   GET    /reportes/ingresos          ingresos bruto, neto y descuentos
+#   GET    /reportes/rendimiento       stock, vendido y estado de cada producto
+# Los reportes aceptan ?desde=AAAA-MM-DD[ HH:MM:SS]&hasta=... (igual que el menú).
+#
+# Concurrencia: todo corre en un solo hilo (el del event loop de asyncio).
+#   - Lecturas: se atienden apenas llegan, en paralelo con las demás
+#     conexiones. Cada respuesta se arma completa (hasta el JSON) sin ceder el
+#     control, así que nunca ve un cambio a medias.
+#   - Escrituras: pasan por una cola que atiende una sola tarea (el
+#     "escritor"), de a una y en orden de llegada. Una lectura nunca espera a
+#     las escrituras que están en la cola; una escritura solo espera a las anteriores.
+# Cada escritura también corre en el hilo del event loop (funciones.py no se
+# puede tocar desde dos hilos a la vez), así que mientras dura no se atiende
+# ninguna lectura. Lo que más dura es esperar al disco: el fsync de ventas.csv
+# con --durabilidad registro (con 'lote' se hace al escribir cada grupo), los
+# checkpoints de productos.csv (cada CHECKPOINT_CADA_VENTAS ventas y en cada
+# cambio del catálogo) y la reserva de un bloque de IDs en ventas.seq (cada
+# BLOQUE_IDS_VENTAS ventas). Con --compartido además se espera el bloqueo de
+# ventas.csv mientras otra caja lo tenga. Entre dos escrituras el escritor
+# cede el control, así que una lectura espera como mucho una escritura.
+# Las ventas se guardan con el registro agrupado de archivos.py, igual que en el menú.
+#
+# Uso: python servidor.py [--host 127.0.0.1] [--puerto 8080] [--sqlite | --perezoso | --durabilidad D | --compartido]
+# La carga se mide con: python carga_servidor.py
+
+HOST = '127.0.0.1'
+PUERTO = 8080
+MAX_CUERPO = 1024 * 1024  # Bytes máximos del cuerpo de una petición
+MAX_ENCABEZADOS = 100     # Líneas de encabezado máximas por petición
+
+# Tipo de cada campo de un producto en el JSON
+TIPOS_PRODUCTO = {'nombre': str, 'marca': str, 'categoria': str, 'precio': float, 'stock': int, 'garantia': int}
+# Caracteres de control (saltos de línea, tabuladores, NUL...): no se aceptan en los textos
+# porque terminan en los CSV y en los recibos
+CONTROL = re.compile(r'[\x00-\x1f\x7f-\x9f\u2028\u2029]')
+
+
+class ErrorHTTP(Exception):
+    """Error que se responde con un código HTTP y un mensaje"""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# ===== COLA DE ESCRITURAS =====
+
+class Escritor:
+    """Tarea única que ejecuta los cambios de datos de a uno y en orden (en el hilo del event loop)"""
+
+    def __init__(self):
+        self.cola = asyncio.Queue()
+        self.tarea = None
+
+    def iniciar(self):
+        """Crear la tarea del escritor (dentro del event loop)"""
+        self.tarea = asyncio.create_task(self._trabajar())
+
+    async def ejecutar(self, operacion):
+        """Encolar operacion() y esperar su resultado (o su excepción)"""
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((operacion, futuro))
+        return await futuro
+
+    async def _trabajar(self):
+        """Atender la cola para siempre (hasta que se cancele la tarea)"""
+        while True:
+            operacion, futuro = await self.cola.get()
+            try:
+                resultado = operacion()
+            except Exception as e:
+                if not futuro.cancelled():
+                    futuro.set_exception(e)
+            else:
+                if not futuro.cancelled():
+                    futuro.set_result(resultado)
+            finally:
+                self.cola.task_done()
+            # Si hay más escrituras en la cola, get() no cede el control:
+            # se cede aquí para atender las lecturas que llegaron mientras tanto
+            await asyncio.sleep(0)
+
+    async def detener(self):
+        """Terminar las escrituras encoladas y parar la tarea"""
+        await self.cola.join()
+        self.tarea.cancel()
+        try:
+            await self.tarea
+        except asyncio.CancelledError:
+            pass
+
+
+# ===== RUTAS =====
+# Cada ruta es una función común (sin await) que retorna (estado, datos);
+# las que modifican datos se marcan con escribe=True y pasan por el escritor.
+
+def _periodo(consulta):
+    """(inicio, fin) de los parámetros desde/hasta"""
+    try:
+        inicio = normalizar_fecha(consulta['desde'][0]) if 'desde' in consulta else None
+        fin = normalizar_fecha(consulta['hasta'][0], fin=True) if 'hasta' in consulta else None
+    except ValueError:
+        raise ErrorHTTP(400, "Fecha inválida (use AAAA-MM-DD o AAAA-MM-DD HH:MM:SS)")
+    return inicio, fin
+
+
+def _objeto(cuerpo):
+    """Cuerpo JSON de la petición (tiene que ser un objeto)"""
+    try:
+        datos = json.loads(cuerpo or b'{}')
+    except ValueError:
+        raise ErrorHTTP(400, "El cuerpo no es un JSON válido")
+    if not isinstance(datos, dict):
+        raise ErrorHTTP(400, "El cuerpo tiene que ser un objeto JSON")
+    return datos
+
+
+def _texto(valor, campo):
+    """Texto sin espacios en los extremos (400 si tiene caracteres de control)"""
+    if CONTROL.search(valor):
+        raise ErrorHTTP(400, f"{campo} no puede tener caracteres de control (ej: saltos de línea)")
+    return valor.strip()
+
+
+def _campos_producto(datos, todos):
+    """Campos de producto del JSON con su tipo (todos=True: tienen que estar todos)"""
+    desconocidos = [campo for campo in datos if campo not in TIPOS_PRODUCTO]
+    if desconocidos:
+        raise ErrorHTTP(400, f"Campos desconocidos: {', '.join(desconocidos)}")
+    campos = {}
+    for campo, tipo in TIPOS_PRODUCTO.items():
+        if campo not in datos:
+            if todos:
+                raise ErrorHTTP(400, f"Falta el campo {campo}")
+            continue
+        valor = datos[campo]
+        # bool es un int en Python, pero true/false no es un número válido
+        if tipo is str and isinstance(valor, str):
+            campos[campo] = _texto(valor, campo)
+        elif tipo is float and isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            campos[campo] = float(valor)
+        elif tipo is int and isinstance(valor, int) and not isinstance(valor, bool):
+            campos[campo] = valor
+        else:
+            raise ErrorHTTP(400, f"Tipo inválido para {campo}")
+    return campos
+
+
+def _producto(id_producto):
+    """Un producto con su ID (404 si no existe)"""
+    if id_producto not in funciones.productos:
+        raise ErrorHTTP(404, f"Producto no encontrado: {id_producto}")
+    return {'id_producto': id_producto, **funciones.productos[id_producto]}
+
+
+def listar_productos(consulta, cuerpo):
+    """GET /productos"""
+    return 200, funciones.productos
+
+
+def ver_producto(consulta, cuerpo, id_producto):
+    """GET /productos/{id}"""
+    return 200, _producto(id_producto)
+
+
+def agregar_producto(consulta, cuerpo):
+    """POST /productos - todos los campos son obligatorios"""
+    id_producto = funciones.crear_producto(**_campos_producto(_objeto(cuerpo), todos=True))
+    return 201, _producto(id_producto)
+
+
+def actualizar_producto(consulta, cuerpo, id_producto):
+    """PATCH /productos/{id} - solo los campos enviados"""
+    campos = _campos_producto(_objeto(cuerpo), todos=False)
+    funciones.modificar_producto(id_producto, **campos)
+    return 200, _producto(id_producto)
+
+
+def eliminar_producto(consulta, cuerpo, id_producto):
+    """DELETE /productos/{id}"""
+    funciones.borrar_producto(id_producto)
+    return 200, {'id_producto': id_producto}
+
+
+def registrar_venta(consulta, cuerpo):
+    """POST /ventas - se registran todas las líneas o ninguna"""
+    datos = _objeto(cuerpo)
+    cliente = datos.get('cliente')
+    tipo_cliente = datos.get('tipo_cliente', 'regular')
+    lineas = datos.get('lineas')
+    if not isinstance(cliente, str) or not isinstance(tipo_cliente, str):
+        raise ErrorHTTP(400, "cliente y tipo_cliente tienen que ser textos")
+    if not isinstance(lineas, list) or not all(isinstance(linea, dict) for linea in lineas):
+        raise ErrorHTTP(400, "lineas tiene que ser una lista de {id_producto, cantidad}")
+    pedido = []
+    for linea in lineas:
+        id_producto = linea.get('id_producto')
+        cantidad = linea.get('cantidad')
+        if not isinstance(id_producto, str) or not isinstance(cantidad, int) or isinstance(cantidad, bool):
+            raise ErrorHTTP(400, "Cada línea necesita id_producto (texto) y cantidad (entero)")
+        pedido.append((_texto(id_producto, 'id_producto').upper(), cantidad))
+    ventas_pedido = funciones.registrar_pedido(_texto(cliente, 'cliente'),
+                                               _texto(tipo_cliente, 'tipo_cliente').lower(), pedido)
+    return 201, {'ventas': ventas_pedido, 'total': sum(venta['total'] for venta in ventas_pedido)}
+
+
+def reporte_top3(consulta, cuerpo):
+    """GET /reportes/top3"""
+    top = funciones.resumen_top_productos(*_periodo(consulta))
+    return 200, [{'id_producto': pid, **datos} for pid, datos in top]
+
+
+def reporte_marcas(consulta, cuerpo):
+    """GET /reportes/marcas"""
+    return 200, funciones.resumen_por_marca(*_periodo(consulta))
+
+
+def reporte_ingresos(consulta, cuerpo):
+    """GET /reportes/ingresos"""
+    ingresos = dict(funciones.resumen_ingresos(*_periodo(consulta)))
+    # Como en el menú: descuento promedio sobre el ingreso bruto
+    ingresos['descuento_promedio'] = ingresos['descuento'] / ingresos['bruto'] * 100 if ingresos['bruto'] else 0
+    return 200, ingresos
+
+
+def reporte_rendimiento(consulta, cuerpo):
+    """GET /reportes/rendimiento"""
+    return 200, funciones.resumen_rendimiento(*_periodo(consulta))
+
+
+# (método, ruta, función, escribe) - los grupos de la ruta se pasan como argumentos
+RUTAS = [
+    ('GET', r'/productos', listar_productos, False),
+    ('POST', r'/productos', agregar_producto, True),
+    ('GET', r'/productos/([^/]+)', ver_producto, False),
+    ('PATCH', r'/productos/([^/]+)', actualizar_producto, True),
+    ('DELETE', r'/productos/([^/]+)', eliminar_producto, True),
+    ('POST', r'/ventas', registrar_venta, True),
+    ('GET', r'/reportes/top3', reporte_top3, False),
+    ('GET', r'/reportes/marcas', reporte_marcas, False),
+    ('GET', r'/reportes/ingresos', reporte_ingresos, False),
+    ('GET', r'/reportes/rendimiento', reporte_rendimiento, False),
+]
+RUTAS = [(metodo, re.compile(patron), funcion, escribe) for metodo, patron, funcion, escribe in RUTAS]
+
+
+def buscar_ruta(metodo, camino):
+    """(función, argumentos de la ruta, escribe) - ErrorHTTP 404/405 si no hay"""
+    metodos = []
+    for metodo_ruta, patron, funcion, escribe in RUTAS:
+        coincidencia = patron.fullmatch(camino.rstrip('/') or '/')
+        if coincidencia:
+            if metodo_ruta == metodo:
+                return funcion, [grupo.upper() for grupo in coincidencia.groups()], escribe
+            metodos.append(metodo_ruta)
+    if metodos:
+        raise ErrorHTTP(405, f"Método no permitido (use {', '.join(metodos)})")
+    raise ErrorHTTP(404, f"Ruta desconocida: {camino}")
+
+
+# ===== HTTP =====
+
+def atender(funcion, argumentos, consulta, cuerpo):
+    """Ejecutar una ruta y convertir el resultado (o el error) en (estado, bytes del JSON)"""
+    try:
+        # Modo compartido: ver antes las ventas y cambios de las otras cajas
+        funciones.sincronizar()
+        estado, datos = funcion(consulta, cuerpo, *argumentos)
+    except ErrorHTTP as e:
+        estado, datos = e.estado, {'error': str(e)}
+    except LookupError as e:
+        estado, datos = 404, {'error': str(e).strip("'")}
+    except ValueError as e:
+        estado, datos = 400, {'error': str(e)}  # Validación: stock insuficiente, dato inválido...
+    except Exception as e:
+        estado, datos = 500, {'error': f"Error inesperado: {e}"}
+    # El JSON se arma aquí, sin ceder el control: nadie cambia los datos a mitad
+    return estado, json.dumps(datos, ensure_ascii=False).encode('utf-8')
+
+
+async def despachar(escritor, metodo, objetivo, cuerpo):
+    """Atender una petición; retorna (estado, bytes del JSON)"""
+    partes = urlsplit(objetivo)
+    try:
+        funcion, argumentos, escribe = buscar_ruta(metodo, partes.path)
+    except ErrorHTTP as e:
+        return e.estado, json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+    consulta = parse_qs(partes.query)
+    if escribe:
+        return await escritor.ejecutar(lambda: atender(funcion, argumentos, consulta, cuerpo))
+    return atender(funcion, argumentos, consulta, cuerpo)
+
+
+async def leer_peticion(lector):
+    """(método, objetivo, encabezados, cuerpo) o None si el cliente cerró la conexión"""
+    linea = await lector.readline()
+    if not linea:
+        return None
+    try:
+        metodo, objetivo, version = linea.decode('latin-1').split()
+    except ValueError:
+        raise ErrorHTTP(400, "Línea de petición inválida")
+    encabezados = {'version': version}
+    for _ in range(MAX_ENCABEZADOS):
+        linea = await lector.readline()
+        if linea in (b'\r\n', b'\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        encabezados[nombre.strip().lower()] = valor.strip()
+    else:
+        raise ErrorHTTP(431, "Demasiados encabezados")
+    try:
+        largo = int(encabezados.get('content-length', 0))
+    except ValueError:
+        raise ErrorHTTP(400, "Content-Length inválido")
+    if largo < 0 or largo > MAX_CUERPO:
+        raise ErrorHTTP(413, f"El cuerpo supera {MAX_CUERPO} bytes")
+    cuerpo = await lector.readexactly(largo) if largo else b''
+    return metodo.upper(), objetivo, encabezados, cuerpo
+
+
+def mantener_conexion(encabezados):
+    """Keep-alive: por defecto en HTTP/1.1, a pedido en HTTP/1.0"""
+    conexion = encabezados.get('connection', '').lower()
+    if encabezados['version'] == 'HTTP/1.1':
+        return conexion != 'close'
+    return conexion == 'keep-alive'
+
+
+def respuesta_http(estado, cuerpo, mantener):
+    """Encabezado HTTP/1.1 más el cuerpo JSON ya armado"""
+    encabezado = (f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}\r\n"
+                  f"Content-Type: application/json; charset=utf-8\r\n"
+                  f"Content-Length: {len(cuerpo)}\r\n"
+                  f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+    return encabezado.encode('latin-1') + cuerpo
+
+
+async def atender_conexion(escritor, lector, escritor_socket):
+    """Atender las peticiones de una conexión (varias si es keep-alive)"""
+    try:
+        while True:
+            try:
+                peticion = await leer_peticion(lector)
+            except ErrorHTTP as e:
+                cuerpo = json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+                escritor_socket.write(respuesta_http(e.estado, cuerpo, False))
+                await escritor_socket.drain()
+                break
+            except ValueError:
+                # Línea más larga que el límite del StreamReader
+                cuerpo = json.dumps({'error': "Petición demasiado larga"}).encode('utf-8')
+                escritor_socket.write(respuesta_http(431, cuerpo, False))
+                await escritor_socket.drain()
+                break
+            if peticion is None:
+                break
+            metodo, objetivo, encabezados, cuerpo = peticion
+            mantener = mantener_conexion(encabezados)
+            estado, respuesta = await despachar(escritor, metodo, objetivo, cuerpo)
+            escritor_socket.write(respuesta_http(estado, respuesta, mantener))
+            await escritor_socket.drain()
+            if not mantener:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass  # El cliente cortó la conexión a mitad de una petición
+    finally:
+        escritor_socket.close()
+        try:
+            await escritor_socket.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def servir(host, puerto):
+    """Correr el servidor hasta recibir Ctrl+C o SIGTERM"""
+    escritor = Escritor()
+    escritor.iniciar()
+    servidor = await asyncio.start_server(
+        lambda lector, escritor_socket: atender_conexion(escritor, lector, escritor_socket), host, puerto)
+    direccion = servidor.sockets[0].getsockname()
+    print(f"✅ Servidor escuchando en http://{direccion[0]}:{direccion[1]} (Ctrl+C para salir)")
+
+    detener = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(senal, detener.set)
+        except (NotImplementedError, AttributeError):
+            pass  # Windows: Ctrl+C llega como KeyboardInterrupt
+    try:
+        await detener.wait()
+    finally:
+        print("\n🔄 Deteniendo servidor...")
+        servidor.close()
+        await servidor.wait_closed()
+        await escritor.detener()  # Las escrituras ya aceptadas se terminan
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="API JSON del sistema de inventario y ventas")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--sqlite", action="store_true", help="usar la base SQLite (simulacro.db)")
+    parser.add_argument("--perezoso", action="store_true", help="no cargar las ventas en memoria")
+    parser.add_argument("--durabilidad", choices=['ninguna', 'lote', 'registro'], help="fsync de ventas.csv")
+    parser.add_argument("--compartido", action="store_true", help="compartir los CSV con otras cajas")
+    opciones = parser.parse_args(argumentos)
+    if opciones.sqlite and (opciones.perezoso or opciones.durabilidad or opciones.compartido):
+        parser.error("--perezoso, --durabilidad y --compartido solo se usan con los archivos CSV")
+
+    if opciones.sqlite:
+        funciones.usar_sqlite()
+    if opciones.perezoso:
+        funciones.usar_modo_perezoso()
+    if opciones.durabilidad:
+        funciones.usar_durabilidad(opciones.durabilidad)
+    if opciones.compartido:
+        funciones.usar_modo_compartido()
+
+    # Muchas ventas por segundo: los IDs se reservan de a bloques
+    funciones.usar_ids_en_bloque()
+
+    print("🔧 Inicializando sistema...")
+    funciones.inicializar_datos()
+    try:
+        asyncio.run(servir(opciones.host, opciones.puerto))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Checkpoint y ventas del búfer, igual que al salir del menú
+        funciones.finalizar_datos()
+        print("👋 Servidor detenido")
+
+
+if __name__ == "__main__":
+    main()